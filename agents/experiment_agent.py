@@ -1,20 +1,34 @@
 import json
-import google.generativeai as genai
-from core.config import GEMINI_API_KEY
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core import instrumentation
+from core.context_packer import compact_json, estimate_tokens, pack_papers
+from core.llm import get_backend
 import re
 import os
 
 
 class ExperimentAgent:
-    def __init__(self, summaries, topic, mode="nlp"):
+    """
+    Extracts experimental details from the literature with Gemini.
+    With `batch_size` unset the whole corpus goes into one prompt; otherwise
+    papers are split into chunks of `batch_size` that are extracted by up to
+    `max_workers` concurrent requests and merged (map-reduce).
+    """
+
+    def __init__(self, summaries, topic, mode="nlp", batch_size=None, max_workers=4, retries=2,
+                 context_token_budget=30000, llm=None):
         self.summaries = summaries
         self.topic = topic
         self.mode = mode
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.context_token_budget = context_token_budget
 
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        self.llm = llm or get_backend()
 
-    def extract_experiments(self):
+    def _schema_and_instruction(self):
         if self.mode == "nlp":
             schema = """
 {
@@ -47,7 +61,20 @@ class ExperimentAgent:
 """
             instruction = "Extract Machine Learning experimental setups."
 
-        prompt = f"""
+        return schema, instruction
+
+    def _build_prompt(self, papers):
+        # Abstracts carry the dataset/metric details, so they win over summaries here
+        packed, _ = pack_papers(papers, self.context_token_budget, topic=self.topic, prefer="abstract")
+        prompt = self._prompt_template(compact_json(packed))
+        unpacked = self._prompt_template(json.dumps(papers, indent=2))
+        print(f"📦 Experiment prompt: ~{estimate_tokens(unpacked)} → ~{estimate_tokens(prompt)} tokens "
+              f"({len(packed)}/{len(papers)} papers)")
+        return prompt
+
+    def _prompt_template(self, papers_json):
+        schema, instruction = self._schema_and_instruction()
+        return f"""
 You are an expert research analyst.
 
 Topic: {self.topic}
@@ -55,19 +82,95 @@ Topic: {self.topic}
 {instruction}
 
 Input:
-{json.dumps(self.summaries, indent=2)}
+{papers_json}
 
 Return ONLY valid JSON matching:
 {schema}
 """
 
-        response = self.model.generate_content(prompt)
-        cleaned = response.text.replace("```json", "").replace("```", "").strip()
-        return json.loads(cleaned)
+    @staticmethod
+    def _parse_response(text):
+        """Parse a model reply, repairing code fences, chatter and trailing commas."""
+        cleaned = text.replace("```json", "").replace("```", "").strip()
+        try:
+            data = json.loads(cleaned)
+        except ValueError:
+            start, end = cleaned.find("{"), cleaned.rfind("}")
+            if start == -1 or end <= start:
+                raise
+            candidate = re.sub(r",\s*([\]}])", r"\1", cleaned[start:end + 1])
+            data = json.loads(candidate)
+
+        if isinstance(data, list):
+            data = {"experiments": data}
+        if not isinstance(data, dict) or not isinstance(data.get("experiments"), list):
+            raise ValueError("reply does not match the experiments schema")
+        return data
+
+    def _extract_chunk(self, papers):
+        """One prompt for `papers`, retried on API or JSON errors."""
+        prompt = self._build_prompt(papers)
+        for attempt in range(self.retries + 1):
+            try:
+                return self._parse_response(self.llm.generate(prompt))
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                print(f"⚠️ Experiment extraction failed ({e}) — retry {attempt + 1}/{self.retries}")
+                time.sleep(2 ** attempt)
+
+    def extract_experiments(self):
+        if not self.batch_size:
+            return self._extract_chunk(self.summaries)
+        return self.extract_experiments_parallel()
+
+    def extract_experiments_parallel(self):
+        """
+        Map: extract each chunk of `batch_size` papers in a bounded pool.
+        Reduce: concatenate per-chunk experiments in paper order. A chunk
+        that still fails after its retries is dropped instead of the run.
+        """
+        chunks = [
+            self.summaries[i:i + self.batch_size]
+            for i in range(0, len(self.summaries), self.batch_size)
+        ]
+
+        def extract(chunk):
+            try:
+                return self._extract_chunk(chunk)["experiments"]
+            except Exception as e:
+                titles = ", ".join(p.get("title", "?") for p in chunk)
+                print(f"❌ Skipping chunk ({titles}): {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [instrumentation.submit(pool, extract, chunk) for chunk in chunks]
+            results = [f.result() for f in futures]
+
+        return {"experiments": [e for chunk in results for e in chunk]}
+
+    def checkpoint_config(self):
+        """Settings that change the extracted experiments, for stage checkpoints."""
+        return {
+            "batch_size": self.batch_size,
+            "context_token_budget": self.context_token_budget,
+            "llm": [self.llm.name, self.llm.model_name],
+        }
 
     def run(self):
         print("🧪 Extracting experimental insights...")
-        data = self.extract_experiments()
+        start = time.perf_counter()
+        with instrumentation.stage("experiments", topic=self.topic, papers=len(self.summaries),
+                                   batch_size=self.batch_size, workers=self.max_workers):
+            data = self.extract_experiments()
+        elapsed = time.perf_counter() - start
+
+        strategy = (
+            f"map-reduce, batch_size={self.batch_size}, workers={self.max_workers}"
+            if self.batch_size else "single prompt"
+        )
+        print(f"⏱️ Extracted {len(data.get('experiments', []))} experiments from "
+              f"{len(self.summaries)} papers in {elapsed:.1f}s ({strategy})")
 
         name = re.sub(r"\W+", "_", self.topic.lower())
         path = f"outputs/{name}_experiments.json"
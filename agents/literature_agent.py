@@ -1,13 +1,37 @@
 import os
 import json
+import queue
+import threading
 import time
 import requests
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from transformers import BartTokenizer, BartForConditionalGeneration
-import torch
 import xml.etree.ElementTree as ET
 
+from core import instrumentation
+from core.checkpoints import file_digest
+from core.corpus import PaperCorpus
+from core.fulltext import FullTextStore
+from core.http_client import get_with_backoff
+from core.model_registry import registry
+from core.ranking import RelevanceRanker
+from core.summarizers import DEFAULT_MODEL, DECODING_PROFILES, decoding_kwargs, load_summarizer, \
+    resolve_model, summarizer_id
+from core.summary_cache import SummaryCache
+from core.summary_router import SummaryRouter
+from core.taxonomy import TAXONOMY_PATH, load_taxonomy
+from core.utils import normalize_title
+
+S2_SEARCH_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
+S2_FIELDS = "title,abstract,authors,year,url"
+# Semantic Scholar relevance search stops at offset + limit = 1000
+S2_MAX_RESULTS = 1000
+
+ARXIV_URL = "https://export.arxiv.org/api/query"
+ATOM_NS = {"atom": "http://www.w3.org/2005/Atom"}
+ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+
 
 class LiteratureAgent:
     """
@@ -16,110 +40,619 @@ class LiteratureAgent:
     ML mode  → paper fetching + ML metadata extraction
     """
 
-    def __init__(self, topic, model_name="facebook/bart-large-cnn", device=None, mode="nlp"):
+    # Default decoding settings, shared by the single and batched summarization paths
+    GENERATION_KWARGS = DECODING_PROFILES["default"]
+
+    # arXiv asks API clients to wait ~3 seconds between calls
+    ARXIV_PAGE_DELAY = 3.0
+
+    # A fetch checkpoint is reused for at most this long when freshness is enforced
+    FETCH_WINDOW_S = 86400
+
+    def __init__(self, topic, model_name=DEFAULT_MODEL, device=None, mode="nlp", batch_size=8,
+                 cache=None, use_cache=True, corpus=None, use_corpus=True, freshness_days=365,
+                 taxonomy_path=TAXONOMY_PATH, summarizer_backend="torch", decoding="default",
+                 router=None, use_router=True, ranker=None, use_ranker=True, overfetch=3,
+                 page_size=None, fulltext=False, pdf_dir=None, chunk_words=600):
         self.topic = topic
-        self.model_name = model_name
+        self.model_name = resolve_model(model_name)
         self.mode = mode
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.batch_size = batch_size
+        self.device = device
+
+        # Summarizer: which weights, how they run (torch / int8 / onnx) and how they decode
+        self.summarizer_backend = summarizer_backend
+        self.decoding = decoding
+        self.generation_kwargs = decoding_kwargs(decoding)
+        self.summarizer_id = summarizer_id(self.model_name, summarizer_backend)
+
+        # Cheap tiers in front of the model (pass-through, dedupe, TextRank)
+        self.router = (router or SummaryRouter()) if use_router else None
+        self.model_seconds_per_paper = None
 
         self.raw_dir = "data/processed"
         self.summary_dir = "data/summaries"
         os.makedirs(self.raw_dir, exist_ok=True)
         os.makedirs(self.summary_dir, exist_ok=True)
 
-        if self.mode == "nlp":
-            print("📦 Loading summarization model:", self.model_name)
-            self.tokenizer = BartTokenizer.from_pretrained(self.model_name)
-            self.model = BartForConditionalGeneration.from_pretrained(self.model_name).to(self.device)
+        self.tokenizer = None
+        self.model = None
+        self.model_key = None
+        self.taxonomy_path = taxonomy_path
+
+        self.freshness_days = freshness_days
+        self.fetched_from_network = None
+
+        # Over-fetch candidates, then keep the `limit` most relevant distinct ones
+        self.ranker = (ranker or RelevanceRanker()) if use_ranker else None
+        self.overfetch = overfetch if self.ranker else 1
+
+        # Paginated mode: stream `page_size` pages and process them as they arrive
+        self.page_size = page_size
+
+        # Full-text mode: summarize the PDF body (map-reduce over section chunks), not just the abstract
+        self.fulltext = FullTextStore(pdf_dir=pdf_dir, max_words=chunk_words) if fulltext else None
+
+        self.corpus = None
+        if use_corpus:
+            self.corpus = corpus or PaperCorpus()
+            self.corpus.import_dir(self.raw_dir, "*_raw.json")
+
+        self.cache = None
+        if self.mode == "nlp" and use_cache:
+            self.cache = cache or SummaryCache()
+            if self.summarizer_id == DEFAULT_MODEL and self.generation_kwargs == self.GENERATION_KWARGS:
+                # The checked-in summaries were produced with the default model and settings
+                self.cache.import_summaries(self.summary_dir, self.model_name, self.GENERATION_KWARGS)
+
+    # ---------------- Model loading ----------------
+    def _load_model(self):
+        """
+        Fetch BART from the shared model registry on first use, so fully
+        cached runs never touch the weights and later runs reuse them.
+        torch and transformers are only imported here, so ML mode and
+        fully cached runs never pay for them.
+        """
+        if self.model is None:
+            if self.device is None:
+                import torch
+                cuda = torch.cuda.is_available() and self.summarizer_backend != "int8"
+                self.device = "cuda" if cuda else "cpu"
+            # Held until release_model(), so the registry never evicts it mid-run
+            self.model_key = ("bart", self.model_name, self.summarizer_backend, self.device)
+            self.tokenizer, self.model = registry.acquire(self.model_key, self._build_model)
+
+    def release_model(self):
+        """Hand BART back to the registry (it stays loaded, but may now be evicted)."""
+        if self.model is not None:
+            self.tokenizer = self.model = None
+            registry.release(self.model_key)
+
+    def _build_model(self):
+        with instrumentation.stage("model_load", topic=self.topic, model=self.model_name,
+                                   backend=self.summarizer_backend):
+            print(f"📦 Loading summarization model: {self.model_name} ({self.summarizer_backend})")
+            tokenizer, model = load_summarizer(self.model_name, self.summarizer_backend, self.device)
             print("✅ Model loaded on:", self.device)
+        return tokenizer, model
 
     # ---------------- Semantic Scholar ----------------
+    @staticmethod
+    def _s2_paper(p):
+        return {
+            "title": p.get("title"),
+            "abstract": p.get("abstract") or "",
+            "authors": [a["name"] for a in p.get("authors", [])],
+            "year": p.get("year"),
+            "url": p.get("url"),
+            "source": "semantic_scholar"
+        }
+
     def fetch_semantic_scholar(self, limit):
-        url = "https://api.semanticscholar.org/graph/v1/paper/search"
         params = {
             "query": self.topic,
-            "fields": "title,abstract,authors,year,url",
+            "fields": S2_FIELDS,
             "limit": limit
         }
 
-        for _ in range(3):
-            try:
-                r = requests.get(url, params=params, timeout=25)
-                r.raise_for_status()
-                break
-            except:
-                time.sleep(3)
-        else:
+        try:
+            r = get_with_backoff(S2_SEARCH_URL, params=params, timeout=25)
+            data = r.json().get("data") or []
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Semantic Scholar fetch failed: {e}")
             return []
 
-        papers = []
-        for p in r.json().get("data", []):
-            papers.append({
-                "title": p.get("title"),
-                "abstract": p.get("abstract") or "",
-                "authors": [a["name"] for a in p.get("authors", [])],
-                "year": p.get("year"),
-                "url": p.get("url"),
-                "source": "semantic_scholar"
-            })
-        return papers
+        return [self._s2_paper(p) for p in data]
 
-    # ---------------- arXiv fallback ----------------
-    def fetch_arxiv(self, needed):
-        query = f"all:{self.topic} AND (cat:cs.CL OR cat:cs.AI OR cat:cs.LG)"
-        url = f"https://export.arxiv.org/api/query?search_query={query}&max_results={needed}"
+    # ---------------- arXiv ----------------
+    def arxiv_params(self, max_results, start=0):
+        return {
+            "search_query": f"all:{self.topic} AND (cat:cs.CL OR cat:cs.AI OR cat:cs.LG)",
+            "start": start,
+            "max_results": max_results
+        }
+
+    @staticmethod
+    def _arxiv_paper(e):
+        ns = ATOM_NS
+        return {
+            "title": e.find("atom:title", ns).text.strip(),
+            "abstract": (e.find("atom:summary", ns).text or "").strip(),
+            "authors": [a.find("atom:name", ns).text for a in e.findall("atom:author", ns)],
+            "year": int(e.find("atom:published", ns).text[:4]),
+            "url": e.find("atom:id", ns).text,
+            "source": "arxiv"
+        }
 
+    def fetch_arxiv(self, needed):
         try:
-            r = requests.get(url, timeout=25)
-            r.raise_for_status()
-        except:
+            r = get_with_backoff(ARXIV_URL, params=self.arxiv_params(needed), timeout=25)
+            root = ET.fromstring(r.text)
+        except (requests.RequestException, ET.ParseError) as e:
+            print(f"⚠️ arXiv fetch failed: {e}")
             return []
 
-        root = ET.fromstring(r.text)
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-        papers = []
-
-        for e in root.findall("atom:entry", ns):
-            papers.append({
-                "title": e.find("atom:title", ns).text.strip(),
-                "abstract": e.find("atom:summary", ns).text.strip(),
-                "authors": [a.find("atom:name", ns).text for a in e.findall("atom:author", ns)],
-                "year": int(e.find("atom:published", ns).text[:4]),
-                "url": e.find("atom:id", ns).text,
-                "source": "arxiv"
-            })
+        return [self._arxiv_paper(e) for e in root.findall("atom:entry", ATOM_NS)]
+
+    # ---------------- Concurrent fetch ----------------
+    def fetch_all(self, limit):
+        """
+        Query Semantic Scholar and arXiv in parallel and merge the results.
+        Semantic Scholar papers come first; arXiv fills the remainder,
+        skipping titles already seen.
+        """
+        timings = {}
+
+        def timed(name, fn, *args):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings[name] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            s2 = instrumentation.submit(pool, timed, "semantic_scholar", self.fetch_semantic_scholar, limit)
+            arxiv = instrumentation.submit(pool, timed, "arxiv", self.fetch_arxiv, limit)
+            sources = [s2.result(), arxiv.result()]
+        wall = time.perf_counter() - start
+
+        papers, seen = [], set()
+        for paper in (p for batch in sources for p in batch):
+            title = normalize_title(paper.get("title"))
+            if title and title in seen:
+                continue
+            seen.add(title)
+            papers.append(paper)
+            if len(papers) >= limit:
+                break
+
+        sequential = sum(timings.values())
+        print(f"🌐 Fetched {len(papers)} papers in {wall:.1f}s "
+              f"(S2 {len(sources[0])} in {timings['semantic_scholar']:.1f}s, "
+              f"arXiv {len(sources[1])} in {timings['arxiv']:.1f}s; "
+              f"saved {max(sequential - wall, 0):.1f}s vs sequential)")
+        return papers
+
+    # ---------------- Paginated fetch ----------------
+    def iter_semantic_scholar(self, limit, page_size=100):
+        """Yield up to `limit` Semantic Scholar papers, one `offset` page at a time."""
+        offset = 0
+        limit = min(limit, S2_MAX_RESULTS)
+        while offset < limit:
+            params = {
+                "query": self.topic,
+                "fields": S2_FIELDS,
+                "offset": offset,
+                "limit": min(page_size, limit - offset)
+            }
+            try:
+                r = get_with_backoff(S2_SEARCH_URL, params=params, timeout=25)
+                body = r.json()
+            except (requests.RequestException, ValueError) as e:
+                print(f"⚠️ Semantic Scholar page at offset {offset} failed: {e}")
+                return
+
+            data = body.get("data") or []
+            instrumentation.add(s2_pages=1)
+            for p in data:
+                yield self._s2_paper(p)
+            if not data or body.get("next") is None:
+                return
+            offset = body["next"]
+
+    def iter_arxiv(self, limit, page_size=100):
+        """
+        Yield up to `limit` arXiv papers, one `start` page at a time. Each
+        page is parsed incrementally as it downloads and every entry is
+        dropped from the tree once yielded, so memory stays at one entry
+        regardless of page size.
+        """
+        start = 0
+        while start < limit:
+            if start:
+                time.sleep(self.ARXIV_PAGE_DELAY)
+            size = min(page_size, limit - start)
+            count = 0
+            try:
+                r = get_with_backoff(ARXIV_URL, params=self.arxiv_params(size, start), timeout=25, stream=True)
+                with r:
+                    for paper in self._parse_arxiv_stream(r.iter_content(chunk_size=64 * 1024)):
+                        count += 1
+                        yield paper
+            except (requests.RequestException, ET.ParseError) as e:
+                print(f"⚠️ arXiv page at start {start} failed: {e}")
+                return
+
+            instrumentation.add(arxiv_pages=1)
+            if count < size:
+                return
+            start += size
+
+    def _parse_arxiv_stream(self, chunks):
+        """Atom entries from an iterable of byte chunks, as soon as each entry closes."""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+
+        def entries():
+            nonlocal root
+            for event, elem in parser.read_events():
+                if root is None:
+                    root = elem
+                elif event == "end" and elem.tag == ATOM_ENTRY:
+                    paper = self._arxiv_paper(elem)
+                    root.remove(elem)
+                    yield paper
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from entries()
+        parser.close()
+        yield from entries()
+
+    def iter_papers(self, limit, page_size=None):
+        """
+        Stream up to `limit` papers from Semantic Scholar and arXiv as
+        their pages arrive, skipping titles already seen.
+
+        Both sources page in background threads into a bounded queue, so
+        the caller can summarize the first papers while later pages are
+        still downloading, and a slow consumer throttles the fetchers
+        instead of piling pages up in memory. Closing the generator stops
+        both fetchers.
+        """
+        page_size = page_size or self.page_size or 100
+        sources = {"semantic_scholar": self.iter_semantic_scholar, "arxiv": self.iter_arxiv}
+        items = queue.Queue(maxsize=page_size)
+        stop = threading.Event()
+        done = object()
+
+        def offer(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(fetch):
+            try:
+                for paper in fetch(limit, page_size):
+                    if not offer(paper):
+                        return
+            finally:
+                offer(done)
+
+        seen, count, active = set(), 0, len(sources)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+            for fetch in sources.values():
+                instrumentation.submit(pool, produce, fetch)
+            try:
+                while active and count < limit:
+                    paper = items.get()
+                    if paper is done:
+                        active -= 1
+                        continue
+                    title = normalize_title(paper.get("title"))
+                    if title and title in seen:
+                        continue
+                    seen.add(title)
+                    count += 1
+                    yield paper
+            finally:
+                stop.set()
+        print(f"🌐 Streamed {count} papers in {time.perf_counter() - start:.1f}s")
+
+    # ---------------- Offline-first search ----------------
+    def search_local_first(self, limit):
+        """
+        Serve papers from the local corpus and only hit the network for the
+        shortfall (papers older than `freshness_days` do not count).
+        Everything fetched is ingested back into the corpus.
+        `self.fetched_from_network` records whether the network was used.
+        """
+        self.fetched_from_network = True
+        if self.corpus is None:
+            return self.fetch_all(limit)
+
+        max_age = self.freshness_days * 86400 if self.freshness_days else None
+        start = time.perf_counter()
+        papers = self.corpus.search(self.topic, limit, max_age=max_age)
+        print(f"🗂️ Local corpus: {len(papers)}/{limit} papers in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        if len(papers) >= limit:
+            self.fetched_from_network = False
+            return papers
+
+        fetched = self.fetch_all(limit)
+        self.corpus.ingest(fetched)
+
+        seen = {normalize_title(p["title"]) for p in papers}
+        for p in fetched:
+            if len(papers) >= limit:
+                break
+            if normalize_title(p.get("title")) not in seen:
+                seen.add(normalize_title(p.get("title")))
+                papers.append(p)
         return papers
 
+    # ---------------- Relevance ranking ----------------
+    def select_relevant(self, papers, limit):
+        """Collapse near-duplicates and keep the `limit` papers closest to the topic."""
+        if self.ranker is None:
+            return papers[:limit]
+
+        start = time.perf_counter()
+        ranked, stats = self.ranker.rank(papers, self.topic, limit)
+        instrumentation.add(**stats)
+        print(f"🎯 Kept {len(ranked)}/{stats['candidates']} papers in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms ({stats['near_duplicates']} near-duplicates "
+              f"collapsed, {stats['dropped']} less relevant dropped)")
+        return ranked
+
+    def fetch_config(self):
+        """
+        Settings that change the output of `collect`, for stage checkpoints.
+        With a freshness policy the config also names the current day, so a
+        checkpoint expires daily and the corpus/network are asked again.
+        """
+        freshness = {
+            "freshness_days": self.freshness_days,
+            "window": int(time.time() // self.FETCH_WINDOW_S) if self.freshness_days else None,
+        }
+        if self.page_size:
+            return {"page_size": self.page_size, **freshness}
+        return {
+            "overfetch": self.overfetch,
+            "ranking": self.ranker.config() if self.ranker else None,
+            **freshness,
+        }
+
     # ---------------- NLP summarization ----------------
+    def _cache_key(self, abstract):
+        return SummaryCache.make_key(self.summarizer_id, self.generation_kwargs, abstract)
+
     def summarize_abstract(self, abstract):
+        if self.cache is not None:
+            key = self._cache_key(abstract)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        self._load_model()
         inputs = self.tokenizer(
             abstract, max_length=1024, truncation=True, return_tensors="pt"
         ).to(self.device)
 
         ids = self.model.generate(
-            inputs["input_ids"],
-            num_beams=4,
-            max_length=130,
-            min_length=30,
-            no_repeat_ngram_size=3,
-            early_stopping=True
+            inputs["input_ids"], attention_mask=inputs["attention_mask"], **self.generation_kwargs
         )
-        return self.tokenizer.decode(ids[0], skip_special_tokens=True)
+        summary = self.tokenizer.decode(ids[0], skip_special_tokens=True)
+
+        if self.cache is not None:
+            self.cache.put(key, self.summarizer_id, summary)
+        return summary
+
+    def cached_summaries(self, abstracts):
+        """The cached summary (or None) of every abstract, in input order."""
+        if self.cache is None:
+            return [None] * len(abstracts)
+        keys = [self._cache_key(a) for a in abstracts]
+        cached = self.cache.get_many(keys)
+        return [cached.get(key) for key in keys]
+
+    def summarize_batch(self, abstracts, batch_size=None, summaries=None):
+        """
+        Summarize many abstracts at once.
+        Cached abstracts are answered from the summary cache; the rest are
+        tokenized once, sorted by token length and padded per bucket so each
+        generate() call wastes as little work on padding as possible.
+        Summaries are returned in input order. Callers that already looked
+        up the cache pass its answers as `summaries` (None for misses).
+        """
+        batch_size = batch_size or self.batch_size
+        if not abstracts:
+            return []
+
+        summaries = list(summaries) if summaries is not None else self.cached_summaries(abstracts)
+        pending = [i for i, s in enumerate(summaries) if s is None]
+        instrumentation.add(cache_hits=len(abstracts) - len(pending), generated=len(pending))
+        if not pending:
+            print(f"♻️ All {len(abstracts)} summaries served from cache")
+            return summaries
+
+        import torch
+
+        self._load_model()
+        start = time.perf_counter()
+        encoded = self.tokenizer([abstracts[i] for i in pending], max_length=1024, truncation=True)
+        order = sorted(range(len(pending)), key=lambda i: len(encoded["input_ids"][i]))
+
+        for b in range(0, len(order), batch_size):
+            bucket = order[b:b + batch_size]
+            inputs = self.tokenizer.pad(
+                {
+                    "input_ids": [encoded["input_ids"][i] for i in bucket],
+                    "attention_mask": [encoded["attention_mask"][i] for i in bucket],
+                },
+                return_tensors="pt"
+            ).to(self.device)
+
+            with torch.no_grad():
+                ids = self.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **self.generation_kwargs
+                )
+
+            for i, text in zip(bucket, self.tokenizer.batch_decode(ids, skip_special_tokens=True)):
+                summaries[pending[i]] = text
+
+        elapsed = time.perf_counter() - start
+        self.model_seconds_per_paper = elapsed / len(pending)
+        rate = len(pending) / elapsed if elapsed > 0 else float("inf")
+        print(f"⚡ Summarized {len(pending)} papers in {elapsed:.1f}s "
+              f"({rate:.2f} papers/s, batch_size={batch_size}, "
+              f"{len(abstracts) - len(pending)} from cache)")
+
+        if self.cache is not None:
+            self.cache.put_many([(self._cache_key(abstracts[i]), self.summarizer_id, summaries[i])
+                                 for i in pending])
+        return summaries
+
+    def summarize_tiered(self, abstracts):
+        """
+        Answer what the summary cache already holds, then route each miss
+        to the cheapest tier that can summarize it (see SummaryRouter);
+        only the "model" tier reaches the model. Cache hits keep the "model"
+        tier, since the model wrote them. Returns (summaries, tiers) in
+        input order.
+        """
+        abstracts = [a or "" for a in abstracts]
+        if self.router is None:
+            return self.summarize_batch(abstracts), ["model"] * len(abstracts)
+
+        # An empty abstract has nothing to summarize, whatever the cache holds for it
+        summaries = [s if a.strip() else None for a, s in zip(abstracts, self.cached_summaries(abstracts))]
+        tiers = ["model"] * len(abstracts)
+        misses = [i for i, s in enumerate(summaries) if s is None]
+        cached = len(abstracts) - len(misses)
+
+        miss_tiers, miss_sources = self.router.plan([abstracts[i] for i in misses])
+        model_idx = []
+        for i, tier in zip(misses, miss_tiers):
+            tiers[i] = tier
+            if tier == "model":
+                model_idx.append(i)
+            elif tier != "duplicate":
+                summaries[i] = self.router.summarize_cheap(abstracts[i], tier)
+        if model_idx:
+            generated = self.summarize_batch([abstracts[i] for i in model_idx], summaries=[None] * len(model_idx))
+            for i, summary in zip(model_idx, generated):
+                summaries[i] = summary
+        for i, tier, source in zip(misses, miss_tiers, miss_sources):
+            if tier == "duplicate":
+                summaries[i] = summaries[misses[source]]
+
+        counts = {t: miss_tiers.count(t) for t in SummaryRouter.TIERS if t in miss_tiers}
+        skipped = len(misses) - len(model_idx)
+        saved = skipped * self.model_seconds_per_paper if self.model_seconds_per_paper else None
+        instrumentation.add(**{f"tier_{t}": c for t, c in counts.items()}, model_skipped=skipped, cache_hits=cached)
+        if saved is not None:
+            instrumentation.add(model_time_saved_s=round(saved, 3))
+
+        parts = [f"{cached} cached"] if cached else []
+        breakdown = ", ".join(parts + [f"{c} {t}" for t, c in counts.items()])
+        estimate = f", ~{saved:.1f}s of model time saved" if saved is not None else ""
+        print(f"🔀 Summary routing: {breakdown}{estimate}")
+        return summaries, tiers
+
+    # ---------------- Full-text summarization ----------------
+    def summarize_fulltext(self, documents):
+        """
+        Map-reduce tree over section chunks: every chunk of every paper is
+        summarized in one batched pass, then each paper's partial summaries
+        are packed into groups of up to `chunk_words` words and summarized
+        again, level by level, until one summary per paper is left.
+        Returns {paper index: summary} for papers with a document.
+        """
+        max_words = self.fulltext.max_words
+        pending = {
+            i: [f"{section}: {text}" for section, text in doc["chunks"]]
+            for i, doc in enumerate(documents) if doc and doc["chunks"]
+        }
+        final, level = {}, 0
+        while pending:
+            flat = [(i, text) for i, texts in pending.items() for text in texts]
+            summaries = self.summarize_batch([text for _, text in flat])
+            level += 1
+
+            grouped = {}
+            for (i, _), summary in zip(flat, summaries):
+                grouped.setdefault(i, []).append(summary)
+            pending = {}
+            for i, parts in grouped.items():
+                if len(parts) == 1:
+                    final[i] = parts[0]
+                else:
+                    pending[i] = [" ".join(group) for group in self._pack(parts, max_words)]
+            print(f"🌳 Full-text level {level}: {len(flat)} inputs, {len(pending)} papers still reducing")
+        instrumentation.add(fulltext_levels=level)
+        return final
+
+    @staticmethod
+    def _pack(parts, max_words):
+        """
+        Consecutive groups of `parts` with at most `max_words` words each,
+        but never fewer than two parts per group (the last may hold one), so
+        every level shrinks even when summaries run long; BART truncates an
+        oversized pair.
+        """
+        groups, current, count = [], [], 0
+        for part in parts:
+            size = len(part.split())
+            if len(current) >= 2 and count + size > max_words:
+                groups.append(current)
+                current, count = [], 0
+            current.append(part)
+            count += size
+        if current:
+            groups.append(current)
+        return groups
+
+    def add_fulltext_summaries(self, papers):
+        """Replace abstract summaries with full-text ones where a PDF was found."""
+        with instrumentation.stage("fulltext", topic=self.topic, papers=len(papers)) as stage:
+            documents = self.fulltext.documents(papers)
+            summaries = self.summarize_fulltext(documents)
+            # The stage record measures its own peak RSS
+            stage.set(**{k: v for k, v in self.fulltext.stats.items() if k != "peak_rss_mb"})
+
+        for i, summary in summaries.items():
+            doc = documents[i]
+            papers[i]["summary"] = summary
+            papers[i]["summary_tier"] = "fulltext"
+            papers[i]["fulltext"] = {"pages": doc["pages"], "chunks": len(doc["chunks"]),
+                                     "sections": doc["sections"]}
+        print(f"📚 Full text for {len(summaries)}/{len(papers)} papers "
+              f"({self.fulltext.stats.get('pages', 0)} pages, {self.fulltext.stats.get('chunks', 0)} chunks)")
+        return papers
 
     # ---------------- ML metadata extraction ----------------
     def extract_ml_metadata(self, papers):
-        dataset_pat = r"(mnist|cifar|imagenet|uci|kaggle|imdb|coco)"
-        model_pat = r"(svm|random forest|xgboost|cnn|rnn|transformer|resnet)"
-        metric_pat = r"(accuracy|f1|precision|recall|auc|rmse)"
+        matcher = load_taxonomy(self.taxonomy_path)
+        tags = matcher.match_many(p.get("abstract") or "" for p in papers)
 
         results = []
-        for p in papers:
-            text = p["abstract"].lower()
+        for p, found in zip(papers, tags):
             results.append({
                 "paper_title": p["title"],
-                "datasets": list(set(re.findall(dataset_pat, text))),
-                "models": list(set(re.findall(model_pat, text))),
-                "metrics": list(set(re.findall(metric_pat, text))),
+                "datasets": found.get("datasets", []),
+                "models": found.get("models", []),
+                "metrics": found.get("metrics", []),
                 "year": p["year"],
                 "source": p["source"]
             })
@@ -131,21 +664,117 @@ class LiteratureAgent:
         path = f"{self.raw_dir}/{name}_raw.json"
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
+        if self.corpus is not None:
+            # Already ingested with its real fetch time; importing it again would restamp it
+            self.corpus.mark_imported(path)
         print(f"💾 Raw data saved → {path}")
 
-    # ---------------- Run ----------------
-    def run(self, limit=5):
-        papers = self.fetch_semantic_scholar(limit)
-        if len(papers) < limit:
-            papers += self.fetch_arxiv(limit - len(papers))
+    # ---------------- Save summaries ----------------
+    def save_summaries(self, papers):
+        name = re.sub(r"\W+", "_", self.topic.lower())
+        path = f"{self.summary_dir}/{name}_summaries.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(papers, f, indent=2)
+        print(f"💾 Summaries saved → {path}")
 
-        self.save_raw(papers)
+    # ---------------- Stages ----------------
+    def collect(self, limit=5):
+        """Fetch stage: local corpus first, network for the shortfall."""
+        with instrumentation.stage("fetch", topic=self.topic, limit=limit) as stage:
+            candidates = self.search_local_first(limit * self.overfetch)
+            papers = self.select_relevant(candidates, limit)
+            if self.fetched_from_network:
+                self.save_raw(papers)
+            stage.set(papers=len(papers), from_network=self.fetched_from_network)
+        return papers
 
+    def process(self, papers):
+        """Model stage: BART summaries (NLP) or metadata extraction (ML)."""
         if self.mode == "nlp":
-            for p in papers:
-                p["summary"] = self.summarize_abstract(p["abstract"])
-                p["timestamp"] = datetime.now().isoformat()
+            try:
+                with instrumentation.stage("summarize", topic=self.topic, papers=len(papers)):
+                    summaries, tiers = self.summarize_tiered([p.get("abstract") for p in papers])
+                for p, summary, tier in zip(papers, summaries, tiers):
+                    p["summary"] = summary
+                    p["summary_tier"] = tier
+                    p["timestamp"] = datetime.now().isoformat()
+                if self.fulltext is not None:
+                    self.add_fulltext_summaries(papers)
+            finally:
+                self.release_model()
+
+            self.save_summaries(papers)
+            if self.cache is not None:
+                stats = self.cache.stats()
+                print(f"♻️ Summary cache: {stats['hits']} hits, {stats['misses']} misses, "
+                      f"{stats['entries']} entries")
             return papers
 
         print("📊 Extracting ML metadata...")
-        return self.extract_ml_metadata(papers)
+        with instrumentation.stage("ml_metadata", topic=self.topic, papers=len(papers)):
+            return self.extract_ml_metadata(papers)
+
+    def run_paginated(self, limit, chunk_size=None):
+        """
+        Fetch and process in one streaming pass, for surveys of hundreds of
+        papers: each chunk of `chunk_size` papers is summarized (or tagged)
+        while the next pages download (full-text summaries, if enabled, are
+        made per chunk too). Papers come in arrival order, deduped
+        by title; there is no over-fetch or relevance ranking, which would
+        need every candidate up front.
+        """
+        chunk_size = chunk_size or self.batch_size * 4
+        raw, results, chunk = [], [], []
+
+        def flush():
+            raw.extend(chunk)
+            if self.corpus is not None:
+                self.corpus.ingest(chunk)
+            if self.mode == "nlp":
+                summaries, tiers = self.summarize_tiered([p.get("abstract") for p in chunk])
+                now = datetime.now().isoformat()
+                processed = [{**p, "summary": summary, "summary_tier": tier, "timestamp": now}
+                             for p, summary, tier in zip(chunk, summaries, tiers)]
+                if self.fulltext is not None:
+                    self.add_fulltext_summaries(processed)
+                results.extend(processed)
+            else:
+                results.extend(self.extract_ml_metadata(chunk))
+            chunk.clear()
+
+        with instrumentation.stage("fetch_and_process", topic=self.topic, limit=limit,
+                                   page_size=self.page_size or 100) as stage:
+            try:
+                for paper in self.iter_papers(limit):
+                    chunk.append(paper)
+                    if len(chunk) >= chunk_size:
+                        flush()
+                if chunk:
+                    flush()
+            finally:
+                self.release_model()
+            stage.set(papers=len(results))
+
+        self.save_raw(raw)
+        if self.mode == "nlp":
+            self.save_summaries(results)
+        return results
+
+    # ---------------- Checkpoints ----------------
+    def checkpoint_config(self):
+        """Settings that change the output of `process`, for stage checkpoints."""
+        if self.mode == "nlp":
+            return {
+                "model_name": self.model_name,
+                "backend": self.summarizer_backend,
+                "generation": self.generation_kwargs,
+                "routing": self.router.config() if self.router else None,
+                "fulltext": self.fulltext.config() if self.fulltext else None,
+            }
+        return {"taxonomy": file_digest(self.taxonomy_path)}
+
+    # ---------------- Run ----------------
+    def run(self, limit=5):
+        if self.page_size:
+            return self.run_paginated(limit)
+        return self.process(self.collect(limit))
@@ -1,31 +1,15 @@
 import os
 import json
 import re
-from typing import List, Dict
-
-import google.generativeai as genai
-from core.config import GEMINI_API_KEY
-
-from reportlab.platypus import (
-    BaseDocTemplate,
-    Frame,
-    PageTemplate,
-    Paragraph,
-    Spacer
-)
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-
-# --------------------- Font Setup ---------------------
-try:
-    pdfmetrics.registerFont(TTFont("TimesNewRoman", "times.ttf"))
-    DEFAULT_FONT = "TimesNewRoman"
-except:
-    DEFAULT_FONT = "Helvetica"
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from core import instrumentation
+from core.context_packer import compact_experiments, compact_json, estimate_tokens, pack_papers
+from core.document import HEADING_PATTERN, parse_paper
+from core.llm import LLMBackend, get_backend
+from core.renderers import render
 
 
 class PaperAgent:
@@ -34,24 +18,65 @@ class PaperAgent:
     Generates an IEEE-style research survey paper.
     """
 
+    HEADING_PATTERN = HEADING_PATTERN
+
+    # Body sections written concurrently from the shared outline: (heading, goal, context needed)
+    BODY_SECTIONS = [
+        ("I. Introduction", "Motivate the topic and state the scope of the survey.", ("titles",)),
+        ("II. Related Work", "Review and compare the surveyed papers.", ("literature",)),
+        ("III. Methodology", "Describe the methods and approaches used across the papers.", ("literature",)),
+        ("IV. Experimental Analysis", "Analyse the datasets, models, metrics and reported results.", ("experiments",)),
+        ("V. Discussion", "Discuss trends, open problems and limitations.", ("titles", "experiments")),
+    ]
+
+    # Sections written afterwards from the finished body: (heading, goal)
+    SUMMARY_SECTIONS = [
+        ("Abstract", "Summarize the whole survey in a single paragraph of at most 200 words."),
+        ("Index Terms", "List four to six comma-separated index terms."),
+        ("VI. Conclusion and Future Work", "Conclude the survey and outline future research directions."),
+    ]
+
+    SECTION_ORDER = [
+        "Abstract",
+        "Index Terms",
+        "I. Introduction",
+        "II. Related Work",
+        "III. Methodology",
+        "IV. Experimental Analysis",
+        "V. Discussion",
+        "VI. Conclusion and Future Work",
+    ]
+
     def __init__(
         self,
         literature: List[Dict],
         topic: str,
         experiments_bundle: Dict = None,
         output_dir: str = "outputs",
+        context_token_budget: int = 12000,
+        llm: LLMBackend = None,
+        section_parallel: bool = False,
+        max_workers: int = 5,
+        retries: int = 2,
+        output_formats: tuple = ("pdf",),
+        render_concurrently: bool = False,
     ):
 
         self.literature = literature or []
         self.topic = topic or "Generated Paper"
         self.experiments_bundle = experiments_bundle or {}
+        self.context_token_budget = context_token_budget
+        self.section_parallel = section_parallel
+        self.max_workers = max_workers
+        self.retries = retries
+        self.output_formats = tuple(output_formats)
+        self.render_concurrently = render_concurrently
 
         self.output_dir = os.path.abspath(output_dir)
         os.makedirs(self.output_dir, exist_ok=True)
 
-        # ---------------- Gemini Setup ----------------
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
+        # ---------------- LLM Setup ----------------
+        self.llm = llm or get_backend()
 
     # --------------------- Utils ---------------------
 
@@ -60,9 +85,9 @@ class PaperAgent:
 
     # --------------------- LLM Paper Generation ---------------------
 
-    def _generate_full_paper_with_llm(self):
+    def _paper_prompt(self, literature_json: str, experiments_json: str):
 
-        prompt = f"""
+        return f"""
 Write a formal SURVEY research paper.
 
 Topic:
@@ -94,201 +119,346 @@ Rules:
 - Do NOT hallucinate datasets or results
 
 Literature:
-{json.dumps(self.literature, indent=2)}
+{literature_json}
 
 Experiments:
-{json.dumps(self.experiments_bundle, indent=2)}
+{experiments_json}
 
 Return only the paper text.
 """
 
-        response = self.model.generate_content(prompt)
-        return response.text.strip()
+    def _packed_prompt(self):
+        """
+        Build the paper prompt from compact, token-budgeted context.
+        Papers keep their reference number as `ref`, so citations still
+        line up with _generate_references().
+        """
 
-    # --------------------- References ---------------------
+        experiments_json = compact_json(compact_experiments(self.experiments_bundle))
+        literature_budget = max(self.context_token_budget - estimate_tokens(experiments_json), 1000)
+        literature, _ = pack_papers(self.literature, literature_budget, topic=self.topic)
 
-    def _generate_references(self):
+        prompt = self._paper_prompt(compact_json(literature), experiments_json)
 
-        if not self.literature:
-            return ["No references available"]
+        unpacked = self._paper_prompt(
+            json.dumps(self.literature, indent=2),
+            json.dumps(self.experiments_bundle, indent=2)
+        )
+        print(f"📦 Paper prompt: ~{estimate_tokens(unpacked)} → ~{estimate_tokens(prompt)} tokens "
+              f"({len(literature)}/{len(self.literature)} papers, budget {self.context_token_budget})")
 
-        refs = []
+        return prompt
 
-        for i, paper in enumerate(self.literature, start=1):
+    def _generate_full_paper_with_llm(self):
 
-            title = paper.get("title", "Untitled")
-            authors = ", ".join(paper.get("authors", [])) or "Unknown"
-            year = paper.get("year", "n.d.")
-            url = paper.get("url", "")
+        prompt = self._packed_prompt()
 
-            ref = f"[{i}] {authors}, \"{title},\" {year}. Available: {url}"
+        return self.llm.generate(prompt).strip()
 
-            refs.append(ref)
+    # --------------------- Section-Parallel Generation ---------------------
 
-        return refs
+    def _section_context(self, needs):
 
-    # --------------------- Page Numbers ---------------------
+        parts = []
+        if "titles" in needs:
+            titles = [
+                {"ref": i, "title": p.get("title") or p.get("paper_title"), "year": p.get("year")}
+                for i, p in enumerate(self.literature, start=1)
+            ]
+            parts.append(f"Papers:\n{compact_json(titles)}")
+        if "literature" in needs:
+            literature, _ = pack_papers(self.literature, self.context_token_budget, topic=self.topic)
+            parts.append(f"Literature:\n{compact_json(literature)}")
+        if "experiments" in needs:
+            parts.append(f"Experiments:\n{compact_json(compact_experiments(self.experiments_bundle))}")
+        return "\n\n".join(parts)
 
-    def _add_page_number(self, canvas, doc):
-        canvas.drawRightString(570, 20, str(doc.page))
+    def _section_prompt(self, heading: str, goal: str, outline: str, context: str):
 
-    # --------------------- Save IEEE Style PDF ---------------------
+        return f"""
+Write the body of the section "{heading}" of a formal SURVEY research paper.
 
-    def _save_pdf(self, paper_text):
-
-        safe_title = self._safe_filename(self.topic)
-        pdf_path = os.path.join(self.output_dir, f"{safe_title}_IEEE_paper.pdf")
+Topic:
+"{self.topic}"
 
-        styles = getSampleStyleSheet()
+Goal of this section:
+{goal}
 
-        base = ParagraphStyle(
-            "Base",
-            parent=styles["Normal"],
-            fontName=DEFAULT_FONT,
-            fontSize=10,
-            leading=12,
-            alignment=TA_JUSTIFY,
-        )
+Paper outline:
+{outline}
 
-        title_style = ParagraphStyle(
-            "Title",
-            parent=base,
-            fontSize=18,
-            alignment=TA_CENTER,
-            spaceAfter=10,
-        )
+Rules:
+- Formal academic writing
+- Paragraphs only
+- No bullet points
+- Cite papers like [1], [2]
+- Do NOT hallucinate datasets or results
+- Do NOT repeat the section heading
 
-        author_style = ParagraphStyle(
-            "Author",
-            parent=base,
-            alignment=TA_CENTER,
-            spaceAfter=6,
-        )
+{context}
 
-        heading_style = ParagraphStyle(
-            "Heading",
-            parent=base,
-            fontSize=12,
-            spaceBefore=10,
-            spaceAfter=4,
-        )
+Return only the section text.
+"""
 
-        abstract_style = ParagraphStyle(
-            "Abstract",
-            parent=base,
-            fontSize=10,
-            spaceAfter=8,
+    def _generate_section(self, heading: str, prompt: str):
+        """One section with its own retries. Returns (heading, text, seconds)."""
+
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                text = self.llm.generate(prompt).strip()
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    raise RuntimeError(f"section '{heading}' failed after {self.retries} retries: {e}") from e
+                print(f"⚠️ Section '{heading}' failed ({e}) — retry {attempt + 1}/{self.retries}")
+                time.sleep(2 ** attempt)
+
+        # Drop a repeated heading line if the model added one anyway
+        lines = text.split("\n", 1)
+        if self._is_heading(lines[0], heading):
+            text = lines[1].strip() if len(lines) > 1 else ""
+        return heading, text, time.perf_counter() - start
+
+    @staticmethod
+    def _is_heading(line, heading):
+        """True if `line` is exactly `heading` ("I. Introduction" or "Introduction"), ignoring Markdown and case."""
+        line = line.strip().strip("*#").strip().rstrip(":").strip().lower()
+        return line in (heading.lower(), re.sub(r"^[IVX]+\.\s+", "", heading).lower())
+
+    def _run_sections(self, jobs, sections, timings, on_section):
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [
+                instrumentation.submit(pool, self._generate_section, heading, prompt)
+                for heading, prompt in jobs
+            ]
+            for future in as_completed(futures):
+                heading, text, elapsed = future.result()
+                sections[heading] = text
+                timings[heading] = round(elapsed, 3)
+                if on_section:
+                    on_section(heading, text)
+
+    def _generate_sections_parallel(self, on_section: Optional[Callable] = None):
+        """
+        Outline first, then Introduction..Discussion as concurrent requests
+        (each with only the context it needs), then Abstract, Index Terms and
+        Conclusion from the finished body. The result uses the same heading
+        lines as the single-call paper, so _save_pdf parses it unchanged.
+        """
+
+        timings = {}
+        sections = {}
+
+        outline_prompt = self._section_prompt(
+            "Outline",
+            "Write a short plan (two or three sentences each) for these sections: "
+            + "; ".join(self.SECTION_ORDER) + ".",
+            "(not written yet)",
+            self._section_context(("titles",)),
         )
+        _, outline, elapsed = self._generate_section("Outline", outline_prompt)
+        timings["Outline"] = round(elapsed, 3)
 
-        # --------------------- Document ---------------------
+        body_jobs = [
+            (heading, self._section_prompt(heading, goal, outline, self._section_context(needs)))
+            for heading, goal, needs in self.BODY_SECTIONS
+        ]
+        self._run_sections(body_jobs, sections, timings, on_section)
 
-        doc = BaseDocTemplate(
-            pdf_path,
-            pagesize=A4,
-            leftMargin=40,
-            rightMargin=40,
-            topMargin=50,
-            bottomMargin=40,
+        body = "\n\n".join(
+            f"{heading}\n{sections[heading]}" for heading, _, _ in self.BODY_SECTIONS
         )
+        summary_jobs = [
+            (heading, self._section_prompt(heading, goal, outline, f"Finished sections:\n{body}"))
+            for heading, goal in self.SUMMARY_SECTIONS
+        ]
+        self._run_sections(summary_jobs, sections, timings, on_section)
 
-        frame1 = Frame(
-            doc.leftMargin,
-            doc.bottomMargin,
-            doc.width / 2 - 6,
-            doc.height,
-            id="col1"
-        )
+        paper_text = "\n\n".join(f"{heading}\n{sections[heading]}" for heading in self.SECTION_ORDER)
 
-        frame2 = Frame(
-            doc.leftMargin + doc.width / 2 + 6,
-            doc.bottomMargin,
-            doc.width / 2 - 6,
-            doc.height,
-            id="col2"
-        )
+        for heading, seconds in timings.items():
+            print(f"   ⏱️ {heading:<32} {seconds:6.1f}s")
+        return paper_text, timings
 
-        template = PageTemplate(
-            id="TwoCol",
-            frames=[frame1, frame2],
-            onPage=self._add_page_number
-        )
-
-        doc.addPageTemplates([template])
-
-        story = []
+    # --------------------- References ---------------------
 
-        # --------------------- Title ---------------------
+    def _generate_references(self):
 
-        story.append(Paragraph(self.topic, title_style))
+        if not self.literature:
+            return ["No references available"]
 
-        # --------------------- AUTHOR PLACEHOLDERS ---------------------
+        refs = []
 
-        story.append(Paragraph("Author Name 1", author_style))
-        story.append(Paragraph("Department / University", author_style))
-        story.append(Paragraph("email@domain.com", author_style))
+        for i, paper in enumerate(self.literature, start=1):
 
-        story.append(Spacer(1, 6))
+            title = paper.get("title", "Untitled")
+            authors = ", ".join(paper.get("authors", [])) or "Unknown"
+            year = paper.get("year", "n.d.")
+            url = paper.get("url", "")
 
-        story.append(Paragraph("Author Name 2", author_style))
-        story.append(Paragraph("Department / University", author_style))
-        story.append(Paragraph("email@domain.com", author_style))
+            ref = f"[{i}] {authors}, \"{title},\" {year}. Available: {url}"
 
-        story.append(Spacer(1, 14))
+            refs.append(ref)
 
-        # --------------------- Paper Content ---------------------
+        return refs
 
-        lines = paper_text.split("\n")
+    # --------------------- Render Outputs ---------------------
 
-        for line in lines:
+    def _output_paths(self, formats):
 
-            line = line.strip()
+        safe_title = self._safe_filename(self.topic)
+        names = {
+            "pdf": f"{safe_title}_IEEE_paper.pdf",
+            "md": f"{safe_title}_paper.md",
+            "json": f"{safe_title}_paper.json",
+        }
+        return {fmt: os.path.join(self.output_dir, names[fmt]) for fmt in formats}
 
-            if not line:
-                story.append(Spacer(1, 6))
-                continue
+    def _render_outputs(self, paper_text, formats=None):
+        """Parse the paper once and render every requested format from it."""
 
-            if re.match(r"^(Abstract|Index Terms|I\.|II\.|III\.|IV\.|V\.|VI\.)", line):
-                story.append(Paragraph(f"<b>{line}</b>", heading_style))
-                continue
+        formats = formats or self.output_formats
+        with instrumentation.stage("render", topic=self.topic, formats=list(formats)):
+            document = parse_paper(paper_text, self.topic, self._generate_references())
+            paths = render(
+                document,
+                self._output_paths(formats),
+                concurrent=self.render_concurrently
+            )
 
-            story.append(Paragraph(line, base))
+        for fmt, path in paths.items():
+            print(f"📄 {fmt.upper()} saved → {path}")
+        return paths
 
-        # --------------------- References ---------------------
+    def _save_pdf(self, paper_text):
+        return self._render_outputs(paper_text, formats=("pdf",))["pdf"]
 
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("<b>References</b>", heading_style))
+    # --------------------- Generate ---------------------
 
-        for ref in self._generate_references():
-            story.append(Paragraph(ref, base))
+    def _stream_full_paper_with_llm(self, txt_path: str, on_section: Optional[Callable]):
+        """
+        Consume the reply chunk by chunk, appending each chunk to the text
+        file as it arrives. A section is complete once the next heading
+        starts; each finished section is passed to on_section(heading, body).
+        Returns (paper_text, seconds until the first finished section).
+        """
+
+        start = time.perf_counter()
+        first_section = None
+        chunks, buffer = [], ""
+        heading, body = None, []
+
+        def finish_section():
+            nonlocal first_section
+            text = "\n".join(body).strip()
+            if heading is None and not text:
+                return
+            if first_section is None:
+                first_section = time.perf_counter() - start
+            if on_section:
+                on_section(heading, text)
+
+        def consume(line):
+            nonlocal heading, body
+            stripped = line.strip()
+            if self.HEADING_PATTERN.match(stripped):
+                finish_section()
+                heading, body = stripped, []
+            else:
+                body.append(stripped)
 
-        doc.build(story)
+        with open(txt_path, "w", encoding="utf-8") as f:
+            for chunk in self.llm.generate_stream(self._packed_prompt()):
+                chunks.append(chunk)
+                f.write(chunk)
+                f.flush()
 
-        print(f"📄 IEEE Paper saved → {pdf_path}")
+                buffer += chunk
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    consume(line)
 
-        return pdf_path
+        consume(buffer)
+        finish_section()
 
-    # --------------------- Generate ---------------------
+        return "".join(chunks).strip(), first_section
 
-    def generate_paper(self):
+    def generate_paper(self, stream: bool = False, on_section: Optional[Callable] = None):
 
         print("[📝] Generating paper...")
 
-        paper_text = self._generate_full_paper_with_llm()
-
         txt_path = os.path.join(
             self.output_dir,
             f"{self._safe_filename(self.topic)}_paper.txt"
         )
 
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(paper_text)
+        start = time.perf_counter()
+        first_section = None
+        section_timings = None
+
+        strategy = "sections" if self.section_parallel else ("stream" if stream else "single")
+        with instrumentation.stage("paper_llm", topic=self.topic, strategy=strategy,
+                                   literature=len(self.literature)):
+            if self.section_parallel:
+
+                def record_first(heading, body):
+                    nonlocal first_section
+                    if first_section is None:
+                        first_section = time.perf_counter() - start
+                    if on_section:
+                        on_section(heading, body)
+
+                paper_text, section_timings = self._generate_sections_parallel(record_first)
+
+                with open(txt_path, "w", encoding="utf-8") as f:
+                    f.write(paper_text)
 
-        pdf_path = self._save_pdf(paper_text)
+            elif stream:
+                paper_text, first_section = self._stream_full_paper_with_llm(txt_path, on_section)
+            else:
+                paper_text = self._generate_full_paper_with_llm()
+
+                with open(txt_path, "w", encoding="utf-8") as f:
+                    f.write(paper_text)
+
+        llm_time = time.perf_counter() - start
+
+        outputs = self._render_outputs(paper_text)
+
+        timings = {
+            "first_section_s": round(first_section, 3) if first_section is not None else None,
+            "llm_s": round(llm_time, 3),
+            "total_s": round(time.perf_counter() - start, 3),
+        }
+        if section_timings is not None:
+            timings["sections"] = section_timings
+        if first_section is not None:
+            print(f"⏱️ First section after {first_section:.1f}s, LLM done after {llm_time:.1f}s, "
+                  f"total {timings['total_s']:.1f}s")
 
         return {
             "text_path": txt_path,
-            "pdf_path": pdf_path
+            "pdf_path": outputs.get("pdf"),
+            "outputs": outputs,
+            "timings": timings
         }
 
-    def run(self):
-        return self.generate_paper()
\ No newline at end of file
+    def checkpoint_config(self) -> Dict:
+        """Settings that change the generated paper, for stage checkpoints."""
+        return {
+            "context_token_budget": self.context_token_budget,
+            "section_parallel": self.section_parallel,
+            "output_formats": list(self.output_formats),
+            "output_dir": self.output_dir,
+            "llm": [self.llm.name, self.llm.model_name],
+        }
+
+    @staticmethod
+    def artifacts(info: Dict) -> List[str]:
+        """Files a generate_paper result points at."""
+        return [info["text_path"], *info["outputs"].values()]
+
+    def run(self, stream: bool = False, on_section: Optional[Callable] = None):
+        return self.generate_paper(stream=stream, on_section=on_section)
\ No newline at end of file
@@ -1,10 +1,11 @@
 import streamlit as st
 import os
+import time
 
-from core.logger import log
-from agents.literature_agent import LiteratureAgent
-from agents.experiment_agent import ExperimentAgent
-from agents.paper_agent import PaperAgent
+from core.llm_scheduler import get_scheduler
+from core.model_registry import registry
+from core.summarizers import BACKENDS, DECODING_PROFILES, MODEL_PRESETS
+from jobs import get_queue
 
 # -----------------------------
 # Streamlit Page Config
@@ -40,83 +41,182 @@ limit = st.sidebar.number_input(
     value=5
 )
 
+with st.sidebar.expander("⚡ Summarizer (NLP mode)"):
+    summarizer_model = st.selectbox("Model", list(MODEL_PRESETS),
+                                    help="Distilled presets are faster but summarize differently from the default")
+    summarizer_backend = st.selectbox("Backend", list(BACKENDS))
+    decoding = st.selectbox("Decoding", list(DECODING_PROFILES))
+    use_router = st.checkbox(
+        "Skip the model for short, duplicate and medium abstracts",
+        value=True
+    )
+
+with st.sidebar.expander("🧪 Experiment extraction"):
+    exp_batch_size = st.number_input(
+        "Papers per request (0 = single prompt)",
+        min_value=0,
+        max_value=30,
+        value=0
+    )
+    exp_workers = st.number_input(
+        "Concurrent requests",
+        min_value=1,
+        max_value=16,
+        value=4
+    )
+
+with st.sidebar.expander("📝 Paper generation"):
+    section_parallel = st.checkbox(
+        "Generate sections in parallel",
+        value=False
+    )
+
 run_button = st.sidebar.button("🚀 Run Pipeline")
 
+
+# Shared by every session served by this process; BART starts loading right away
+@st.cache_resource
+def job_queue():
+    queue = get_queue()
+    queue.warm_up()
+    return queue
+
+
+queue = job_queue()
+
+STAGE_LABELS = {
+    "fetch": "📚 Fetching literature",
+    "summarize": "✂️ Summarizing / extracting metadata",
+    "experiments": "🧪 Extracting experimental details",
+    "paper": "📝 Generating research paper",
+}
+
 # -----------------------------
-# Main Execution
+# Submit
 # -----------------------------
 if run_button:
     if not topic.strip():
         st.error("Please enter a research topic.")
     else:
-        st.success(f"Running {mode} pipeline for topic: **{topic}**")
+        job = queue.submit(
+            topic,
+            mode=mode.lower(),
+            limit=int(limit),
+            summarizer={
+                "model_name": summarizer_model,
+                "summarizer_backend": summarizer_backend,
+                "decoding": decoding,
+                "use_router": use_router,
+            },
+            experiment_batch_size=exp_batch_size or None,
+            experiment_workers=exp_workers,
+            section_parallel=section_parallel
+        )
+        st.session_state["job_id"] = job.id
+
+# -----------------------------
+# Poll the current job
+# -----------------------------
+job = queue.get(st.session_state.get("job_id"))
+if job is not None:
+    snap = job.snapshot()
+    st.success(f"{snap['mode'].upper()} pipeline for topic: **{snap['topic']}** ({snap['limit']} papers)")
+    if snap["subscribers"] > 1:
+        st.caption(f"Shared with {snap['subscribers'] - 1} other identical request(s)")
+
+    st.progress(snap["progress"])
+    for name, stage in snap["stages"].items():
+        seconds = f" · {stage['seconds']}s" if stage["seconds"] is not None else ""
+        st.write(f"{STAGE_LABELS[name]} — {stage['status']}{seconds}")
+
+    if snap["status"] == "queued":
+        st.info(f"⏳ Waiting for a free worker ({snap['queued_s']}s so far)")
+
+    # Sections are rendered as soon as the model finishes them
+    if snap["sections"]:
+        st.subheader("📝 Draft")
+        for heading, body in snap["sections"]:
+            if heading:
+                st.markdown(f"**{heading}**")
+            st.write(body)
+
+    if snap["status"] == "failed":
+        st.error(f"Pipeline failed: {snap['error']}")
+
+    elif snap["status"] == "done":
+        paper_info = snap["result"]
+        pdf_path = paper_info["pdf_path"]
+
+        st.success("✅ Research paper generated successfully!")
+        timings = paper_info["timings"]
+        st.caption(
+            f"{paper_info['papers']} papers · first section after {timings['first_section_s']}s · "
+            f"total {timings['total_s']}s · job {snap['elapsed_s']}s"
+        )
+        if "sections" in timings:
+            with st.expander("⏱️ Section timings"):
+                st.table([
+                    {"section": heading, "seconds": seconds}
+                    for heading, seconds in timings["sections"].items()
+                ])
 
         # -----------------------------
-        # Step 1: Literature
+        # PDF Download
         # -----------------------------
-        with st.spinner("📚 Fetching literature..."):
-            lit_agent = LiteratureAgent(
-                topic=topic,
-                model_name="facebook/bart-large-cnn"
-            )
-            literature = lit_agent.run(limit=limit)
-
-        if not literature:
-            st.error("No papers found. Try a different topic.")
-        else:
-            st.info(f"Literature analysis completed ({len(literature)} papers).")
-
-            # -----------------------------
-            # Step 2: Experiments
-            # -----------------------------
-            with st.spinner("🧪 Extracting experimental details..."):
-                exp_agent = ExperimentAgent(
-                    summaries=literature,
-                    topic=topic
+        if pdf_path and os.path.exists(pdf_path):
+            with open(pdf_path, "rb") as f:
+                st.download_button(
+                    label="📥 Download Research Paper (PDF)",
+                    data=f,
+                    file_name=os.path.basename(pdf_path),
+                    mime="application/pdf"
                 )
-                experiments = exp_agent.run()
-
-            st.info("Experiment analysis completed.")
-
-            # -----------------------------
-            # Step 3: Paper Generation
-            # -----------------------------
-            with st.spinner("📝 Generating research paper..."):
-                paper_agent = PaperAgent(
-                    topic=topic,
-                    literature=literature,
-                    experiments_bundle=experiments
-                )
-                paper_info = paper_agent.run()
-                pdf_path = paper_info["pdf_path"]
-                txt_path = paper_info["text_path"]
-
-            st.success("✅ Research paper generated successfully!")
-
-            # -----------------------------
-            # PDF Download
-            # -----------------------------
-            if os.path.exists(pdf_path):
-                with open(pdf_path, "rb") as f:
-                    st.download_button(
-                        label="📥 Download Research Paper (PDF)",
-                        data=f,
-                        file_name=os.path.basename(pdf_path),
-                        mime="application/pdf"
-                    )
-            else:
-                st.error("PDF file not found.")
-
-            # -----------------------------
-            # Display References
-            # -----------------------------
-            # if os.path.exists(txt_path):
-            #     with open(txt_path, "r", encoding="utf-8") as f:
-            #         full_text = f.read()
-
-            #     if "References" in full_text:
-            #         references = full_text.split("References")[-1].strip()
-            #         st.subheader("📚 References")
-            #         st.text(references)
-            #     else:
-            #         st.info("No references section found in the generated paper.")
+        else:
+            st.error("PDF file not found.")
+
+# -----------------------------
+# Job Queue
+# -----------------------------
+with st.sidebar.expander("📋 Jobs"):
+    counts = queue.stats()
+    st.caption(
+        f"{queue.max_workers} workers · "
+        + (" · ".join(f"{n} {status}" for status, n in counts.items()) or "no jobs yet")
+    )
+    for j in reversed(queue.jobs()[-10:]):
+        s = j.snapshot()
+        st.write(f"`{s['id']}` {s['topic']} ({s['mode']}) — {s['status']} {s['progress']:.0%}")
+
+    llm = get_scheduler().stats()
+    st.caption(
+        f"🚦 LLM queue: {llm['queue_depth']} waiting ({llm['queued_interactive']} interactive, "
+        f"{llm['queued_batch']} batch) · {llm['in_flight']}/{llm['concurrency']} in flight · "
+        f"{llm['rate_limited']} rate limited · {llm['throttled_s']:.0f}s throttled"
+    )
+
+# -----------------------------
+# Loaded Models
+# -----------------------------
+# Models live in a process-wide registry, so they survive reruns and are
+# shared by every session served by this process.
+with st.sidebar.expander("🧠 Loaded models"):
+    loaded = registry.stats()
+    if loaded:
+        st.table([
+            {
+                "model": " / ".join(str(k) for k in m["key"]),
+                "load time (s)": m["load_time_s"],
+                "model (MB)": m["model_mb"],
+                "process RSS after load (MB)": m["process_rss_mb"],
+                "uses": m["uses"],
+                "in use": m["holders"],
+            }
+            for m in loaded
+        ])
+    else:
+        st.caption("No models loaded yet.")
+
+# Keep polling while the current job is in flight
+if job is not None and job.status in ("queued", "running"):
+    time.sleep(1)
+    st.rerun()
@@ -0,0 +1,121 @@
+"""
+Local fake LLM endpoint with quotas, for exercising LLMScheduler (used by
+benchmarks/run.py and tests/test_llm_scheduler.py).
+
+Serves POST /generate on 127.0.0.1 and behaves like a quota-limited API:
+a request over the per-second request or token quota, or over the
+concurrency the server tolerates, gets HTTP 429 with Retry-After, and
+latency grows with load:
+
+    with FakeLLMEndpoint(rps=20, max_concurrent=4) as endpoint:
+        backend = HTTPBackend(endpoint.url)
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from core.context_packer import estimate_tokens
+from core.llm import LLMBackend
+from core.llm_scheduler import RateLimitError
+
+
+class FakeLLMEndpoint:
+    def __init__(self, rps=20, tps=None, max_concurrent=4, latency_s=0.05, overload_latency_s=0.02):
+        self.rps = rps
+        self.tps = tps
+        self.max_concurrent = max_concurrent
+        self.latency_s = latency_s
+        self.overload_latency_s = overload_latency_s
+
+        self.accepted = 0
+        self.rejected = 0
+        self._window = deque()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/generate"
+
+    def _admit(self, tokens):
+        """None if the request is accepted, else the Retry-After seconds."""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0][0] >= 1.0:
+                self._window.popleft()
+            used = sum(t for _, t in self._window)
+            if (len(self._window) >= self.rps or self._in_flight >= self.max_concurrent
+                    or (self.tps and used + tokens > self.tps)):
+                self.rejected += 1
+                return 1.0 - (now - self._window[0][0]) if self._window else 0.1
+            self._window.append((now, tokens))
+            self._in_flight += 1
+            self.accepted += 1
+            return None
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                retry_after = endpoint._admit(estimate_tokens(body["prompt"]))
+                if retry_after is not None:
+                    self.send_response(429)
+                    self.send_header("Retry-After", f"{retry_after:.2f}")
+                    self.end_headers()
+                    return
+                try:
+                    with endpoint._lock:
+                        load = endpoint._in_flight
+                    time.sleep(endpoint.latency_s + endpoint.overload_latency_s * max(load - 1, 0))
+                    reply = json.dumps({"text": f"reply to {len(body['prompt'])} chars"}).encode()
+                finally:
+                    with endpoint._lock:
+                        endpoint._in_flight -= 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class HTTPBackend(LLMBackend):
+    """LLM backend for FakeLLMEndpoint; a 429 raises RateLimitError with the server's Retry-After."""
+
+    name = "fake-http"
+    model_name = "fake"
+    rate_limited = True
+
+    def __init__(self, url):
+        self.url = url
+
+    def generate(self, prompt):
+        r = requests.post(self.url, json={"prompt": prompt}, timeout=10)
+        if r.status_code == 429:
+            raise RateLimitError("HTTP 429", retry_after=float(r.headers.get("Retry-After", 1)))
+        r.raise_for_status()
+        return r.json()["text"]
@@ -0,0 +1,686 @@
+"""
+Offline benchmark suite.
+
+Replays the checked-in fixtures (data/processed, data/summaries and the
+outputs/ papers and experiments) with the network and LLM stubbed out, and
+writes one machine-readable report per run:
+
+    python -m benchmarks.run                      # all benchmarks
+    python -m benchmarks.run --only render prompt
+    python -m benchmarks.run --summarizer-model sshleifer/distilbart-cnn-6-6
+    python -m benchmarks.run --compare outputs/reports/bench_<old>.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from core import instrumentation
+
+REPORT_DIR = "outputs/reports"
+
+# model:backend:decoding, compared against the checked-in default summaries
+SUMMARIZER_CONFIGS = [
+    "default:torch:default",
+    "default:torch:reduced_beams",
+    "default:torch:greedy",
+    "default:int8:default",
+    "default:onnx:default",
+    "distilled:torch:default",
+    "distilled:int8:greedy",
+]
+
+
+# ---------------- Fixtures ----------------
+def load_json_files(pattern):
+    data = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            data[os.path.basename(path)] = json.load(f)
+    return data
+
+
+def fixture_papers():
+    papers = []
+    for name, items in load_json_files("data/processed/*_raw.json").items():
+        for p in items:
+            if isinstance(p, dict) and p.get("title"):
+                papers.append({**p, "source": p.get("source") or name})
+    return papers
+
+
+def fixture_summaries():
+    return load_json_files("data/summaries/*_summaries.json")
+
+
+def fixture_experiments():
+    return load_json_files("outputs/*_experiments.json")
+
+
+def fixture_paper_texts():
+    texts = {}
+    for path in sorted(glob.glob("outputs/*_paper.txt")):
+        with open(path, "r", encoding="utf-8") as f:
+            texts[os.path.basename(path)] = f.read()
+    return texts
+
+
+def as_semantic_scholar(papers):
+    return {"data": [
+        {
+            "title": p["title"],
+            "abstract": p.get("abstract"),
+            "authors": [{"name": a} for a in p.get("authors", [])],
+            "year": p.get("year"),
+            "url": p.get("url"),
+        }
+        for p in papers
+    ]}
+
+
+def as_arxiv_atom(papers):
+    entries = "".join(
+        "<entry>"
+        f"<id>{escape(p.get('url') or '')}</id>"
+        f"<published>{p.get('year') or 2000}-01-01T00:00:00Z</published>"
+        f"<title>{escape(p['title'])}</title>"
+        f"<summary>{escape(p.get('abstract') or '')}</summary>"
+        + "".join(f"<author><name>{escape(a)}</name></author>" for a in p.get("authors", []))
+        + "</entry>"
+        for p in papers
+    )
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size=1):
+        body = self.text.encode("utf-8")
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def paged_api(papers):
+    """Fake get_with_backoff serving `papers` through S2 offset and arXiv start pagination."""
+    def fake_get(url, params=None, **kwargs):
+        if "arxiv" in url:
+            start, size = params["start"], params["max_results"]
+            return FakeResponse(as_arxiv_atom(papers[start:start + size]))
+        offset, size = params.get("offset", 0), params["limit"]
+        body = as_semantic_scholar(papers[offset:offset + size])
+        if offset + size < len(papers):
+            body["next"] = offset + size
+        return FakeResponse(json.dumps(body))
+
+    return fake_get
+
+
+def synthetic_papers(n):
+    """`n` distinct papers made from the fixtures (titles numbered to defeat dedupe)."""
+    base = [p for p in fixture_papers() if p.get("abstract")]
+    return [{**p, "title": f"{p['title']} {i}"} for i, p in enumerate(base[i % len(base)] for i in range(n))]
+
+
+# ---------------- Helpers ----------------
+def timed(fn, repeats):
+    """Run fn `repeats` times; return (median seconds, last result)."""
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def literature_agent_class():
+    from agents.literature_agent import LiteratureAgent
+    return LiteratureAgent
+
+
+def offline_literature_agent(topic="benchmark", mode="ml", **kwargs):
+    return literature_agent_class()(topic, mode=mode, use_cache=False, use_corpus=False, **kwargs)
+
+
+# ---------------- Benchmarks ----------------
+def bench_fetch_parsing(args):
+    import agents.literature_agent as literature
+
+    papers = fixture_papers()
+    s2_body = json.dumps(as_semantic_scholar(papers))
+    # arXiv entries always carry an abstract
+    atom_body = as_arxiv_atom([p for p in papers if p.get("abstract")])
+
+    def fake_get(url, params=None, **kwargs):
+        return FakeResponse(atom_body if "arxiv" in url else s2_body)
+
+    agent = offline_literature_agent()
+    original = literature.get_with_backoff
+    literature.get_with_backoff = fake_get
+    try:
+        s2_time, s2 = timed(lambda: agent.fetch_semantic_scholar(len(papers)), args.repeats)
+        ax_time, ax = timed(lambda: agent.fetch_arxiv(len(papers)), args.repeats)
+    finally:
+        literature.get_with_backoff = original
+
+    return {
+        "papers": len(papers),
+        "semantic_scholar_s": s2_time,
+        "semantic_scholar_papers_per_s": len(s2) / s2_time if s2_time else None,
+        "arxiv_s": ax_time,
+        "arxiv_papers_per_s": len(ax) / ax_time if ax_time else None,
+        "arxiv_bytes": len(atom_body),
+    }
+
+
+def bench_paginated_fetch(args):
+    """Peak traced memory of single-shot vs paginated fetching as the limit grows."""
+    import tracemalloc
+    import agents.literature_agent as literature
+
+    largest = max(args.page_limits)
+    # Semantic Scholar gets its own half of the titles so both sources contribute
+    s2_papers = synthetic_papers(2 * largest)[::2]
+    ax_papers = synthetic_papers(2 * largest)[1::2]
+    s2_api, arxiv_api = paged_api(s2_papers), paged_api(ax_papers)
+
+    def fake_get(url, params=None, **kwargs):
+        return (arxiv_api if "arxiv" in url else s2_api)(url, params)
+
+    agent = offline_literature_agent()
+    agent.ARXIV_PAGE_DELAY = 0
+
+    def peak(fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            count = fn()
+            return tracemalloc.get_traced_memory()[1] / 2 ** 20, time.perf_counter() - start, count
+        finally:
+            tracemalloc.stop()
+
+    result = {"page_size": args.page_size}
+    original = literature.get_with_backoff
+    literature.get_with_backoff = fake_get
+    try:
+        for limit in args.page_limits:
+            mb, seconds, _ = peak(lambda: len(agent.fetch_all(limit)))
+            result[f"single_shot_{limit}_peak_mb"] = mb
+            # Consume without keeping the papers, as a streaming caller would
+            mb, seconds, count = peak(lambda: sum(1 for _ in agent.iter_papers(limit, args.page_size)))
+            result[f"paginated_{limit}_peak_mb"] = mb
+            result[f"paginated_{limit}_papers_per_s"] = count / seconds if seconds else None
+    finally:
+        literature.get_with_backoff = original
+    return result
+
+
+def synthetic_taxonomy(extra):
+    """The shipped taxonomy padded with `extra` made-up entries."""
+    from core.taxonomy import TAXONOMY_PATH
+
+    with open(TAXONOMY_PATH, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    categories = list(taxonomy)
+    for i in range(extra):
+        taxonomy[categories[i % len(categories)]][f"synthetic {i} net"] = [f"synth{i}", f"synthetic {i}"]
+    return taxonomy
+
+
+def alternation_regex(taxonomy):
+    """The previous approach: one alternation regex over every alias."""
+    aliases = sorted({a.lower() for names in taxonomy.values() for n, al in names.items() for a in (n, *al)},
+                     key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(a) for a in aliases) + r")\b")
+
+
+def bench_ml_metadata(args):
+    from core.taxonomy import TaxonomyMatcher
+
+    papers = fixture_papers()
+    corpus = papers * args.scale
+    agent = offline_literature_agent()
+    seconds, results = timed(lambda: agent.extract_ml_metadata(corpus), args.repeats)
+    result = {
+        "papers": len(corpus),
+        "seconds": seconds,
+        "papers_per_s": len(corpus) / seconds if seconds else None,
+        "matches": sum(len(r["datasets"]) + len(r["models"]) + len(r["metrics"]) for r in results),
+    }
+
+    # Throughput as the vocabulary grows: the automaton should stay flat,
+    # a single alternation regex slows down with every alias added
+    abstracts = [(p.get("abstract") or "") for p in papers]
+    for extra in args.vocab_sizes:
+        taxonomy = synthetic_taxonomy(extra)
+        matcher = TaxonomyMatcher(taxonomy)
+        regex = alternation_regex(taxonomy)
+        ac_time, _ = timed(lambda: matcher.match_many(abstracts), args.repeats)
+        re_time, _ = timed(lambda: [set(regex.findall(a.lower())) for a in abstracts], args.repeats)
+        result[f"vocab_{len(matcher)}_papers_per_s"] = len(abstracts) / ac_time if ac_time else None
+        result[f"vocab_{len(matcher)}_regex_papers_per_s"] = len(abstracts) / re_time if re_time else None
+    return result
+
+
+def bench_ranking(args):
+    """Near-duplicate collapse + relevance ranking of the whole fixture pool, once per topic."""
+    from core.ranking import RelevanceRanker
+
+    papers = fixture_papers()
+    topics = [name[:-len("_raw.json")].replace("_", " ") for name in load_json_files("data/processed/*_raw.json")]
+    ranker = RelevanceRanker()
+    ranker.rank(papers[:2], "warm up")  # keep the NumPy import out of the timings
+
+    seconds, results = timed(lambda: [ranker.rank(papers, t, 5) for t in topics], args.repeats)
+    return {
+        "papers": len(papers),
+        "topics": len(topics),
+        "seconds_per_topic": seconds / len(topics) if topics else None,
+        "near_duplicates": results[0][1]["near_duplicates"] if results else 0,
+    }
+
+
+def bench_summarization(args):
+    papers = [p for p in fixture_papers() if p.get("abstract")][:args.summarize_papers]
+    agent = offline_literature_agent(mode="nlp", model_name=args.summarizer_model, batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    agent._load_model()
+    load_time = time.perf_counter() - start
+
+    single_time, _ = timed(lambda: [agent.summarize_abstract(p["abstract"]) for p in papers], 1)
+    batch_time, _ = timed(lambda: agent.summarize_batch([p["abstract"] for p in papers]), 1)
+    return {
+        "model": args.summarizer_model,
+        "papers": len(papers),
+        "load_s": load_time,
+        "single_s": single_time,
+        "single_papers_per_s": len(papers) / single_time if single_time else None,
+        "batch_size": args.batch_size,
+        "batch_s": batch_time,
+        "batch_papers_per_s": len(papers) / batch_time if batch_time else None,
+    }
+
+
+def rouge_scores(reference, candidate):
+    """ROUGE-1/2/L F1 on lowercase word tokens."""
+    ref, cand = reference.lower().split(), candidate.lower().split()
+
+    def f1(overlap, n_ref, n_cand):
+        if not overlap:
+            return 0.0
+        p, r = overlap / n_cand, overlap / n_ref
+        return 2 * p * r / (p + r)
+
+    def ngrams(tokens, n):
+        return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+    scores = {}
+    for n in (1, 2):
+        r, c = ngrams(ref, n), ngrams(cand, n)
+        scores[f"rouge{n}"] = f1(sum((r & c).values()), sum(r.values()), sum(c.values()))
+
+    # Longest common subsequence
+    prev = [0] * (len(cand) + 1)
+    for a in ref:
+        cur = [0]
+        for j, b in enumerate(cand):
+            cur.append(prev[j] + 1 if a == b else max(prev[j + 1], cur[j]))
+        prev = cur
+    scores["rougeL"] = f1(prev[-1], len(ref), len(cand))
+    return scores
+
+
+def bench_summarizers(args):
+    """Speed vs ROUGE agreement with the checked-in (default model) summaries."""
+    from core.model_registry import registry
+
+    pairs = [
+        (p["abstract"], p["summary"])
+        for papers in fixture_summaries().values() for p in papers
+        if p.get("abstract") and p.get("summary")
+    ][:args.summarize_papers]
+    abstracts = [a for a, _ in pairs]
+    result = {"papers": len(pairs)}
+
+    for config in args.summarizer_configs:
+        model, backend, decoding = config.split(":")
+        try:
+            agent = offline_literature_agent(mode="nlp", model_name=model, summarizer_backend=backend,
+                                             decoding=decoding, batch_size=args.batch_size)
+            start = time.perf_counter()
+            agent._load_model()
+            load_time = time.perf_counter() - start
+
+            seconds, summaries = timed(lambda: agent.summarize_batch(abstracts), 1)
+        except ImportError as e:
+            result[f"{config}_skipped"] = f"missing dependency: {e.name or e}"
+            continue
+        finally:
+            registry.clear()
+
+        scores = [rouge_scores(ref, hyp) for (_, ref), hyp in zip(pairs, summaries)]
+        result[f"{config}_load_s"] = load_time
+        result[f"{config}_papers_per_s"] = len(pairs) / seconds if seconds else None
+        for metric in ("rouge1", "rouge2", "rougeL"):
+            result[f"{config}_{metric}"] = statistics.mean(s[metric] for s in scores) if scores else None
+    return result
+
+
+def bench_routing(args):
+    """Tier mix of the checked-in abstracts and the cost of the cheap tiers."""
+    from core.summary_router import SummaryRouter
+
+    abstracts = [p.get("abstract") or "" for papers in fixture_summaries().values() for p in papers]
+    router = SummaryRouter()
+    tiers, _ = router.plan(abstracts)
+
+    def cheap():
+        return [router.summarize_cheap(a, t) for a, t in zip(abstracts, tiers) if t not in ("model", "duplicate")]
+
+    seconds, _ = timed(cheap, args.repeats)
+    result = {"papers": len(abstracts), "cheap_tiers_s": seconds}
+    for tier in SummaryRouter.TIERS:
+        result[f"tier_{tier}"] = tiers.count(tier)
+    return result
+
+
+def bench_prompt(args):
+    from core.context_packer import estimate_tokens
+    from core.llm import StubBackend
+    from agents.experiment_agent import ExperimentAgent
+    from agents.paper_agent import PaperAgent
+
+    summaries = fixture_summaries()
+    experiments = fixture_experiments()
+    llm = StubBackend()
+    out_dir = tempfile.mkdtemp()
+
+    results = {"topics": len(summaries)}
+    rows = {"experiment": [], "paper": []}
+    for name, papers in summaries.items():
+        topic = name[:-len("_summaries.json")].replace("_", " ")
+        bundle = experiments.get(name.replace("_summaries.json", "_experiments.json"), {})
+
+        exp_agent = ExperimentAgent(papers, topic, llm=llm)
+        paper_agent = PaperAgent(papers, topic, bundle, output_dir=out_dir, llm=llm)
+
+        for kind, build, unpacked in (
+            ("experiment", lambda: exp_agent._build_prompt(papers),
+             lambda: exp_agent._prompt_template(json.dumps(papers, indent=2))),
+            ("paper", paper_agent._packed_prompt,
+             lambda: paper_agent._paper_prompt(json.dumps(papers, indent=2), json.dumps(bundle, indent=2))),
+        ):
+            seconds, prompt = timed(build, args.repeats)
+            rows[kind].append((seconds, len(prompt), estimate_tokens(prompt), estimate_tokens(unpacked())))
+
+    for kind, data in rows.items():
+        results[f"{kind}_build_s"] = sum(r[0] for r in data)
+        results[f"{kind}_chars"] = sum(r[1] for r in data)
+        results[f"{kind}_tokens"] = sum(r[2] for r in data)
+        results[f"{kind}_tokens_unpacked"] = sum(r[3] for r in data)
+    return results
+
+
+def bench_llm_scheduler(args):
+    """Unscheduled vs scheduled LLM calls against a local quota-limited fake endpoint."""
+    from concurrent.futures import ThreadPoolExecutor
+    from benchmarks.fake_llm import FakeLLMEndpoint, HTTPBackend
+    from core.llm import ScheduledBackend
+    from core.llm_scheduler import LLMScheduler, llm_priority
+
+    rps, workers, calls = 20, 8, args.llm_calls
+    prompt = "word " * 400
+
+    def call(backend, priority):
+        with llm_priority(priority):
+            start = time.perf_counter()
+            try:
+                backend.generate(prompt)
+                return priority, time.perf_counter() - start, None
+            except Exception as e:
+                return priority, time.perf_counter() - start, e
+
+    def load(backend, interactive=0):
+        """`calls` batch calls; `interactive` more arrive once the batch queue has built up."""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers + interactive) as pool:
+            futures = [pool.submit(call, backend, "batch") for _ in range(calls)]
+            time.sleep(0.3)
+            futures += [pool.submit(call, backend, "interactive") for _ in range(interactive)]
+            rows = [f.result() for f in futures]
+        return rows, time.perf_counter() - start
+
+    def mean(values):
+        return statistics.mean(values) if values else None
+
+    result = {"calls": calls, "endpoint_rps": rps}
+    with FakeLLMEndpoint(rps=rps) as endpoint:
+        rows, seconds = load(HTTPBackend(endpoint.url))
+        result["unscheduled_errors"] = sum(e is not None for _, _, e in rows)
+        result["unscheduled_s"] = seconds
+
+    with FakeLLMEndpoint(rps=rps) as endpoint:
+        scheduler = LLMScheduler(rpm=rps * 60, tpm=None, burst_s=1, base_delay=0.1, max_delay=2.0)
+        rows, seconds = load(ScheduledBackend(HTTPBackend(endpoint.url), scheduler), interactive=4)
+        stats = scheduler.stats()
+        result.update({
+            "scheduled_errors": sum(e is not None for _, _, e in rows),
+            "scheduled_s": seconds,
+            "scheduled_calls_per_s": len(rows) / seconds,
+            "endpoint_429s": endpoint.rejected,
+            "throttled_s": stats["throttled_s"],
+            "final_concurrency": stats["concurrency"],
+            "batch_latency_s": mean([t for p, t, _ in rows if p == "batch"]),
+            "interactive_latency_s": mean([t for p, t, _ in rows if p == "interactive"]),
+        })
+    return result
+
+
+def bench_fulltext(args):
+    """PDF extraction and section chunking over a directory of PDFs (default: the rendered fixture papers)."""
+    from core.fulltext import FullTextStore
+
+    paths = sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf")))
+    store = FullTextStore(cache_dir=tempfile.mkdtemp(), pdf_dir=args.pdf_dir, workers=args.pdf_workers)
+    docs = store.chunked(paths)
+    found = [d for d in docs if d]
+    return {
+        **store.stats,
+        "sections_per_pdf": statistics.mean(len(d["sections"]) for d in found) if found else None,
+    }
+
+
+def bench_render(args):
+    from core.llm import StubBackend
+    from agents.paper_agent import PaperAgent
+
+    texts = fixture_paper_texts()
+    summaries = list(fixture_summaries().values())
+    literature = summaries[0] if summaries else []
+    out_dir = tempfile.mkdtemp()
+
+    agent = PaperAgent(literature, "Benchmark", output_dir=out_dir, llm=StubBackend())
+    per_paper = []
+    for text in texts.values():
+        seconds, _ = timed(lambda: agent._save_pdf(text), args.repeats)
+        per_paper.append(seconds)
+
+    result = {
+        "papers": len(per_paper),
+        "total_s": sum(per_paper),
+        "mean_s": statistics.mean(per_paper) if per_paper else None,
+        "max_s": max(per_paper) if per_paper else None,
+    }
+    result.update(render_formats(texts, args.render_scale, out_dir))
+    return result
+
+
+def render_formats(texts, scale, out_dir):
+    """One oversized paper (a fixture `scale` times over) parsed and rendered to every format."""
+    import tracemalloc
+
+    from core.document import parse_paper
+    from core.renderers import RENDERERS, render
+
+    base = texts.get("Langchain_paper.txt") or next(iter(texts.values()), "")
+    text = "\n\n".join([base] * scale)
+    refs = [f"[{i}] Author {i}, \"Title {i},\" 2024." for i in range(1, 101)]
+    paths = {fmt: os.path.join(out_dir, f"large.{fmt}") for fmt in RENDERERS}
+
+    result = {"large_paper_kb": len(text) / 1024}
+    for label, concurrent in (("sequential", False), ("concurrent", True)):
+        # Cold pays for font registration and styles; warm reuses them
+        for run in ("cold", "warm"):
+            tracemalloc.start()
+            start = time.perf_counter()
+            doc = parse_paper(text, "Benchmark Paper", refs)
+            parsed = time.perf_counter() - start
+            render(doc, paths, concurrent)
+            total = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            result[f"large_{label}_{run}_parse_ms"] = parsed * 1000
+            result[f"large_{label}_{run}_render_s"] = total - parsed
+            result[f"large_{label}_{run}_peak_mb"] = peak / 2 ** 20
+    return result
+
+
+def bench_startup(args):
+    from benchmarks.startup import check
+
+    result = check("main", args.startup_budget_ms)
+    return {
+        "import_ms": result["import_ms"],
+        "budget_ms": result["budget_ms"],
+        "heavy_modules": ",".join(result["heavy_modules"]) or None,
+        "within_budget": result["ok"],
+    }
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "fetch_parsing": bench_fetch_parsing,
+    "paginated_fetch": bench_paginated_fetch,
+    "ml_metadata": bench_ml_metadata,
+    "ranking": bench_ranking,
+    "summarization": bench_summarization,
+    "summarizers": bench_summarizers,
+    "routing": bench_routing,
+    "prompt": bench_prompt,
+    "llm_scheduler": bench_llm_scheduler,
+    "render": bench_render,
+    "fulltext": bench_fulltext,
+}
+
+
+# ---------------- Report ----------------
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old, new):
+    print(f"\nΔ vs {old.get('commit')} ({old.get('timestamp')}):")
+    for name, result in new["results"].items():
+        before = old.get("results", {}).get(name, {})
+        for key, value in result.items():
+            prev = before.get(key)
+            if isinstance(value, (int, float)) and isinstance(prev, (int, float)) and prev:
+                print(f"  {name}.{key}: {prev:.4g} → {value:.4g} ({(value - prev) / prev:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=20, help="Corpus multiplier for ml_metadata")
+    parser.add_argument("--vocab-sizes", type=int, nargs="*", default=[0, 1000, 10000],
+                        help="Synthetic taxonomy entries added for the ml_metadata scaling run")
+    parser.add_argument("--summarizer-model", default="sshleifer/distilbart-cnn-6-6",
+                        help="Small local model for the summarization benchmark")
+    parser.add_argument("--summarize-papers", type=int, default=16)
+    parser.add_argument("--summarizer-configs", nargs="*", default=SUMMARIZER_CONFIGS,
+                        help="model:backend:decoding triples for the summarizers benchmark")
+    parser.add_argument("--page-limits", type=int, nargs="*", default=[200, 2000],
+                        help="Limits for the paginated_fetch memory comparison")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--llm-calls", type=int, default=120, help="Batch calls for the llm_scheduler benchmark")
+    parser.add_argument("--pdf-dir", default="outputs", help="PDFs for the fulltext benchmark")
+    parser.add_argument("--pdf-workers", type=int, default=None)
+    parser.add_argument("--render-scale", type=int, default=20,
+                        help="Copies of the Langchain fixture in the render benchmark's large paper")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--startup-budget-ms", type=float, default=500)
+    parser.add_argument("--output", help="Report path (default: outputs/reports/bench_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    # Keep benchmark stages out of the real pipeline log
+    instrumentation.LOG_DIR = tempfile.mkdtemp()
+    instrumentation.LOG_PATH = os.path.join(instrumentation.LOG_DIR, "pipeline.jsonl")
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+
+    for name in args.only or BENCHMARKS:
+        print(f"▶ {name}")
+        try:
+            result = BENCHMARKS[name](args)
+        except ImportError as e:
+            result = {"skipped": f"missing dependency: {e.name or e}"}
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        report["results"][name] = result
+        for key, value in result.items():
+            print(f"   {key}: {value:.4g}" if isinstance(value, float) else f"   {key}: {value}")
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = args.output or os.path.join(REPORT_DIR, f"bench_{report['commit']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Benchmark report → {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Startup import-time budget.
+
+Imports the CLI entry point in a fresh interpreter under `python -X
+importtime` and fails (exit code 1) if it takes longer than the budget or
+pulls in a heavy dependency that should only load when its stage runs:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 400 --module pipeline
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# Loaded by the stage that needs them, never at startup
+HEAVY_MODULES = ("torch", "transformers", "reportlab", "google.generativeai", "streamlit")
+
+DEFAULT_BUDGET_MS = 500
+
+
+def import_profile(module):
+    """
+    (total ms, [(cumulative ms, depth, package)], heavy modules loaded).
+    Depth 0 entries are the interpreter's own top-level imports; their sum
+    is the total.
+    """
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        depth = (len(package) - len(package.lstrip()) - 1) // 2
+        imports.append((int(cumulative) / 1000, depth, package.strip()))
+
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return sum(ms for ms, depth, _ in imports if depth == 0), imports, loaded
+
+
+def check(module="main", budget_ms=DEFAULT_BUDGET_MS, top=10):
+    total, imports, loaded = import_profile(module)
+    print(f"⏱️ import {module}: {total:.0f} ms (budget {budget_ms} ms)")
+    # Direct imports of the entry point and of the packages it pulls in
+    for ms, depth, package in sorted((i for i in imports if 0 < i[1] <= 2), reverse=True)[:top]:
+        print(f"   {ms:8.1f} ms  {'  ' * (depth - 1)}{package}")
+
+    ok = True
+    if total > budget_ms:
+        print(f"❌ Startup over budget by {total - budget_ms:.0f} ms")
+        ok = False
+    if loaded:
+        print(f"❌ Heavy modules imported at startup: {', '.join(loaded)}")
+        ok = False
+    if ok:
+        print("✅ Startup within budget")
+    return {"module": module, "import_ms": total, "budget_ms": budget_ms, "heavy_modules": loaded, "ok": ok}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import-time budget")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+    return 0 if check(args.module, args.budget_ms, args.top)["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core.utils import sanitize_filename
+
+# Pipeline order; forcing a stage also reruns every stage after it
+STAGES = ("fetch", "summarize", "experiments", "paper")
+
+
+def digest(value):
+    """Stable hash of any JSON-serialisable value."""
+    payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path):
+    """Hash of a file's contents (None if it does not exist)."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class StageCheckpoints:
+    """
+    Stage-level checkpoints for one topic and mode.
+
+    Each stage's output is stored next to a hash of its inputs and
+    configuration. `run` returns the stored output while that hash is
+    unchanged (and any files it lists still exist), and only calls the
+    stage otherwise. Because a stage's output feeds the next stage's
+    hash, a rerun resumes from the first stale or failed stage and, if a
+    refreshed stage produces the same output, reuses everything after it.
+    """
+
+    def __init__(self, topic, mode, root="data/cache/checkpoints", force=()):
+        self.topic = topic
+        self.mode = mode
+        self.dir = os.path.join(root, sanitize_filename(topic.lower()), mode)
+        self.force = self._expand(force)
+        self.report = []
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+
+    @staticmethod
+    def _expand(force):
+        force = set(force or ())
+        if "all" in force:
+            return set(STAGES)
+        unknown = force - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        first = min((STAGES.index(s) for s in force), default=len(STAGES))
+        return set(STAGES[first:])
+
+    def _path(self, stage):
+        return os.path.join(self.dir, f"{stage}.json")
+
+    def load(self, stage, key):
+        """Stored output of `stage` for `key`, or None if missing or stale."""
+        try:
+            with open(self._path(stage), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("key") != key:
+            return None
+        if not all(os.path.exists(p) for p in record.get("artifacts", [])):
+            return None
+        return record
+
+    def save(self, stage, key, output, artifacts=()):
+        record = {
+            "stage": stage,
+            "topic": self.topic,
+            "mode": self.mode,
+            "key": key,
+            "created": time.time(),
+            "artifacts": list(artifacts),
+            "output": output,
+        }
+        path = self._path(stage)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp, path)
+
+    def run(self, stage, inputs, fn, artifacts=None):
+        """
+        Run `fn()` for `stage` unless a checkpoint for `inputs` exists.
+        `artifacts(output)` may list files the output refers to; the
+        checkpoint is only reused while they all exist.
+        """
+        key = digest({"stage": stage, "topic": self.topic, "mode": self.mode, "inputs": inputs})
+        start = time.perf_counter()
+
+        if stage not in self.force:
+            record = self.load(stage, key)
+            if record is not None:
+                self._record(stage, "reused", key, start)
+                return record["output"]
+
+        output = fn()
+        self.save(stage, key, output, artifacts(output) if artifacts else ())
+        self._record(stage, "forced" if stage in self.force else "ran", key, start)
+        return output
+
+    def _record(self, stage, status, key, start):
+        with self._lock:
+            self.report.append({
+                "stage": stage,
+                "status": status,
+                "key": key[:12],
+                "seconds": round(time.perf_counter() - start, 3),
+            })
+
+    def summary(self):
+        """One-line report, e.g. 'fetch=reused summarize=reused experiments=ran'."""
+        return " ".join(f"{r['stage']}={r['status']}" for r in self.report)
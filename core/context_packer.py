@@ -0,0 +1,90 @@
+import json
+import re
+
+# Fields that never help the LLM write about a paper
+DROP_FIELDS = {"timestamp", "source", "url", "summary_tier", "relevance", "fulltext"}
+
+# Gemini tokenizes English prose at roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap offline token estimate, good enough for budgeting prompts."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_json(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_paper(paper, ref=None, prefer="summary", max_authors=3):
+    """
+    Strip a literature entry down to what a prompt needs: no timestamps,
+    sources or URLs, no empty fields, a short author list, and only one of
+    summary/abstract (`prefer` picks which one wins when both exist).
+    """
+    other = "abstract" if prefer == "summary" else "summary"
+    out = {} if ref is None else {"ref": ref}
+
+    for key, value in paper.items():
+        if key in DROP_FIELDS or value in (None, "", [], {}):
+            continue
+        if key == other and paper.get(prefer):
+            continue
+        if key == "authors" and isinstance(value, list) and len(value) > max_authors:
+            value = value[:max_authors] + ["et al."]
+        out[key] = value
+    return out
+
+
+def compact_experiments(bundle):
+    """Drop empty fields from every experiment in an {"experiments": [...]} bundle."""
+    experiments = (bundle or {}).get("experiments", [])
+    return {
+        "experiments": [
+            {k: v for k, v in e.items() if v not in (None, "", [], {})}
+            for e in experiments if isinstance(e, dict)
+        ]
+    }
+
+
+def _relevance(paper, terms):
+    text = " ".join(str(v) for v in paper.values()).lower()
+    return sum(text.count(t) for t in terms)
+
+
+def pack_papers(papers, budget, topic="", prefer="summary"):
+    """
+    Compact `papers` and keep them under `budget` tokens.
+
+    Every entry keeps its 1-based `ref` so [n] citations still match the
+    reference list. When over budget, the papers least relevant to `topic`
+    are dropped first; a single paper that alone exceeds the budget has its
+    text truncated. Returns (packed_papers, tokens).
+    """
+    packed = [compact_paper(p, ref=i, prefer=prefer) for i, p in enumerate(papers, start=1)]
+    sizes = [estimate_tokens(compact_json(p)) + 1 for p in packed]
+    total = sum(sizes) + 1
+
+    if total > budget and packed:
+        terms = [t for t in re.findall(r"\w+", topic.lower()) if len(t) > 2]
+        # Least relevant first, later papers first among equals
+        order = sorted(range(len(packed)), key=lambda i: (_relevance(packed[i], terms), -i))
+        dropped = set()
+        for i in order:
+            if total <= budget or len(dropped) == len(packed) - 1:
+                break
+            dropped.add(i)
+            total -= sizes[i]
+        packed = [p for i, p in enumerate(packed) if i not in dropped]
+
+        if total > budget:
+            p = packed[0]
+            field = prefer if p.get(prefer) else next(
+                (k for k in ("summary", "abstract") if p.get(k)), None
+            )
+            if field:
+                overflow_chars = (total - budget) * CHARS_PER_TOKEN
+                p[field] = p[field][:max(len(p[field]) - overflow_chars, 0)]
+
+    return packed, estimate_tokens(compact_json(packed))
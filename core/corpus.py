@@ -0,0 +1,230 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from core.utils import normalize_title
+
+DOI_PATTERN = re.compile(r"10\.\d{4,9}/[^\s\"<>]+", re.IGNORECASE)
+
+# Words that carry no topical signal and would make FTS AND-queries too strict
+STOPWORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "using", "with", "via"}
+
+
+def extract_doi(paper):
+    doi = paper.get("doi")
+    if not doi:
+        match = DOI_PATTERN.search(paper.get("url") or "")
+        doi = match.group(0) if match else None
+    return doi.lower().rstrip(".") if doi else None
+
+
+class PaperCorpus:
+    """
+    Local SQLite store of every fetched paper, with an FTS5 index over
+    title and abstract.
+
+    Papers are deduplicated by URL, DOI and normalized title. `search`
+    serves LiteratureAgent queries from disk; the agent only goes to the
+    network for the shortfall.
+    """
+
+    def __init__(self, path="data/cache/corpus.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                norm_title TEXT NOT NULL,
+                url TEXT,
+                doi TEXT,
+                abstract TEXT NOT NULL DEFAULT '',
+                authors TEXT NOT NULL DEFAULT '[]',
+                year INTEGER,
+                source TEXT,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_papers_norm_title ON papers(norm_title);
+            CREATE INDEX IF NOT EXISTS idx_papers_url ON papers(url);
+            CREATE INDEX IF NOT EXISTS idx_papers_doi ON papers(doi);
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, abstract, content='papers', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TABLE IF NOT EXISTS imported_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    # ---------------- Ingest ----------------
+    def _find_existing(self, url, doi, norm_title):
+        for column, value in (("url", url), ("doi", doi), ("norm_title", norm_title)):
+            if value:
+                row = self._conn.execute(
+                    f"SELECT id, title, abstract FROM papers WHERE {column} = ?", (value,)
+                ).fetchone()
+                if row:
+                    return row
+        return None
+
+    def ingest(self, papers, fetched_at=None, refresh=True):
+        """
+        Insert new papers and refresh known ones. Returns the number of new
+        papers. `refresh=False` fills in missing fields of known papers but
+        keeps their fetch time: only data that just came from the network may
+        make a paper count as fresh again.
+        """
+        fetched_at = fetched_at or time.time()
+        added = 0
+
+        with self._lock:
+            for p in papers:
+                norm_title = normalize_title(p.get("title"))
+                if not norm_title:
+                    continue
+                url = p.get("url") or None
+                doi = extract_doi(p)
+                abstract = p.get("abstract") or ""
+                existing = self._find_existing(url, doi, norm_title)
+
+                if existing is None:
+                    cur = self._conn.execute(
+                        "INSERT INTO papers (title, norm_title, url, doi, abstract, authors, year, source, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (p["title"], norm_title, url, doi, abstract,
+                         json.dumps(p.get("authors") or []), p.get("year"), p.get("source"), fetched_at)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO papers_fts (rowid, title, abstract) VALUES (?, ?, ?)",
+                        (cur.lastrowid, p["title"], abstract)
+                    )
+                    added += 1
+                    continue
+
+                # Keep the longest abstract we have seen for this paper
+                if len(abstract) > len(existing["abstract"]):
+                    self._conn.execute(
+                        "INSERT INTO papers_fts (papers_fts, rowid, title, abstract) VALUES ('delete', ?, ?, ?)",
+                        (existing["id"], existing["title"], existing["abstract"])
+                    )
+                    self._conn.execute(
+                        "UPDATE papers SET abstract = ? WHERE id = ?", (abstract, existing["id"])
+                    )
+                    self._conn.execute(
+                        "INSERT INTO papers_fts (rowid, title, abstract) VALUES (?, ?, ?)",
+                        (existing["id"], existing["title"], abstract)
+                    )
+                self._conn.execute(
+                    "UPDATE papers SET fetched_at = CASE WHEN ? THEN MAX(fetched_at, ?) ELSE fetched_at END, "
+                    "doi = COALESCE(doi, ?), url = COALESCE(url, ?) WHERE id = ?",
+                    (refresh, fetched_at, doi, url, existing["id"])
+                )
+
+            self._conn.commit()
+        return added
+
+    def import_dir(self, directory, pattern="*_raw.json"):
+        """
+        Bulk-import saved paper lists (e.g. data/processed/*_raw.json).
+        Each file is imported once per modification time. New papers are
+        stamped with the file's mtime as their fetch time; papers already in
+        the corpus keep theirs, since rewriting a file is not a refetch.
+        """
+        added = 0
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            mtime = os.path.getmtime(path)
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT mtime FROM imported_files WHERE path = ?", (path,)
+                ).fetchone()
+            if row and row[0] == mtime:
+                continue
+
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    papers = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if isinstance(papers, list):
+                added += self.ingest([p for p in papers if isinstance(p, dict)], fetched_at=mtime, refresh=False)
+            self.mark_imported(path)
+        return added
+
+    def mark_imported(self, path):
+        """Record `path` at its current mtime so import_dir skips it (for files written from corpus data)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO imported_files (path, mtime) VALUES (?, ?)", (path, os.path.getmtime(path))
+            )
+            self._conn.commit()
+
+    # ---------------- Search ----------------
+    @staticmethod
+    def _fts_query(text):
+        terms = [t for t in re.findall(r"\w+", text.lower()) if t not in STOPWORDS]
+        return " ".join(f'"{t}"' for t in terms)
+
+    def search(self, query, limit, max_age=None):
+        """
+        Best-matching papers for `query` (BM25 over title + abstract).
+        Papers last fetched more than `max_age` seconds ago are ignored.
+        """
+        fts = self._fts_query(query)
+        if not fts:
+            return []
+
+        min_fetched = time.time() - max_age if max_age else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.title, p.abstract, p.authors, p.year, p.url, p.source "
+                "FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid "
+                "WHERE papers_fts MATCH ? AND p.fetched_at >= ? "
+                "ORDER BY bm25(papers_fts) LIMIT ?",
+                (fts, min_fetched, limit)
+            ).fetchall()
+
+        return [
+            {
+                "title": r["title"],
+                "abstract": r["abstract"],
+                "authors": json.loads(r["authors"]),
+                "year": r["year"],
+                "url": r["url"],
+                "source": r["source"],
+            }
+            for r in rows
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+
+# ---------------- CLI: bulk import + query latency ----------------
+if __name__ == "__main__":
+    corpus = PaperCorpus()
+    start = time.perf_counter()
+    added = corpus.import_dir("data/processed", "*_raw.json")
+    added += corpus.import_dir("data/summaries", "*_summaries.json")
+    print(f"📥 Imported {added} new papers in {time.perf_counter() - start:.2f}s "
+          f"({len(corpus)} papers in corpus)")
+
+    queries = sys.argv[1:] or [
+        os.path.basename(p)[:-len("_raw.json")].replace("_", " ")
+        for p in sorted(glob.glob("data/processed/*_raw.json"))
+    ]
+    for q in queries:
+        start = time.perf_counter()
+        hits = corpus.search(q, limit=30)
+        print(f"🔎 {q!r}: {len(hits)} hits in {(time.perf_counter() - start) * 1000:.2f} ms")
@@ -0,0 +1,78 @@
+import re
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+# Heading lines produced by the paper prompt (Abstract, Index Terms, I.-VI.).
+# Matches whole lines only, so body text such as "Abstractive summarization
+# ..." or "I. e. ..." is never taken for a heading.
+HEADING_PATTERN = re.compile(r"^(?:Abstract|Index Terms|(?:I|II|III|IV|V|VI)\.\s+[A-Z][^.]*)$")
+
+
+@dataclass
+class Section:
+    heading: Optional[str]
+    paragraphs: List[str] = field(default_factory=list)
+    # Blank lines before each paragraph, then after the last one (PDF spacing)
+    gaps: List[int] = field(default_factory=list)
+
+
+@dataclass
+class PaperDocument:
+    """
+    Parsed paper: title, ordered sections and the reference list.
+    Built once from the LLM text and shared by every renderer.
+    """
+
+    title: str
+    sections: List[Section] = field(default_factory=list)
+    references: List[str] = field(default_factory=list)
+    text: str = ""
+    leading_gaps: int = 0
+
+    def to_dict(self):
+        # Blank-line gaps only matter to the PDF layout
+        data = asdict(self)
+        data["paper_text"] = data.pop("text")
+        data.pop("leading_gaps")
+        for section in data["sections"]:
+            section.pop("gaps")
+        return data
+
+
+def parse_paper(text: str, title: str, references: List[str] = None) -> PaperDocument:
+    """
+    Single pass over the paper text. Heading lines open a new section,
+    every other non-empty line is a paragraph. Text before the first
+    heading is kept in a section without a heading. Blank lines are
+    counted where they occur, so the PDF keeps the text's spacing.
+    """
+
+    doc = PaperDocument(title=title, references=list(references or []), text=text)
+    current = Section(heading=None)
+    blank = 0
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            blank += 1
+            continue
+
+        if HEADING_PATTERN.match(line):
+            if current.heading is not None or current.paragraphs:
+                current.gaps.append(blank)
+                doc.sections.append(current)
+            else:
+                doc.leading_gaps = blank
+            current, blank = Section(heading=line), 0
+            continue
+
+        current.gaps.append(blank)
+        current.paragraphs.append(line)
+        blank = 0
+
+    if current.heading is not None or current.paragraphs:
+        current.gaps.append(blank)
+        doc.sections.append(current)
+    else:
+        doc.leading_gaps = blank
+    return doc
@@ -0,0 +1,410 @@
+"""
+Experiment execution engine.
+
+Turns ExperimentAgent output into runnable text-classification
+experiments and evaluates them over full dataset splits:
+
+- each experiment's free-text datasets and metrics are resolved through
+  the taxonomy to entries of RUNNABLE_DATASETS / SUPPORTED_METRICS, or
+  given explicitly as {"dataset", "split", "text_column", "label_column",
+  "model", "metrics"}; anything that cannot be resolved is reported as
+  skipped instead of guessed
+- one transformers pipeline per model per process (model registry)
+- splits are read in Arrow batches (`Dataset.iter`) and classified with
+  batched inference, so no split is ever materialized as Python objects
+- experiments sharing a model run in the same worker process; independent
+  models run in parallel worker processes
+- results are written as one Parquet row per (experiment, metric)
+
+Runs offline by default: models and datasets come from the local Hugging
+Face cache, or from local paths (a model directory; a dataset saved with
+`save_to_disk`, or a .csv/.json/.jsonl/.parquet file).
+
+    python -m core.experiment_runner outputs/imdb_experiments.json --workers 2
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from core.model_registry import registry
+from core.taxonomy import TAXONOMY_PATH, load_taxonomy
+
+# Taxonomy dataset name → how to load and score it, plus a checkpoint
+# fine-tuned on the same label space (label ids line up with the dataset)
+RUNNABLE_DATASETS = {
+    "IMDB": {
+        "dataset": "imdb", "config": None, "split": "test", "text_column": "text", "label_column": "label",
+        "model": "distilbert-base-uncased-finetuned-sst-2-english",
+    },
+    "SST-2": {
+        # GLUE test labels are hidden (-1), so score on validation
+        "dataset": "glue", "config": "sst2", "split": "validation", "text_column": "sentence",
+        "label_column": "label", "model": "distilbert-base-uncased-finetuned-sst-2-english",
+    },
+    "Yelp": {
+        "dataset": "yelp_polarity", "config": None, "split": "test", "text_column": "text", "label_column": "label",
+        "model": "textattack/bert-base-uncased-yelp-polarity",
+    },
+    "Amazon Reviews": {
+        "dataset": "amazon_polarity", "config": None, "split": "test", "text_column": "content",
+        "label_column": "label", "model": "distilbert-base-uncased-finetuned-sst-2-english",
+    },
+    "AG News": {
+        "dataset": "ag_news", "config": None, "split": "test", "text_column": "text", "label_column": "label",
+        "model": "textattack/bert-base-uncased-ag-news",
+    },
+}
+RUNNABLE_DATASETS["SST"] = RUNNABLE_DATASETS["SST-2"]
+
+# Taxonomy metric name → result column
+SUPPORTED_METRICS = {
+    "Accuracy": "accuracy",
+    "Balanced Accuracy": "balanced_accuracy",
+    "Precision": "precision",
+    "Recall": "recall",
+    "F1": "f1",
+    "MCC": "mcc",
+}
+DEFAULT_METRICS = ["accuracy", "f1"]
+
+OUTPUT_DIR = "outputs"
+LOCAL_DATA_FORMATS = {".csv": "csv", ".json": "json", ".jsonl": "json", ".parquet": "parquet"}
+
+LABEL_PATTERN = re.compile(r"^LABEL_(\d+)$")
+
+
+# ---------------- Planning ----------------
+def catalog_model(dataset, config=None):
+    """Catalog checkpoint for a dataset given by taxonomy name or Hub id (None if it has none)."""
+    for name, entry in RUNNABLE_DATASETS.items():
+        if dataset.lower() == name.lower():
+            return entry["model"]
+        if dataset == entry["dataset"] and config in (None, entry["config"]):
+            return entry["model"]
+    return None
+
+
+def resolve_metrics(names, matcher):
+    """
+    (result columns, unresolved names) for metric names as written: "F1",
+    "macro-F1" or "f1" all become "f1"; names the runner cannot score
+    (BLEU, a typo) are returned as unresolved.
+    """
+    columns, unresolved = [], []
+    for name in names:
+        if name in SUPPORTED_METRICS.values():
+            found = [name]
+        else:
+            found = [SUPPORTED_METRICS[m] for m in matcher.match(name)["metrics"] if m in SUPPORTED_METRICS]
+        if not found:
+            unresolved.append(name)
+        columns.extend(c for c in found if c not in columns)
+    return columns, unresolved
+
+
+def plan_experiments(bundle, taxonomy_path=TAXONOMY_PATH, model=None):
+    """
+    (runnable specs, skipped) for an ExperimentAgent bundle. Entries that
+    already name a "dataset" string are taken as explicit specs (without a
+    "model", the catalog's checkpoint for that dataset is used, or the spec
+    is skipped; metric names are mapped like free-text ones, and names that
+    cannot be scored are kept under "unresolved_metrics"); the rest run once
+    per runnable dataset they mention. `model` overrides the catalog
+    checkpoint.
+    """
+    matcher = load_taxonomy(taxonomy_path)
+    specs, skipped = [], []
+    for exp in bundle.get("experiments", []):
+        title = exp.get("paper_title") or "Untitled"
+        if isinstance(exp.get("dataset"), str):
+            spec = {
+                "paper_title": title, "config": None, "split": "test", "text_column": "text",
+                "label_column": "label", "metrics": DEFAULT_METRICS, **exp,
+                **({"model": model} if model else {}),
+            }
+            spec["model"] = spec.get("model") or catalog_model(spec["dataset"], spec["config"])
+            names = [spec["metrics"]] if isinstance(spec["metrics"], str) else spec["metrics"] or []
+            metrics, unresolved = resolve_metrics(names, matcher)
+            spec["metrics"] = metrics or DEFAULT_METRICS
+            if unresolved:
+                spec["unresolved_metrics"] = unresolved
+            if not spec["model"]:
+                skipped.append({"paper_title": title, "reason": "no model given and none in the catalog for "
+                                f"{spec['dataset']!r} (set \"model\" or pass --model)",
+                                "datasets": [spec["dataset"]]})
+                continue
+            specs.append(spec)
+            continue
+
+        # NLP bundles use metrics/datasets, ML bundles evaluation_metrics
+        metric_text = " ; ".join(exp.get("metrics") or exp.get("evaluation_metrics") or [])
+        metrics = [SUPPORTED_METRICS[m] for m in matcher.match(metric_text)["metrics"] if m in SUPPORTED_METRICS]
+        datasets = [d for d in matcher.match(" ; ".join(exp.get("datasets") or []))["datasets"]
+                    if d in RUNNABLE_DATASETS]
+        if not datasets:
+            skipped.append({"paper_title": title, "reason": "no runnable text-classification dataset",
+                            "datasets": exp.get("datasets") or []})
+            continue
+
+        paper_models = exp.get("models_used") or exp.get("models") or []
+        seen = set()
+        for d in datasets:
+            entry = RUNNABLE_DATASETS[d]
+            if (entry["dataset"], entry["config"]) in seen:
+                continue
+            seen.add((entry["dataset"], entry["config"]))
+            specs.append({
+                "paper_title": title,
+                **entry,
+                **({"model": model} if model else {}),
+                "metrics": metrics or DEFAULT_METRICS,
+                "paper_models": paper_models,
+            })
+    return specs, skipped
+
+
+# ---------------- Loading ----------------
+def load_split(spec):
+    """The spec's split as a memory-mapped Arrow dataset (local paths supported)."""
+    try:
+        from datasets import load_dataset, load_from_disk
+    except ImportError as e:
+        raise ImportError("the experiment runner needs `pip install datasets`") from e
+
+    source = spec["dataset"]
+    if os.path.isdir(source):
+        data = load_from_disk(source)
+        return data[spec["split"]] if hasattr(data, "keys") else data
+    ext = os.path.splitext(source)[1].lower()
+    if ext in LOCAL_DATA_FORMATS:
+        return load_dataset(LOCAL_DATA_FORMATS[ext], data_files={spec["split"]: source}, split=spec["split"])
+    return load_dataset(source, spec.get("config"), split=spec["split"])
+
+
+def get_pipeline(model_name, device=-1):
+    """Text-classification pipeline, loaded once per model per process."""
+    def load():
+        from transformers import pipeline
+        return pipeline("text-classification", model=model_name, device=device)
+
+    return registry.get(("text-classification", model_name, device), load)
+
+
+def label_ids(pipe, label_map=None):
+    """Predicted label string → dataset label id."""
+    mapping = {str(k).lower(): int(v) for k, v in (pipe.model.config.label2id or {}).items()}
+    mapping.update({str(k).lower(): int(v) for k, v in (label_map or {}).items()})
+
+    def to_id(label):
+        key = label.lower()
+        if key in mapping:
+            return mapping[key]
+        match = LABEL_PATTERN.match(label)
+        if match:
+            return int(match.group(1))
+        raise ValueError(f"model label {label!r} has no dataset label id (pass label_map)")
+
+    return to_id
+
+
+# ---------------- Metrics ----------------
+def classification_metrics(y_true, y_pred, metrics=DEFAULT_METRICS):
+    """
+    Accuracy and macro-averaged precision/recall/F1 (plus balanced
+    accuracy and MCC) from the confusion matrix.
+    """
+    import numpy as np
+
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    if not len(y_true):
+        return {m: None for m in metrics}
+
+    n = int(max(y_true.max(), y_pred.max())) + 1
+    cm = np.bincount(y_true * n + y_pred, minlength=n * n).reshape(n, n).astype(np.float64)
+    tp = np.diag(cm)
+    support, predicted, total = cm.sum(axis=1), cm.sum(axis=0), cm.sum()
+    present = support > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        mcc_den = np.sqrt((total ** 2 - (predicted ** 2).sum()) * (total ** 2 - (support ** 2).sum()))
+        mcc = (tp.sum() * total - (predicted * support).sum()) / mcc_den if mcc_den else 0.0
+
+    values = {
+        "accuracy": tp.sum() / total,
+        "balanced_accuracy": recall[present].mean(),
+        "precision": precision[present].mean(),
+        "recall": recall[present].mean(),
+        "f1": f1[present].mean(),
+        "mcc": mcc,
+    }
+    return {m: round(float(values[m]), 6) for m in metrics}
+
+
+# ---------------- Execution ----------------
+def run_experiment(spec, batch_size=32, max_samples=None, device=-1):
+    """Score one spec over its split. Returns the result dict (status "ok" or "failed")."""
+    result = {
+        "paper_title": spec["paper_title"], "dataset": spec["dataset"], "config": spec.get("config"),
+        "split": spec["split"], "model": spec["model"], "samples": 0, "seconds": None, "metrics": {},
+        "status": "ok", "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        data = load_split(spec)
+        if max_samples:
+            data = data.select(range(min(max_samples, len(data))))
+        pipe = get_pipeline(spec["model"], device)
+        to_id = label_ids(pipe, spec.get("label_map"))
+
+        y_true, y_pred = [], []
+        for batch in data.iter(batch_size=batch_size):
+            outputs = pipe(batch[spec["text_column"]], batch_size=batch_size, truncation=True)
+            y_pred.extend(to_id(o["label"]) for o in outputs)
+            y_true.extend(batch[spec["label_column"]])
+
+        result["samples"] = len(y_true)
+        result["metrics"] = classification_metrics(y_true, y_pred, spec.get("metrics") or DEFAULT_METRICS)
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def _run_group(specs, options):
+    """Worker entry point: every spec here shares one model, so its pipeline loads once."""
+    if options.get("offline", True):
+        set_offline()
+    if options.get("threads"):
+        # Worker processes split the cores instead of each grabbing all of them
+        import torch
+        torch.set_num_threads(options["threads"])
+    return [run_experiment(spec, options.get("batch_size", 32), options.get("max_samples"),
+                           options.get("device", -1)) for spec in specs]
+
+
+def set_offline():
+    for var in ("HF_HUB_OFFLINE", "HF_DATASETS_OFFLINE", "TRANSFORMERS_OFFLINE"):
+        os.environ[var] = "1"
+
+
+class ExperimentRunner:
+    """
+    Runs planned experiments, grouped by model: groups go to `workers`
+    spawned processes (or run inline with workers=1), and results are
+    written to `<output_dir>/<topic>_experiment_results.parquet`.
+    """
+
+    def __init__(self, topic, workers=2, batch_size=32, max_samples=None, device=-1, offline=True,
+                 output_dir=OUTPUT_DIR, taxonomy_path=TAXONOMY_PATH, model=None):
+        self.topic = topic
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.device = device
+        self.offline = offline
+        self.output_dir = output_dir
+        self.taxonomy_path = taxonomy_path
+        self.model = model
+
+    def options(self, workers=1):
+        return {"batch_size": self.batch_size, "max_samples": self.max_samples, "device": self.device,
+                "offline": self.offline, "threads": max((os.cpu_count() or 1) // workers, 1) if workers > 1 else None}
+
+    def run(self, bundle):
+        specs, skipped = plan_experiments(bundle, self.taxonomy_path, self.model)
+        for s in skipped:
+            print(f"⚠️ Skipped {s['paper_title']!r}: {s['reason']}")
+        unresolved = [{"paper_title": s["paper_title"], "dataset": s["dataset"], "metrics": s["unresolved_metrics"]}
+                      for s in specs if s.get("unresolved_metrics")]
+        for u in unresolved:
+            print(f"⚠️ {u['paper_title']!r} on {u['dataset']}: cannot score {', '.join(u['metrics'])}")
+        print(f"🧪 {len(specs)} runnable experiments ({len(skipped)} skipped)")
+
+        groups = {}
+        for spec in specs:
+            groups.setdefault(spec["model"], []).append(spec)
+
+        start = time.perf_counter()
+        if self.workers <= 1 or len(groups) <= 1:
+            results = [r for group in groups.values() for r in _run_group(group, self.options())]
+        else:
+            # spawn: torch and tokenizer threads do not survive fork
+            workers = min(self.workers, len(groups))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+                futures = [pool.submit(_run_group, group, self.options(workers)) for group in groups.values()]
+                results = [r for f in futures for r in f.result()]
+        elapsed = time.perf_counter() - start
+
+        for r in results:
+            scores = ", ".join(f"{k}={v:.4f}" for k, v in r["metrics"].items() if v is not None)
+            rate = f", {r['samples'] / r['seconds']:.0f} samples/s" if r["samples"] and r["seconds"] else ""
+            status = scores if r["status"] == "ok" else r["error"]
+            print(f"{'✅' if r['status'] == 'ok' else '❌'} {r['model']} on {r['dataset']}: {status}{rate}")
+        print(f"⏱️ {len(results)} experiments over {len(groups)} models in {elapsed:.1f}s")
+
+        path = self.save(results)
+        return {"results": results, "skipped": skipped, "unresolved_metrics": unresolved, "path": path,
+                "seconds": round(elapsed, 3)}
+
+    def save(self, results):
+        """One row per (experiment, metric); failed experiments keep a row with their error."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("writing experiment results needs `pip install pyarrow`") from e
+
+        rows = []
+        for r in results:
+            base = {k: r[k] for k in ("paper_title", "dataset", "config", "split", "model", "samples",
+                                      "seconds", "status", "error")}
+            for metric, value in (r["metrics"] or {None: None}).items():
+                rows.append({**base, "metric": metric, "value": value})
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = re.sub(r"\W+", "_", self.topic.lower())
+        path = os.path.join(self.output_dir, f"{name}_experiment_results.parquet")
+        pq.write_table(pa.Table.from_pylist(rows), path)
+        print(f"💾 Experiment results saved → {path}")
+        return path
+
+
+# ---------------- CLI ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Run ExperimentAgent output as real experiments")
+    parser.add_argument("experiments", help="<topic>_experiments.json written by ExperimentAgent")
+    parser.add_argument("--topic", help="Output name (default: derived from the file name)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (one model per task)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-samples", type=int, default=None, help="Cap per split (default: full split)")
+    parser.add_argument("--device", type=int, default=-1, help="CUDA device index, -1 for CPU")
+    parser.add_argument("--model", help="Checkpoint or local model directory to run instead of the catalog's")
+    parser.add_argument("--online", action="store_true", help="Allow downloads from the Hugging Face Hub")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    with open(args.experiments, "r", encoding="utf-8") as f:
+        bundle = json.load(f)
+    topic = args.topic or re.sub(r"_experiments$", "", os.path.splitext(os.path.basename(args.experiments))[0])
+    if not args.online:
+        set_offline()
+
+    outcome = ExperimentRunner(
+        topic, workers=args.workers, batch_size=args.batch_size, max_samples=args.max_samples,
+        device=args.device, offline=not args.online, output_dir=args.output_dir, model=args.model
+    ).run(bundle)
+    return 0 if all(r["status"] == "ok" for r in outcome["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Full-text ingestion for LiteratureAgent's full-text mode.
+
+Papers with an arXiv id get their PDF downloaded (or found in a local
+`pdf_dir`, which replaces arXiv entirely), text is extracted in a process
+pool, and split into section-aware chunks small enough for BART:
+
+    papers → PDFs (data/cache/fulltext/pdf) → text (data/cache/fulltext/text)
+           → sections (References/Acknowledgements/Appendix dropped)
+           → chunks of at most `max_words` words, split on sentences
+
+Extraction uses PyMuPDF when installed and pypdf otherwise (see
+requirements-optional.txt). Both caches are keyed so a rerun never
+downloads or parses the same PDF twice.
+
+    python -m core.fulltext path/to/pdfs --workers 4
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import requests
+
+from core import instrumentation
+from core.checkpoints import file_digest
+from core.http_client import get_with_backoff
+from core.summary_router import split_sentences
+
+FULLTEXT_DIR = "data/cache/fulltext"
+# export.arxiv.org is the mirror arXiv asks scripted clients to use
+ARXIV_PDF_URL = "https://export.arxiv.org/pdf/{}"
+
+ARXIV_ID_PATTERN = re.compile(r"arxiv\.org/(?:abs|pdf)/([^\s?#]+?)(?:\.pdf)?/?$")
+
+SECTION_NAMES = (
+    "abstract", "introduction", "background", "related work", "preliminaries", "problem formulation",
+    "method", "methods", "methodology", "approach", "model", "proposed method", "experimental setup",
+    "experiments", "experimental results", "experimental analysis", "evaluation", "results",
+    "results and discussion", "analysis", "ablation study", "ablation studies", "discussion", "limitations",
+    "conclusion", "conclusions", "conclusion and future work", "future work", "references", "bibliography",
+    "acknowledgments", "acknowledgements", "appendix",
+)
+SKIP_SECTIONS = ("references", "bibliography", "acknowledgments", "acknowledgements", "appendix")
+
+NUMBERING = r"(?:\d+(?:\.\d+)*\.?|[IVX]+\.|[A-H]\.)"
+KNOWN_HEADING = re.compile(rf"^(?:{NUMBERING}\s+)?({'|'.join(SECTION_NAMES)})\s*:?$", re.IGNORECASE)
+NUMBERED_HEADING = re.compile(rf"^{NUMBERING}\s+([A-Z][A-Za-z][\w\-,:&/ ]{{1,60}})$")
+
+PDF_EXTRA_HINT = "full-text mode needs `pip install pypdf` (or pymupdf); see requirements-optional.txt"
+
+
+def arxiv_id(paper):
+    """arXiv id from the paper URL ("2101.00001v2", "cs/0112017"), or None."""
+    match = ARXIV_ID_PATTERN.search(paper.get("url") or "")
+    return match.group(1) if match else None
+
+
+def slug(text):
+    return re.sub(r"\W+", "_", (text or "").lower()).strip("_")
+
+
+# ---------------- Extraction (runs in worker processes) ----------------
+def pdf_backend():
+    """"pymupdf" or "pypdf", whichever extract_pdf will use; ImportError if neither is installed."""
+    if importlib.util.find_spec("fitz"):
+        return "pymupdf"
+    if importlib.util.find_spec("pypdf"):
+        return "pypdf"
+    raise ImportError(PDF_EXTRA_HINT)
+
+
+def extract_pdf(path):
+    """Text of every page of one PDF: {"pages", "text", "seconds", "peak_rss_mb"}."""
+    start = time.perf_counter()
+    try:
+        import fitz
+        with fitz.open(path) as doc:
+            pages = [page.get_text() for page in doc]
+    except ImportError:
+        try:
+            from pypdf import PdfReader
+        except ImportError as e:
+            raise ImportError(PDF_EXTRA_HINT) from e
+        pages = [page.extract_text() or "" for page in PdfReader(path).pages]
+
+    return {
+        "pages": len(pages),
+        "text": "\n".join(pages),
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(instrumentation.peak_rss_mb(), 1),
+    }
+
+
+# ---------------- Sections and chunks ----------------
+def section_heading(line):
+    """Section name if `line` is a heading, else None."""
+    if not line or len(line.split()) > 8:
+        return None
+    match = KNOWN_HEADING.match(line)
+    if not match and not line.endswith((".", ",", ";")):
+        match = NUMBERED_HEADING.match(line)
+    if not match:
+        return None
+    name = match.group(1).strip()
+    # "INTRODUCTION" / "related work" → "Introduction" / "Related Work"
+    return name.title() if name.isupper() or name.islower() else name
+
+
+def split_sections(text):
+    """[(section name, text)] in document order; back matter is dropped."""
+    # Re-join words hyphenated across line breaks
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    sections, name, lines = [], "Preamble", []
+
+    def flush():
+        body = " ".join(" ".join(lines).split())
+        if body and name.lower() not in SKIP_SECTIONS:
+            sections.append((name, body))
+
+    for line in text.splitlines():
+        heading = section_heading(line.strip())
+        if heading:
+            flush()
+            name, lines = heading, []
+        else:
+            lines.append(line.strip())
+    flush()
+    return sections
+
+
+def chunk_words(text, max_words):
+    """Split on sentence boundaries into pieces of at most `max_words` words."""
+    chunks, current, count = [], [], 0
+    for sentence in split_sentences(text):
+        words = sentence.split()
+        # A "sentence" longer than a chunk (tables, equations) is cut by words
+        pieces = [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)] or [sentence]
+        for piece in pieces:
+            size = len(piece.split())
+            if current and count + size > max_words:
+                chunks.append(" ".join(current))
+                current, count = [], 0
+            current.append(piece)
+            count += size
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def chunk_sections(sections, max_words=600):
+    """[(section, chunk text)]; a chunk never spans two sections."""
+    return [(name, chunk) for name, body in sections for chunk in chunk_words(body, max_words)]
+
+
+class FullTextStore:
+    """
+    PDFs and extracted text for papers, cached under `cache_dir`.
+
+    With `pdf_dir`, PDFs are looked up there as `<arxiv id>.pdf` or
+    `<title slug>.pdf` and nothing is downloaded. Extracted text is cached
+    by PDF content digest. `max_words` bounds each chunk; ~600 words stays
+    under BART's 1024-token input. Raises ImportError up front when no PDF
+    library is installed, rather than after the PDFs are downloaded.
+    """
+
+    def __init__(self, cache_dir=FULLTEXT_DIR, pdf_dir=None, workers=None, download_workers=4, max_words=600):
+        self.backend = pdf_backend()
+        self.cache_dir = cache_dir
+        self.pdf_dir = pdf_dir
+        self.workers = workers or max((os.cpu_count() or 2) - 1, 1)
+        self.download_workers = download_workers
+        self.max_words = max_words
+        self.stats = {}
+        os.makedirs(os.path.join(cache_dir, "pdf"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "text"), exist_ok=True)
+
+    def config(self):
+        return {"pdf_dir": self.pdf_dir, "max_words": self.max_words}
+
+    # ---------------- PDFs ----------------
+    def local_pdf(self, paper):
+        names = [slug(paper.get("title")) + ".pdf"]
+        pid = arxiv_id(paper)
+        if pid:
+            names = [pid.replace("/", "_") + ".pdf", re.sub(r"v\d+$", "", pid).replace("/", "_") + ".pdf"] + names
+        for name in names:
+            path = os.path.join(self.pdf_dir, name)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def download(self, pid):
+        path = os.path.join(self.cache_dir, "pdf", pid.replace("/", "_") + ".pdf")
+        if os.path.exists(path):
+            return path
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            r = get_with_backoff(ARXIV_PDF_URL.format(pid), timeout=60, stream=True)
+            with r, open(tmp, "wb") as f:
+                for chunk in r.iter_content(chunk_size=256 * 1024):
+                    f.write(chunk)
+            os.replace(tmp, path)
+        except (requests.RequestException, OSError) as e:
+            print(f"⚠️ PDF download failed for arXiv {pid}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return None
+        instrumentation.add(pdfs_downloaded=1)
+        return path
+
+    def pdf_paths(self, papers):
+        """One local PDF path (or None) per paper."""
+        if self.pdf_dir:
+            return [self.local_pdf(p) for p in papers]
+        ids = [arxiv_id(p) for p in papers]
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            futures = [instrumentation.submit(pool, self.download, pid) if pid else None for pid in ids]
+            return [f.result() if f else None for f in futures]
+
+    # ---------------- Text ----------------
+    def extract(self, paths):
+        """{path: extraction} for every path, parsing uncached PDFs in a process pool."""
+        results, pending = {}, {}
+        for path in dict.fromkeys(p for p in paths if p):
+            cache_path = os.path.join(self.cache_dir, "text", f"{file_digest(path)}.json")
+            if os.path.exists(cache_path):
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    results[path] = json.load(f)
+            else:
+                pending[path] = cache_path
+
+        start = time.perf_counter()
+        worker_peak = 0.0
+        if pending:
+            # spawn: the parent may already hold torch threads, which do not survive fork
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending)),
+                                     mp_context=get_context("spawn")) as pool:
+                futures = {path: pool.submit(extract_pdf, path) for path in pending}
+                for path, future in futures.items():
+                    try:
+                        record = future.result()
+                    except ImportError:
+                        raise
+                    except Exception as e:
+                        print(f"⚠️ Could not extract {os.path.basename(path)}: {type(e).__name__}: {e}")
+                        continue
+                    worker_peak = max(worker_peak, record["peak_rss_mb"])
+                    results[path] = record
+                    tmp = f"{pending[path]}.{os.getpid()}.tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        json.dump(record, f)
+                    os.replace(tmp, pending[path])
+        elapsed = time.perf_counter() - start
+
+        parsed = sum(results[p]["pages"] for p in pending if p in results)
+        self.stats = {
+            "pdfs": len(results),
+            "pdfs_cached": len(results) - sum(p in results for p in pending),
+            "pages": sum(r["pages"] for r in results.values()),
+            "pages_parsed": parsed,
+            "extract_s": round(elapsed, 3),
+            "pages_per_s": round(parsed / elapsed, 1) if parsed and elapsed else None,
+            "peak_rss_mb": round(instrumentation.peak_rss_mb(), 1),
+            "worker_peak_rss_mb": worker_peak or None,
+        }
+        if pending:
+            print(f"📄 Extracted {parsed} pages from {len(pending)} PDFs in {elapsed:.1f}s "
+                  f"({self.stats['pages_per_s']} pages/s, {self.workers} workers, "
+                  f"{self.stats['pdfs_cached']} cached); peak RSS {self.stats['peak_rss_mb']} MB, "
+                  f"workers {worker_peak} MB")
+        return results
+
+    def documents(self, papers):
+        """Per paper: None (no PDF) or {"pages", "sections", "chunks": [(section, text)]}."""
+        return self.chunked(self.pdf_paths(papers))
+
+    def chunked(self, paths):
+        """Per PDF path (or None): the extracted document, split into section chunks."""
+        extracted = self.extract(paths)
+
+        docs = []
+        for path in paths:
+            record = extracted.get(path) if path else None
+            if record is None:
+                docs.append(None)
+                continue
+            sections = split_sections(record["text"])
+            docs.append({
+                "pages": record["pages"],
+                "sections": [name for name, _ in sections],
+                "chunks": chunk_sections(sections, self.max_words),
+            })
+        self.stats["chunks"] = sum(len(d["chunks"]) for d in docs if d)
+        return docs
+
+
+# ---------------- CLI: extract and chunk a local directory of PDFs ----------------
+def main():
+    parser = argparse.ArgumentParser(description="Extract and chunk a directory of PDFs")
+    parser.add_argument("pdf_dir")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-words", type=int, default=600)
+    parser.add_argument("--cache-dir", default=FULLTEXT_DIR)
+    args = parser.parse_args()
+
+    store = FullTextStore(cache_dir=args.cache_dir, pdf_dir=args.pdf_dir, workers=args.workers,
+                          max_words=args.max_words)
+    paths = sorted(glob.glob(os.path.join(args.pdf_dir, "*.pdf")))
+    for path, doc in zip(paths, store.chunked(paths)):
+        if doc:
+            print(f"   {os.path.basename(path)}: {doc['pages']} pages, {len(doc['chunks'])} chunks, "
+                  f"sections: {', '.join(doc['sections'])}")
+    print(json.dumps(store.stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
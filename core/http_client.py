@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from core import instrumentation
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_local = threading.local()
+
+
+def get_session(pool_size=10):
+    """
+    Pooled requests.Session, one per thread.
+    Sessions keep connections alive, so repeated calls to the same API skip
+    the TCP/TLS handshake.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0, retry_after=None):
+    """Exponential backoff with full jitter; a server-supplied Retry-After wins."""
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def get_with_backoff(url, params=None, timeout=25, retries=3, base_delay=1.0, max_delay=30.0, session=None,
+                     stream=False):
+    """
+    GET `url`, retrying connection errors, timeouts, 429s and 5xx responses.
+    Returns the successful response; raises requests.RequestException once
+    retries are exhausted or on a non-retryable HTTP error. With
+    `stream=True` the body is not downloaded up front; read it with
+    `iter_content` and close the response when done.
+    """
+    session = session or get_session()
+
+    for attempt in range(retries + 1):
+        instrumentation.add(http_requests=1)
+        try:
+            r = session.get(url, params=params, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            reason = type(e).__name__
+        else:
+            if r.status_code not in RETRYABLE_STATUS or attempt == retries:
+                try:
+                    r.raise_for_status()
+                except requests.HTTPError:
+                    # A streamed error body is never read; hand the connection back to the pool
+                    r.close()
+                    raise
+                return r
+            r.close()
+            delay = backoff_delay(attempt, base_delay, max_delay, retry_after_seconds(r))
+            reason = f"HTTP {r.status_code}"
+
+        instrumentation.add(http_retries=1)
+        print(f"⏳ {reason} from {url} — retry {attempt + 1}/{retries} in {delay:.1f}s")
+        time.sleep(delay)
@@ -0,0 +1,154 @@
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from core.model_registry import current_rss_mb
+
+LOG_DIR = "outputs/logs"
+LOG_PATH = os.path.join(LOG_DIR, "pipeline.jsonl")
+
+# Comma-separated stage names to profile, e.g. PROFILE_STAGE=summarize
+PROFILE_STAGES = {s for s in os.environ.get("PROFILE_STAGE", "").split(",") if s}
+# Use torch.profiler instead of cProfile for profiled stages
+PROFILE_TORCH = os.environ.get("PROFILE_TORCH") == "1"
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+_current = contextvars.ContextVar("stage", default=None)
+_write_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    """Peak RSS of the process so far, in MB."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Stage:
+    """Metrics of one running stage; counters may be bumped from any thread."""
+
+    def __init__(self, name, topic=None, **fields):
+        self.name = name
+        self.topic = topic
+        self.metrics = dict(fields)
+        self._lock = threading.Lock()
+
+    def add(self, **counters):
+        with self._lock:
+            for key, value in counters.items():
+                self.metrics[key] = self.metrics.get(key, 0) + value
+
+    def set(self, **fields):
+        with self._lock:
+            self.metrics.update(fields)
+
+
+def add(**counters):
+    """Add to the counters of the stage running in this context (no-op outside a stage)."""
+    current = _current.get()
+    if current is not None:
+        current.add(**counters)
+
+
+def submit(pool, fn, *args, **kwargs):
+    """pool.submit that carries the current stage into the worker thread."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def _write(record):
+    os.makedirs(LOG_DIR, exist_ok=True)
+    line = json.dumps(record, default=str)
+    with _write_lock:
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@contextmanager
+def _profiler(name):
+    if name not in PROFILE_STAGES:
+        yield
+        return
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if PROFILE_TORCH and "torch" in sys.modules:
+        from torch.profiler import ProfilerActivity, profile
+
+        with profile(activities=[ProfilerActivity.CPU], record_shapes=True) as prof:
+            yield
+        path = os.path.join(LOG_DIR, f"profile_{name}_{stamp}.json")
+        prof.export_chrome_trace(path)
+    else:
+        import cProfile
+
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+        path = os.path.join(LOG_DIR, f"profile_{name}_{stamp}.prof")
+        prof.dump_stats(path)
+    print(f"🔬 Profile for stage '{name}' → {path}")
+
+
+@contextmanager
+def stage(name, topic=None, **fields):
+    """
+    Instrument one pipeline stage.
+
+    Records wall time, CPU time of the calling thread, RSS and the process
+    peak RSS, plus any counters added while it runs (papers, http_retries,
+    prompt_tokens, response_tokens, ...). One JSON line per stage goes to
+    outputs/logs/pipeline.jsonl. Stages listed in PROFILE_STAGE are also
+    profiled.
+    """
+    current = Stage(name, topic, **fields)
+    token = _current.set(current)
+
+    rss_start = current_rss_mb()
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    status, error = "ok", None
+
+    try:
+        with _profiler(name):
+            yield current
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        wall = time.perf_counter() - wall_start
+        rss_end = current_rss_mb()
+
+        record = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "run_id": RUN_ID,
+            "stage": name,
+            "topic": topic,
+            "status": status,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(time.thread_time() - cpu_start, 4),
+            "rss_start_mb": round(rss_start, 1),
+            "rss_end_mb": round(rss_end, 1),
+            "peak_rss_mb": round(max(peak_rss_mb(), rss_end), 1),
+            **current.metrics,
+        }
+        if "papers" in current.metrics and wall > 0:
+            record["papers_per_s"] = round(current.metrics["papers"] / wall, 3)
+        if error:
+            record["error"] = error
+        _write(record)
@@ -0,0 +1,289 @@
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from core import instrumentation
+from core.context_packer import estimate_tokens
+from core.http_client import backoff_delay
+
+# Lower runs first: Streamlit jobs jump ahead of queued batch work
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+_priority = contextvars.ContextVar("llm_priority", default="batch")
+
+
+class RateLimitError(RuntimeError):
+    """An LLM call was rejected for quota (HTTP 429 / RESOURCE_EXHAUSTED)."""
+
+    def __init__(self, message="rate limited", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_rate_limit(error):
+    """True for our RateLimitError and the Gemini client's 429 exceptions."""
+    if isinstance(error, RateLimitError):
+        return True
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    return type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+@contextmanager
+def llm_priority(name):
+    """Run LLM calls made in this context (and pools fed by instrumentation.submit) at `name` priority."""
+    if name not in PRIORITIES:
+        raise ValueError(f"unknown LLM priority: {name} (choose from {', '.join(PRIORITIES)})")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to `capacity` (default: one
+    minute's worth). Not thread-safe; LLMScheduler guards it. per_minute=None
+    means unlimited.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if self.per_minute:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) * 60 / self.per_minute
+
+    def take(self, amount):
+        if self.per_minute:
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount):
+        """Charge (or refund, if negative) the difference between reserved and actual use."""
+        if self.per_minute:
+            self.level = min(self.capacity, self.level - amount)
+
+
+class LLMScheduler:
+    """
+    Admission control for every LLM call in the process.
+
+    A call waits until it is the highest-priority caller in the queue
+    (interactive before batch, then FIFO), a concurrency slot is free and
+    both the requests-per-minute and tokens-per-minute buckets can cover
+    it. Tokens are reserved up front (prompt estimate + `response_tokens`)
+    and reconciled with the actual reply afterwards.
+
+    Concurrency adapts AIMD-style: it grows by one after a full window of
+    calls whose latency per token stays within `latency_tolerance` x the
+    best seen, shrinks by one when latency climbs past that, and halves on
+    a 429. A 429 also pauses every caller for the Retry-After (or backoff)
+    delay before the call is retried, up to `retries` times.
+    """
+
+    def __init__(self, rpm=60, tpm=1_000_000, max_concurrency=16, min_concurrency=1, concurrency=4,
+                 response_tokens=1000, retries=4, latency_tolerance=2.0, base_delay=2.0, max_delay=60.0,
+                 burst_s=60):
+        # Buckets hold `burst_s` seconds of quota; match the provider's quota window
+        self.requests = TokenBucket(rpm, rpm * burst_s / 60 if rpm else None)
+        self.tokens = TokenBucket(tpm, tpm * burst_s / 60 if tpm else None)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max(min_concurrency, min(concurrency, max_concurrency))
+        self.response_tokens = response_tokens
+        self.retries = retries
+        self.latency_tolerance = latency_tolerance
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._window = 0
+        self._best_latency = None
+        self._metrics = {
+            "completed": 0, "rate_limited": 0, "retries": 0, "throttled_calls": 0,
+            "throttled_s": 0.0, "queued_s": 0.0, "latency_s": None,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """Limits from LLM_RPM, LLM_TPM and LLM_MAX_CONCURRENCY (0 = unlimited rate)."""
+        return cls(
+            rpm=int(os.environ.get("LLM_RPM", 60)) or None,
+            tpm=int(os.environ.get("LLM_TPM", 1_000_000)) or None,
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 16)),
+        )
+
+    # ---------------- Admission ----------------
+    def _acquire(self, tokens, priority):
+        ticket = (PRIORITIES[priority], next(self._seq))
+        start = time.perf_counter()
+        throttled = 0.0
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == ticket and self._in_flight < self.concurrency:
+                        now = time.monotonic()
+                        wait = max(self._paused_until - now,
+                                   self.requests.wait_time(1, now),
+                                   self.tokens.wait_time(tokens, now))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self._in_flight += 1
+                            break
+                        timeout = wait
+                    waited = time.perf_counter()
+                    self._cond.wait(timeout)
+                    if timeout is not None:
+                        throttled += time.perf_counter() - waited
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            queued = time.perf_counter() - start
+            self._metrics["queued_s"] += queued
+            if throttled:
+                self._metrics["throttled_calls"] += 1
+                self._metrics["throttled_s"] += throttled
+        instrumentation.add(llm_queued_s=round(queued, 3), llm_throttled_s=round(throttled, 3))
+
+    def _release(self, reserved, used, latency=None, rate_limited=False, retry_after=None, attempt=0):
+        with self._cond:
+            self._in_flight -= 1
+            self.tokens.adjust(used - reserved)
+            if rate_limited:
+                self._metrics["rate_limited"] += 1
+                self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+                self._window = 0
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            elif latency is not None:
+                self._observe(latency, used)
+            self._cond.notify_all()
+
+    def _observe(self, latency, tokens):
+        self._metrics["completed"] += 1
+        ewma = self._metrics["latency_s"]
+        self._metrics["latency_s"] = latency if ewma is None else 0.8 * ewma + 0.2 * latency
+
+        # Per token, so a long paper prompt is not mistaken for a slow endpoint
+        per_token = latency / max(tokens, 1)
+        self._best_latency = per_token if self._best_latency is None else min(self._best_latency, per_token)
+        if per_token > self._best_latency * self.latency_tolerance:
+            # The endpoint is slowing down: back off before it starts refusing
+            self.concurrency = max(self.min_concurrency, self.concurrency - 1)
+            self._window = 0
+            return
+        self._window += 1
+        if self._window >= self.concurrency:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            self._window = 0
+
+    # ---------------- Calls ----------------
+    def call(self, fn, prompt_tokens, priority=None):
+        """Run fn() once admitted; fn returns the reply text. 429s are retried here."""
+        priority = priority or _priority.get()
+        reserved = prompt_tokens + self.response_tokens
+        for attempt in range(self.retries + 1):
+            self._acquire(reserved, priority)
+            start = time.perf_counter()
+            try:
+                text = fn()
+            except Exception as e:
+                limited = is_rate_limit(e)
+                self._release(reserved, prompt_tokens, rate_limited=limited,
+                              retry_after=getattr(e, "retry_after", None), attempt=attempt)
+                if not limited or attempt == self.retries:
+                    raise
+                self._retrying(attempt)
+                continue
+            self._release(reserved, prompt_tokens + estimate_tokens(text), time.perf_counter() - start)
+            return text
+
+    def stream(self, fn, prompt_tokens, priority=None):
+        """
+        Yield chunks of fn() (a chunk iterator) while holding one slot. A
+        429 before the first chunk is retried; after it, it is raised.
+        """
+        priority = priority or _priority.get()
+        reserved = prompt_tokens + self.response_tokens
+        for attempt in range(self.retries + 1):
+            self._acquire(reserved, priority)
+            start = time.perf_counter()
+            chunks = []
+            try:
+                for chunk in fn():
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                limited = is_rate_limit(e)
+                self._release(reserved, prompt_tokens + estimate_tokens("".join(chunks)), rate_limited=limited,
+                              retry_after=getattr(e, "retry_after", None), attempt=attempt)
+                if not limited or chunks or attempt == self.retries:
+                    raise
+                self._retrying(attempt)
+                continue
+            except BaseException:
+                # Consumer closed the stream early
+                self._release(reserved, prompt_tokens + estimate_tokens("".join(chunks)))
+                raise
+            self._release(reserved, prompt_tokens + estimate_tokens("".join(chunks)), time.perf_counter() - start)
+            return
+
+    def _retrying(self, attempt):
+        with self._cond:
+            self._metrics["retries"] += 1
+        instrumentation.add(llm_rate_limited=1)
+        print(f"⏳ LLM rate limited — retry {attempt + 1}/{self.retries} "
+              f"(concurrency now {self.concurrency})")
+
+    # ---------------- Metrics ----------------
+    def stats(self):
+        with self._cond:
+            queued = [p for p, _ in self._waiting]
+            return {
+                **self._metrics,
+                "queue_depth": len(queued),
+                "queued_interactive": queued.count(PRIORITIES["interactive"]),
+                "queued_batch": queued.count(PRIORITIES["batch"]),
+                "in_flight": self._in_flight,
+                "concurrency": self.concurrency,
+                "paused_s": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by every LLM backend (limits from the environment)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler.from_env()
+        return _scheduler
@@ -0,0 +1,201 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (0.0 if it cannot be read)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+def model_size_mb(model):
+    """
+    Parameter and buffer bytes of a torch module (or of every module in a
+    tuple such as (tokenizer, model)); None if there is nothing to count.
+    """
+    parts = model if isinstance(model, tuple) else (model,)
+    total, counted = 0, False
+    for part in parts:
+        if not (hasattr(part, "parameters") and hasattr(part, "buffers")):
+            continue
+        try:
+            tensors = [*part.parameters(), *part.buffers()]
+        except TypeError:
+            continue
+        total += sum(t.numel() * t.element_size() for t in tensors)
+        counted = True
+    return total / (1024 * 1024) if counted else None
+
+
+class ModelRegistry:
+    """
+    Process-wide store of loaded models.
+
+    Each model is loaded by its `loader` the first time it is requested and
+    reused afterwards (across agents, runs and Streamlit reruns). Callers
+    that keep a model around take it with `acquire` (or `hold`) and give it
+    back with `release`. When the process RSS goes over `max_rss_mb`, the
+    least recently used models with no holders are unloaded until it fits
+    again. Eviction stops early once dropping a model no longer lowers RSS,
+    since reloading it later would cost more than it saved.
+    """
+
+    def __init__(self, max_rss_mb=None):
+        self.max_rss_mb = max_rss_mb
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks = {}
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry["uses"] += 1
+        return entry
+
+    def get(self, key, loader):
+        """The model for `key`, loading it if needed; not held, so it can be evicted."""
+        return self._get(key, loader, hold=False)
+
+    def acquire(self, key, loader):
+        """Like get(), but the model is not evicted until `release(key)`."""
+        return self._get(key, loader, hold=True)
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["holders"]:
+                entry["holders"] -= 1
+            self._enforce_budget()
+
+    @contextmanager
+    def hold(self, key, loader):
+        model = self.acquire(key, loader)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def _get(self, key, loader, hold):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                entry["holders"] += hold
+                return entry["model"]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available,
+        # but never load the same key twice concurrently.
+        with key_lock:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    entry["holders"] += hold
+                    return entry["model"]
+
+            before = current_rss_mb()
+            start = time.perf_counter()
+            model = loader()
+            load_time = time.perf_counter() - start
+            after = current_rss_mb()
+
+            # Weight bytes when the model exposes them; else the RSS growth
+            # across the load (skewed if another model loads concurrently)
+            size = model_size_mb(model)
+            with self._lock:
+                self._entries[key] = {
+                    "model": model,
+                    "load_time_s": load_time,
+                    "model_mb": size if size is not None else max(after - before, 0.0),
+                    "process_rss_mb": after,
+                    "loaded_at": time.time(),
+                    "uses": 1,
+                    "holders": int(hold),
+                }
+                print(f"📦 Registry loaded {key} in {load_time:.1f}s "
+                      f"({self._entries[key]['model_mb']:.0f} MB, process RSS {after:.0f} MB)")
+                self._enforce_budget(keep=key)
+            return model
+
+    def _enforce_budget(self, keep=None):
+        if not self.max_rss_mb:
+            return
+        rss = current_rss_mb()
+        while rss > self.max_rss_mb:
+            idle = [k for k, e in self._entries.items() if k != keep and not e["holders"]]
+            if not idle:
+                return
+            self._drop(idle[0])
+            after = current_rss_mb()
+            print(f"🧹 Registry evicted {idle[0]} (RSS {rss:.0f} → {after:.0f} MB, "
+                  f"budget {self.max_rss_mb} MB)")
+            if after >= rss:
+                # The allocator kept the pages; evicting more would only force reloads
+                return
+            rss = after
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        gc.collect()
+
+    def unload(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            gc.collect()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def stats(self):
+        """Load time, own size and process RSS after loading, for every loaded model, LRU first."""
+        with self._lock:
+            return [
+                {
+                    "key": key,
+                    "load_time_s": round(e["load_time_s"], 3),
+                    "model_mb": round(e["model_mb"], 1),
+                    "process_rss_mb": round(e["process_rss_mb"], 1),
+                    "uses": e["uses"],
+                    "holders": e["holders"],
+                    "loaded_at": e["loaded_at"],
+                }
+                for key, e in self._entries.items()
+            ]
+
+
+registry = ModelRegistry(
+    max_rss_mb=float(os.environ.get("MODEL_REGISTRY_MAX_RSS_MB", 0)) or None
+)
+
+
+def get_gemini_model(name="gemini-2.5-flash"):
+    """Shared Gemini client; genai.configure runs once per process."""
+
+    def load():
+        import google.generativeai as genai
+        from core.config import GEMINI_API_KEY
+
+        genai.configure(api_key=GEMINI_API_KEY)
+        return genai.GenerativeModel(name)
+
+    return registry.get(("gemini", name), load)
@@ -0,0 +1,116 @@
+import re
+
+from core.utils import normalize_title
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "using", "via", "was", "we", "were",
+    "which", "with",
+}
+
+
+def words(text):
+    """Lowercase content words with a crude plural strip ("agents" → "agent")."""
+    out = []
+    for w in WORD_PATTERN.findall((text or "").lower()):
+        if w in STOPWORDS:
+            continue
+        out.append(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w)
+    return out
+
+
+def char_ngrams(text, n=3):
+    text = f" {normalize_title(text)} "
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def tfidf(docs, analyzer=words):
+    """L2-normalised TF-IDF rows (NumPy array, one row per doc) and the vocabulary."""
+    import numpy as np
+
+    vocab = {}
+    rows = []
+    for doc in docs:
+        counts = {}
+        for term in analyzer(doc):
+            idx = vocab.setdefault(term, len(vocab))
+            counts[idx] = counts.get(idx, 0) + 1
+        rows.append(counts)
+
+    matrix = np.zeros((len(docs), max(len(vocab), 1)), dtype=np.float32)
+    for i, counts in enumerate(rows):
+        if counts:
+            matrix[i, list(counts)] = list(counts.values())
+
+    df = (matrix > 0).sum(axis=0)
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1
+    matrix = np.log1p(matrix) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms), vocab
+
+
+class RelevanceRanker:
+    """
+    Collapses near-duplicate papers and ranks the rest by relevance to the
+    topic, so only the top `limit` distinct papers reach summarization and
+    the LLM prompts.
+
+    Papers are compared by TF-IDF cosine over title + abstract, and by
+    character-trigram cosine over titles (the same paper from Semantic
+    Scholar and arXiv often differs only in punctuation or a subtitle).
+    Relevance is the TF-IDF cosine between the topic and each paper, with
+    the title counted twice.
+    """
+
+    def __init__(self, duplicate_threshold=0.8, title_threshold=0.9):
+        self.duplicate_threshold = duplicate_threshold
+        self.title_threshold = title_threshold
+
+    def config(self):
+        return {"duplicate_threshold": self.duplicate_threshold, "title_threshold": self.title_threshold}
+
+    def rank(self, papers, topic, limit=None):
+        """
+        Return (papers, stats): the top `limit` distinct papers, most
+        relevant first, each with a `relevance` score.
+        """
+        import numpy as np
+
+        papers = list(papers)
+        stats = {"candidates": len(papers), "near_duplicates": 0, "dropped": 0}
+        if not papers:
+            return [], stats
+
+        texts = [f"{p.get('title') or ''} {p.get('title') or ''} {p.get('abstract') or ''}" for p in papers]
+        # The topic is the last row so it shares the corpus IDF
+        matrix, _ = tfidf(texts + [topic])
+        docs, query = matrix[:-1], matrix[-1]
+
+        relevance = docs @ query
+        content_sim = docs @ docs.T
+        titles, _ = tfidf([p.get("title") or "" for p in papers], analyzer=char_ngrams)
+        title_sim = titles @ titles.T
+
+        # Most relevant first; ties keep fetch order
+        order = np.argsort(-relevance, kind="stable")
+        kept = []
+        for i in order:
+            twin = next(
+                (k for k in kept
+                 if content_sim[i, k] >= self.duplicate_threshold or title_sim[i, k] >= self.title_threshold),
+                None
+            )
+            if twin is None:
+                kept.append(i)
+                continue
+            stats["near_duplicates"] += 1
+            # Keep the best-ranked copy, but borrow a longer abstract if the twin has one
+            if len(papers[i].get("abstract") or "") > len(papers[twin].get("abstract") or ""):
+                papers[twin] = {**papers[twin], "abstract": papers[i]["abstract"]}
+
+        selected = kept[:limit] if limit is not None else kept
+        stats["dropped"] = len(kept) - len(selected)
+        ranked = [{**papers[i], "relevance": round(float(relevance[i]), 4)} for i in selected]
+        return ranked, stats
@@ -0,0 +1,174 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from core.document import PaperDocument
+
+# reportlab is imported inside the PDF functions so Markdown/JSON rendering
+# and importing this module stay cheap
+
+PAGE_MARGINS = {"leftMargin": 40, "rightMargin": 40, "topMargin": 50, "bottomMargin": 40}
+
+_local = threading.local()
+
+
+# --------------------- Fonts & Styles ---------------------
+
+@lru_cache(maxsize=None)
+def default_font():
+    """Register Times New Roman on first use; fall back to Helvetica."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    try:
+        pdfmetrics.registerFont(TTFont("TimesNewRoman", "times.ttf"))
+        return "TimesNewRoman"
+    except Exception:
+        return "Helvetica"
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    """IEEE paragraph styles, built once per process."""
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+
+    base = ParagraphStyle(
+        "Base",
+        parent=styles["Normal"],
+        fontName=default_font(),
+        fontSize=10,
+        leading=12,
+        alignment=TA_JUSTIFY,
+    )
+
+    return {
+        "base": base,
+        "title": ParagraphStyle("Title", parent=base, fontSize=18, alignment=TA_CENTER, spaceAfter=10),
+        "author": ParagraphStyle("Author", parent=base, alignment=TA_CENTER, spaceAfter=6),
+        "heading": ParagraphStyle("Heading", parent=base, fontSize=12, spaceBefore=10, spaceAfter=4),
+    }
+
+
+def _draw_page_number(canvas, doc):
+    canvas.drawRightString(570, 20, str(doc.page))
+
+
+def _page_template():
+    """
+    Two-column page template, cached per thread. Frames keep layout state
+    while a document builds, so threads rendering at once must not share one.
+    """
+    template = getattr(_local, "page_template", None)
+    if template is None:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import Frame, PageTemplate
+
+        width = A4[0] - PAGE_MARGINS["leftMargin"] - PAGE_MARGINS["rightMargin"]
+        height = A4[1] - PAGE_MARGINS["topMargin"] - PAGE_MARGINS["bottomMargin"]
+        left, bottom = PAGE_MARGINS["leftMargin"], PAGE_MARGINS["bottomMargin"]
+
+        template = PageTemplate(
+            id="TwoCol",
+            frames=[
+                Frame(left, bottom, width / 2 - 6, height, id="col1"),
+                Frame(left + width / 2 + 6, bottom, width / 2 - 6, height, id="col2"),
+            ],
+            onPage=_draw_page_number
+        )
+        _local.page_template = template
+    return template
+
+
+# --------------------- Renderers ---------------------
+
+def render_pdf(doc: PaperDocument, path: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import BaseDocTemplate, Paragraph, Spacer
+
+    styles = pdf_styles()
+
+    pdf = BaseDocTemplate(path, pagesize=A4, **PAGE_MARGINS)
+    pdf.addPageTemplates([_page_template()])
+
+    story = [Paragraph(doc.title, styles["title"])]
+
+    # --------------------- AUTHOR PLACEHOLDERS ---------------------
+    for i, gap in ((1, 6), (2, 14)):
+        story.append(Paragraph(f"Author Name {i}", styles["author"]))
+        story.append(Paragraph("Department / University", styles["author"]))
+        story.append(Paragraph("email@domain.com", styles["author"]))
+        story.append(Spacer(1, gap))
+
+    # One 6pt spacer per blank line of the source text, as in the original layout
+    story.extend(Spacer(1, 6) for _ in range(doc.leading_gaps))
+    for section in doc.sections:
+        if section.heading:
+            story.append(Paragraph(f"<b>{section.heading}</b>", styles["heading"]))
+        gaps = section.gaps or [0] * (len(section.paragraphs) + 1)
+        for gap, paragraph in zip(gaps, section.paragraphs):
+            story.extend(Spacer(1, 6) for _ in range(gap))
+            story.append(Paragraph(paragraph, styles["base"]))
+        story.extend(Spacer(1, 6) for _ in range(gaps[-1]))
+
+    story.append(Spacer(1, 10))
+    story.append(Paragraph("<b>References</b>", styles["heading"]))
+    for ref in doc.references:
+        story.append(Paragraph(ref, styles["base"]))
+
+    pdf.build(story)
+    return path
+
+
+def render_markdown(doc: PaperDocument, path: str):
+    # Same shape as the checked-in outputs/*.md: "# Title", "## Heading" directly
+    # above its first paragraph, blank lines between paragraphs, plain "References"
+    blocks = [f"# {doc.title}"]
+    for section in doc.sections:
+        paragraphs = list(section.paragraphs)
+        if section.heading:
+            blocks.append("\n".join([f"## {section.heading}"] + paragraphs[:1]))
+            paragraphs = paragraphs[1:]
+        blocks.extend(paragraphs)
+
+    blocks.append("References")
+    if doc.references:
+        blocks.append("\n".join(doc.references))
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(blocks) + "\n")
+    return path
+
+
+def render_json(doc: PaperDocument, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc.to_dict(), f, indent=2, ensure_ascii=False)
+    return path
+
+
+RENDERERS = {
+    "pdf": render_pdf,
+    "md": render_markdown,
+    "json": render_json,
+}
+
+
+def render(doc: PaperDocument, paths: dict, concurrent: bool = False):
+    """
+    Render `doc` to every format in `paths` ({"pdf": path, "md": path, ...}).
+    With `concurrent`, formats render on separate threads.
+    """
+    unknown = set(paths) - set(RENDERERS)
+    if unknown:
+        raise ValueError(f"unknown output format(s): {', '.join(sorted(unknown))}")
+
+    if not concurrent or len(paths) == 1:
+        return {fmt: RENDERERS[fmt](doc, path) for fmt, path in paths.items()}
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        futures = {fmt: pool.submit(RENDERERS[fmt], doc, path) for fmt, path in paths.items()}
+        return {fmt: future.result() for fmt, future in futures.items()}
+
@@ -0,0 +1,137 @@
+"""
+Summarizer backends for LiteratureAgent.
+
+A summarizer is (model, backend, decoding profile):
+
+- model: a Hugging Face BART checkpoint, or a preset name from MODEL_PRESETS
+- backend: how the weights run. "torch" is plain fp32, "int8" applies
+  dynamic int8 quantization to the Linear layers (CPU only), and "onnx"
+  exports to ONNX Runtime through optimum (requirements-optional.txt);
+  the export is done once per model and kept under ONNX_CACHE_DIR
+- decoding: a named set of generate() kwargs from DECODING_PROFILES
+
+Everything heavy is imported by `load_summarizer`, not by this module.
+"""
+
+import os
+import re
+import shutil
+
+DEFAULT_MODEL = "facebook/bart-large-cnn"
+
+# The distilled presets are smaller and faster, but they are not quality-
+# equivalent to the default: their summaries differ from the checked-in ones.
+#
+# Measurements: PENDING. No speed or ROUGE numbers have been recorded yet for
+# any preset, backend (int8, onnx) or decoding profile, because the benchmark
+# has not yet been run with the checkpoints downloaded. Until it has, treat
+# every non-default configuration as unvalidated. To fill this in, run
+#     python -m benchmarks.run --only summarizers
+# with the checkpoints in the Hugging Face cache and copy the load time,
+# papers/s and ROUGE-1/2/L per configuration from the report here.
+MODEL_PRESETS = {
+    "default": DEFAULT_MODEL,
+    "distilled": "sshleifer/distilbart-cnn-12-6",
+    "distilled-small": "sshleifer/distilbart-cnn-6-6",
+}
+
+BACKENDS = ("torch", "int8", "onnx")
+
+ONNX_CACHE_DIR = "data/cache/onnx"
+
+# The "default" profile is what produced the checked-in summaries
+DECODING_PROFILES = {
+    "default": {
+        "num_beams": 4,
+        "max_length": 130,
+        "min_length": 30,
+        "no_repeat_ngram_size": 3,
+        "early_stopping": True,
+    },
+    "reduced_beams": {
+        "num_beams": 2,
+        "max_length": 130,
+        "min_length": 30,
+        "no_repeat_ngram_size": 3,
+        "early_stopping": True,
+    },
+    "greedy": {
+        "num_beams": 1,
+        "max_length": 130,
+        "min_length": 30,
+        "no_repeat_ngram_size": 3,
+    },
+}
+
+
+def resolve_model(name):
+    return MODEL_PRESETS.get(name, name)
+
+
+def summarizer_id(model_name, backend="torch"):
+    """Identity used for summary cache keys; fp32 torch keeps the bare model name."""
+    return model_name if backend == "torch" else f"{model_name}+{backend}"
+
+
+def decoding_kwargs(profile):
+    try:
+        return dict(DECODING_PROFILES[profile])
+    except KeyError:
+        raise ValueError(f"unknown decoding profile: {profile} (choose from {', '.join(DECODING_PROFILES)})")
+
+
+def onnx_export(model_name, model_class, cache_dir=ONNX_CACHE_DIR):
+    """
+    Directory holding `model_name` exported to ONNX. The export is slow
+    (minutes for bart-large), so it runs once per model name and later
+    loads read the saved graphs.
+    """
+    path = os.path.join(cache_dir, re.sub(r"\W+", "_", model_name).strip("_"))
+    if os.path.isdir(path):
+        return path
+
+    print(f"📦 Exporting {model_name} to ONNX (one-time) → {path}")
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        model_class.from_pretrained(model_name, export=True).save_pretrained(tmp)
+        os.replace(tmp, path)
+    except OSError:
+        # Another process finished the same export first
+        if not os.path.isdir(path):
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def load_summarizer(model_name, backend="torch", device="cpu"):
+    """Load (tokenizer, model) for `backend`; the model exposes generate()."""
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown summarizer backend: {backend} (choose from {', '.join(BACKENDS)})")
+
+    from transformers import BartTokenizer
+
+    tokenizer = BartTokenizer.from_pretrained(model_name)
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise ImportError("the onnx summarizer backend needs `pip install optimum[onnxruntime]`") from e
+        model = ORTModelForSeq2SeqLM.from_pretrained(onnx_export(model_name, ORTModelForSeq2SeqLM))
+        return tokenizer, model.to(device)
+
+    import torch
+    from transformers import BartForConditionalGeneration
+
+    model = BartForConditionalGeneration.from_pretrained(model_name)
+    model.eval()
+
+    if backend == "int8":
+        if device != "cpu":
+            raise ValueError("int8 dynamic quantization only runs on CPU")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return tokenizer, model
+
+    return tokenizer, model.to(device)
@@ -0,0 +1,164 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SummaryCache:
+    """
+    Persistent, content-addressed cache of abstract summaries.
+
+    Entries are keyed by (model name, generation parameters, sha256 of the
+    abstract) and stored in a small SQLite file. The cache is bounded to
+    `max_entries`; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, path="data/cache/summaries.sqlite", max_entries=20000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                model_name TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used);
+            CREATE TABLE IF NOT EXISTS imported_files (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    # ---------------- Keys ----------------
+    @staticmethod
+    def make_key(model_name, generation_kwargs, abstract):
+        params = json.dumps(generation_kwargs or {}, sort_keys=True)
+        digest = hashlib.sha256((abstract or "").encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model_name}\0{params}\0{digest}".encode("utf-8")).hexdigest()
+
+    # ---------------- Lookup ----------------
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """Return {key: summary} for every cached key and refresh its LRU stamp."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE summaries SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in found]
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    # ---------------- Store ----------------
+    def put(self, key, model_name, summary):
+        self.put_many([(key, model_name, summary)])
+
+    def put_many(self, items):
+        """Store (key, model_name, summary) triples, then evict down to max_entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO summaries (key, model_name, summary, last_used) VALUES (?, ?, ?, ?)",
+                [(k, m, s, now) for k, m, s in items]
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN "
+                "(SELECT key FROM summaries ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            )
+
+    # ---------------- Invalidation ----------------
+    def invalidate(self, model_name=None):
+        """Drop every entry, or only the ones produced by `model_name`."""
+        with self._lock:
+            if model_name is None:
+                self._conn.execute("DELETE FROM summaries")
+            else:
+                self._conn.execute("DELETE FROM summaries WHERE model_name = ?", (model_name,))
+            self._conn.commit()
+
+    # ---------------- Seeding ----------------
+    def import_summaries(self, summary_dir, model_name, generation_kwargs):
+        """
+        Seed the cache from `<summary_dir>/*_summaries.json`.
+        Each file is imported once (and again only if it changes on disk),
+        so invalidated entries are not silently restored.
+        """
+        items = []
+        for path in sorted(glob.glob(os.path.join(summary_dir, "*_summaries.json"))):
+            mtime = os.path.getmtime(path)
+            row = self._conn.execute(
+                "SELECT mtime FROM imported_files WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[0] == mtime:
+                continue
+
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    papers = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            for p in papers if isinstance(papers, list) else []:
+                if isinstance(p, dict) and p.get("summary"):
+                    key = self.make_key(model_name, generation_kwargs, p.get("abstract", ""))
+                    items.append((key, model_name, p["summary"]))
+
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO imported_files (path, mtime) VALUES (?, ?)", (path, mtime)
+                )
+
+        if items:
+            self.put_many(items)
+        else:
+            with self._lock:
+                self._conn.commit()
+        return len(items)
+
+    # ---------------- Stats ----------------
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
@@ -0,0 +1,142 @@
+import re
+
+# Sentence boundary: end punctuation followed by whitespace and an uppercase letter/digit
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9])")
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "we", "were", "which", "with",
+}
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_PATTERN.split(text.strip()) if s.strip()]
+
+
+def textrank_summary(text, max_words=100, damping=0.85, iterations=50, tol=1e-6):
+    """
+    Extractive summary: rank sentences with PageRank over their cosine
+    similarity graph and keep the best ones, in original order, up to
+    `max_words`.
+    """
+    import numpy as np
+
+    sentences = split_sentences(text)
+    if len(sentences) <= 2:
+        return text.strip()
+
+    vocab = {}
+    rows = []
+    for sentence in sentences:
+        counts = {}
+        for word in WORD_PATTERN.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                idx = vocab.setdefault(word, len(vocab))
+                counts[idx] = counts.get(idx, 0) + 1
+        rows.append(counts)
+
+    tf = np.zeros((len(sentences), max(len(vocab), 1)))
+    for i, counts in enumerate(rows):
+        for idx, count in counts.items():
+            tf[i, idx] = count
+
+    norms = np.linalg.norm(tf, axis=1, keepdims=True)
+    unit = tf / np.where(norms == 0, 1, norms)
+    sim = unit @ unit.T
+    np.fill_diagonal(sim, 0.0)
+
+    # Row-normalise into a transition matrix; isolated sentences jump uniformly
+    out = sim.sum(axis=1, keepdims=True)
+    transition = np.where(out > 0, sim / np.where(out == 0, 1, out), 1.0 / len(sentences))
+
+    n = len(sentences)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * transition.T @ scores
+        if np.abs(updated - scores).sum() < tol:
+            scores = updated
+            break
+        scores = updated
+
+    chosen, words = [], 0
+    for i in np.argsort(-scores, kind="stable"):
+        length = len(sentences[i].split())
+        if chosen and words + length > max_words:
+            continue
+        chosen.append(i)
+        words += length
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def normalize_abstract(text):
+    return " ".join(WORD_PATTERN.findall((text or "").lower()))
+
+
+class SummaryRouter:
+    """
+    Decides which tier summarizes each abstract, cheapest first:
+
+    - empty:       no abstract, nothing to summarize
+    - passthrough: already about summary length, kept as is
+    - duplicate:   same text as an earlier abstract in the batch, reuses its summary
+    - extractive:  medium length, NumPy TextRank
+    - model:       everything longer goes to BART
+
+    Lengths are in words; with the default decoding BART writes at most
+    130 tokens (~100 words).
+    """
+
+    TIERS = ("empty", "passthrough", "duplicate", "extractive", "model")
+
+    def __init__(self, passthrough_words=100, extractive_words=180, summary_words=100):
+        self.passthrough_words = passthrough_words
+        self.extractive_words = extractive_words
+        self.summary_words = summary_words
+
+    def config(self):
+        return {
+            "passthrough_words": self.passthrough_words,
+            "extractive_words": self.extractive_words,
+            "summary_words": self.summary_words,
+        }
+
+    def tier(self, abstract):
+        words = len((abstract or "").split())
+        if words == 0:
+            return "empty"
+        if words <= self.passthrough_words:
+            return "passthrough"
+        if words <= self.extractive_words:
+            return "extractive"
+        return "model"
+
+    def plan(self, abstracts):
+        """
+        Return (tiers, sources): the tier of every abstract, and for
+        duplicates the index of the first abstract with the same text
+        (otherwise the abstract's own index).
+        """
+        tiers, sources, first = [], [], {}
+        for i, abstract in enumerate(abstracts):
+            tier = self.tier(abstract)
+            key = normalize_abstract(abstract)
+            if tier != "empty" and key in first:
+                tiers.append("duplicate")
+                sources.append(first[key])
+                continue
+            if tier != "empty":
+                first[key] = i
+            tiers.append(tier)
+            sources.append(i)
+        return tiers, sources
+
+    def summarize_cheap(self, abstract, tier):
+        """Summary for the tiers that never touch the model."""
+        if tier == "empty":
+            return ""
+        if tier == "passthrough":
+            return abstract.strip()
+        if tier == "extractive":
+            return textrank_summary(abstract, max_words=self.summary_words)
+        raise ValueError(f"tier {tier!r} needs the model")
@@ -0,0 +1,133 @@
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+
+TAXONOMY_PATH = "data/taxonomy.json"
+
+# Abstracts and aliases are matched as lowercase alphanumeric tokens, so
+# "CIFAR-10", "cifar 10" and "Cifar_10" are the same phrase and "rnn" never
+# matches inside "srnnet".
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TaxonomyMatcher:
+    """
+    Multi-pattern matcher over a taxonomy of named entities.
+
+    The taxonomy maps categories (datasets, models, metrics, ...) to
+    canonical names and their aliases. Every alias is compiled into one
+    Aho-Corasick automaton over word tokens, so an abstract is scanned once
+    however large the vocabulary is. Overlapping hits resolve
+    leftmost-longest ("random forest regression" is not also "random
+    forest" + "regression" if the longer phrase is known).
+    """
+
+    def __init__(self, taxonomy):
+        self.categories = list(taxonomy)
+        self.entries = []                   # pattern id → (category, canonical name)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]                    # state → [(pattern id, length in tokens)]
+        self._vocab = set()
+
+        for category, names in taxonomy.items():
+            for canonical, aliases in names.items():
+                pid = len(self.entries)
+                self.entries.append((category, canonical))
+                for alias in {canonical, *aliases}:
+                    self._add(tokenize(alias), pid)
+        self._build()
+
+    @classmethod
+    def load(cls, path=TAXONOMY_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ---------------- Automaton ----------------
+    def _add(self, tokens, pid):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._vocab.update(tokens)
+        if all(p != pid for p, _ in self._out[state]):
+            self._out[state].append((pid, len(tokens)))
+
+    def _build(self):
+        # Breadth-first: a state's failure link points at its longest proper
+        # suffix that is also a prefix of some alias
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and token not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    # ---------------- Matching ----------------
+    def _hits(self, tokens):
+        goto, fail, out, vocab = self._goto, self._fail, self._out, self._vocab
+        hits = []
+        state = 0
+        for i, token in enumerate(tokens):
+            if token not in vocab:
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for pid, length in out[state]:
+                hits.append((i - length + 1, -length, pid))
+        return hits
+
+    def match(self, text):
+        """Return {category: [canonical names]} for one text, in order of appearance."""
+        found = {c: [] for c in self.categories}
+        end = 0
+        for start, neg_length, pid in sorted(self._hits(tokenize(text or ""))):
+            if start < end:
+                continue
+            end = start - neg_length
+            category, canonical = self.entries[pid]
+            if canonical not in found[category]:
+                found[category].append(canonical)
+        return found
+
+    def match_many(self, texts):
+        """Bulk API: one result dict per text."""
+        return [self.match(t) for t in texts]
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path=TAXONOMY_PATH):
+    """Compiled matcher for a taxonomy file, built once per process."""
+    return TaxonomyMatcher.load(path)
+
+
+# ---------------- CLI: tag text from argv or stdin ----------------
+if __name__ == "__main__":
+    matcher = load_taxonomy()
+    text = " ".join(sys.argv[1:]) or sys.stdin.read()
+    start = time.perf_counter()
+    result = matcher.match(text)
+    print(f"🏷️ {len(matcher)} taxonomy entries, matched in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(json.dumps(result, indent=2))
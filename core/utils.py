@@ -3,3 +3,8 @@ import re
 def sanitize_filename(name):
     """Sanitize topic name for safe file saving."""
     return re.sub(r'[^a-zA-Z0-9_\-]', '_', name)
+
+
+def normalize_title(title):
+    """Lowercase a paper title and collapse punctuation/whitespace for matching."""
+    return re.sub(r'\W+', ' ', (title or '').lower()).strip()
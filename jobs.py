@@ -0,0 +1,293 @@
+import itertools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.checkpoints import STAGES, StageCheckpoints
+from core.corpus import PaperCorpus
+from core.llm_scheduler import llm_priority
+from core.logger import log
+from core.summary_cache import SummaryCache
+from agents.literature_agent import LiteratureAgent
+from agents.experiment_agent import ExperimentAgent
+from agents.paper_agent import PaperAgent
+
+ACTIVE = ("queued", "running")
+
+
+class Job:
+    """One pipeline run; every field is safe to read from another thread via snapshot()."""
+
+    def __init__(self, job_id, topic, mode, limit, options):
+        self.id = job_id
+        self.topic = topic
+        self.mode = mode
+        self.limit = limit
+        self.options = options
+        self.status = "queued"
+        self.stages = {name: {"status": "pending", "seconds": None} for name in STAGES}
+        self.sections = []
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.subscribers = 1
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        return job_key(self.topic, self.mode, self.limit, self.options)
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def set_stage(self, name, status, seconds=None):
+        with self._lock:
+            self.stages[name] = {"status": status, "seconds": seconds}
+
+    def add_section(self, heading, body):
+        with self._lock:
+            self.sections.append((heading, body))
+
+    def snapshot(self):
+        with self._lock:
+            done = sum(s["status"] in ("done", "reused", "streamed") for s in self.stages.values())
+            return {
+                "id": self.id,
+                "topic": self.topic,
+                "mode": self.mode,
+                "limit": self.limit,
+                "status": self.status,
+                "progress": done / len(self.stages),
+                "stages": {name: dict(s) for name, s in self.stages.items()},
+                "sections": list(self.sections),
+                "result": self.result,
+                "error": self.error,
+                "subscribers": self.subscribers,
+                "queued_s": round((self.started or time.time()) - self.submitted, 1),
+                "elapsed_s": round((self.finished or time.time()) - self.started, 1) if self.started else None,
+            }
+
+
+def normalize_options(options):
+    """Options with unset (None) values dropped, recursively, so omitted and None compare equal."""
+    if isinstance(options, dict):
+        return {k: normalize_options(v) for k, v in options.items() if v is not None}
+    if isinstance(options, (list, tuple)):
+        return [normalize_options(v) for v in options]
+    return options
+
+
+def job_key(topic, mode, limit, options=None):
+    """Requests share a job only when the topic and every setting that shapes the result match."""
+    settings = json.dumps(normalize_options(options or {}), sort_keys=True, default=str)
+    return (" ".join(topic.lower().split()), mode, limit, settings)
+
+
+def topic_slug(topic):
+    """The name the agents' per-topic output and checkpoint paths are derived from."""
+    return re.sub(r"\W+", "_", topic.lower()).strip("_")
+
+
+class JobQueue:
+    """
+    Local job queue for the Streamlit app.
+
+    Jobs run on a bounded worker pool inside this process, so every session
+    shares the model registry (one BART copy), the summary cache and the
+    paper corpus. Submitting a (topic, mode, limit, options) that is already
+    queued or running returns the in-flight job instead of starting another.
+    Jobs for the same topic with different settings run one at a time,
+    since they write the same outputs/<topic>_* files and checkpoints; a
+    job whose topic is busy waits outside the pool, so it never holds a
+    worker that another topic could use.
+    Finished artifacts are cached by the stage checkpoints, so repeating a
+    finished request only reruns stages whose inputs changed. Callers poll
+    `get(job_id).snapshot()` for per-stage progress.
+    """
+
+    def __init__(self, max_workers=2, keep_finished=100):
+        self.max_workers = max_workers
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        # Its own thread, so a model load never takes a job worker
+        self._warm_up_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-up")
+        self._jobs = OrderedDict()
+        self._inflight = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._busy_topics = set()
+        self._waiting = {}                  # topic slug → deque of jobs waiting for that topic
+
+        self.cache = SummaryCache()
+        self.corpus = PaperCorpus()
+
+    # ---------------- Submission ----------------
+    def submit(self, topic, mode="nlp", limit=5, **options):
+        """
+        Queue a pipeline run; returns the Job (an existing one if an
+        identical request is already in flight).
+        """
+        topic = topic.strip()
+        key = job_key(topic, mode, limit, options)
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None and job.status in ACTIVE:
+                job.update(subscribers=job.subscribers + 1)
+                log(f"🔗 Joined in-flight job {job.id} for {topic!r}")
+                return job
+
+            job = Job(f"job-{next(self._ids)}", topic, mode, limit, options)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+            self._prune()
+
+            slug = topic_slug(topic)
+            busy = slug in self._busy_topics
+            if busy:
+                self._waiting.setdefault(slug, deque()).append(job)
+            else:
+                self._busy_topics.add(slug)
+
+        log(f"📥 Queued {job.id}: {topic!r} ({mode}, {limit} papers)")
+        if busy:
+            log(f"⏸️ {job.id} waits for the running job on {topic!r}")
+        else:
+            self._pool.submit(self._run, job)
+        return job
+
+    def warm_up(self, **summarizer):
+        """
+        Load the summarization model in the background so the first job skips
+        the load. Runs beside the job workers, not on them; a job that needs
+        the model meanwhile waits on the registry's per-model load lock.
+        """
+        def load():
+            try:
+                agent = LiteratureAgent("warm-up", use_cache=False, use_corpus=False, **summarizer)
+                agent._load_model()
+                agent.release_model()
+            except Exception as e:
+                log(f"⚠️ Model warm-up skipped: {type(e).__name__}: {e}")
+
+        return self._warm_up_pool.submit(load)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self):
+        counts = {}
+        for job in self.jobs():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status not in ACTIVE]
+        for job in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job.id]
+
+    # ---------------- Worker ----------------
+    def _run(self, job):
+        try:
+            # Someone is watching this job in the app: its LLM calls go ahead of batch work
+            with llm_priority("interactive"):
+                self._execute(job)
+        finally:
+            self._next_for_topic(job.topic)
+
+    def _next_for_topic(self, topic):
+        """Start the next job waiting for `topic`, or mark the topic free."""
+        slug = topic_slug(topic)
+        with self._lock:
+            waiting = self._waiting.get(slug)
+            job = waiting.popleft() if waiting else None
+            if not waiting:
+                self._waiting.pop(slug, None)
+            if job is None:
+                self._busy_topics.discard(slug)
+        if job is not None:
+            self._pool.submit(self._run, job)
+
+    def _execute(self, job):
+        job.update(status="running", started=time.time())
+        options = dict(job.options)
+        summarizer = options.pop("summarizer", {})
+        checkpoints = StageCheckpoints(job.topic, job.mode, force=options.pop("force_stages", ()))
+
+        def stage(name, inputs, fn, artifacts=None):
+            job.set_stage(name, "running")
+            start = time.perf_counter()
+            value = checkpoints.run(name, inputs, fn, artifacts)
+            status = "reused" if checkpoints.report[-1]["status"] == "reused" else "done"
+            job.set_stage(name, status, round(time.perf_counter() - start, 3))
+            return value
+
+        try:
+            lit = LiteratureAgent(job.topic, mode=job.mode, cache=self.cache, corpus=self.corpus, **summarizer)
+            if lit.page_size:
+                # Fetch and summarize overlap, so they share one checkpoint
+                job.set_stage("fetch", "streamed")
+                literature = stage("summarize", {"limit": job.limit, **lit.fetch_config(), **lit.checkpoint_config()},
+                                   lambda: lit.run_paginated(job.limit))
+            else:
+                papers = stage("fetch", {"limit": job.limit, **lit.fetch_config()}, lambda: lit.collect(job.limit))
+                literature = stage("summarize", {"papers": papers, **lit.checkpoint_config()},
+                                   lambda: lit.process(papers))
+            if not literature:
+                raise RuntimeError("no papers found")
+
+            exp = ExperimentAgent(literature, job.topic, mode=job.mode,
+                                  batch_size=options.get("experiment_batch_size"),
+                                  max_workers=options.get("experiment_workers", 4))
+            experiments = stage("experiments", {"literature": literature, **exp.checkpoint_config()}, exp.run)
+
+            paper = PaperAgent(topic=job.topic, literature=literature, experiments_bundle=experiments,
+                               section_parallel=options.get("section_parallel", False))
+            info = stage(
+                "paper",
+                {"literature": literature, "experiments": experiments, **paper.checkpoint_config()},
+                lambda: paper.run(stream=True, on_section=job.add_section),
+                artifacts=PaperAgent.artifacts
+            )
+            if not job.sections:
+                # Reused paper: show the saved text instead of a live draft
+                with open(info["text_path"], "r", encoding="utf-8") as f:
+                    job.add_section(None, f.read())
+
+            job.update(status="done", result={**info, "papers": len(literature)})
+            log(f"✅ {job.id} done ({checkpoints.summary()})")
+        except Exception as e:
+            for name, s in job.stages.items():
+                if s["status"] == "running":
+                    job.set_stage(name, "failed")
+            job.update(status="failed", error=f"{type(e).__name__}: {e}")
+            log(f"❌ {job.id} failed: {job.error}")
+        finally:
+            job.update(finished=time.time())
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue(max_workers=2):
+    """Process-wide JobQueue (Streamlit reruns and sessions all share it)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(max_workers=max_workers)
+        return _queue
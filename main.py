@@ -1,9 +1,103 @@
+import argparse
+import sys
+
+from core.checkpoints import STAGES, StageCheckpoints
+from core.fulltext import pdf_backend
+from core.llm_scheduler import llm_priority
 from core.logger import log
+from core.summarizers import BACKENDS, DECODING_PROFILES
 from agents.literature_agent import LiteratureAgent
 from agents.experiment_agent import ExperimentAgent
 from agents.paper_agent import PaperAgent
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Research Assistant")
+    parser.add_argument("topics", nargs="*", help="Topics to run in batch mode")
+    parser.add_argument("--topics-file", help="File with one topic per line (batch mode)")
+    parser.add_argument("--mode", choices=["nlp", "ml"], default="nlp")
+    parser.add_argument("--limit", type=int, default=5, help="Papers per topic")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--summarize-workers", type=int, default=1)
+    parser.add_argument("--llm-workers", type=int, default=2)
+    parser.add_argument("--max-topics-in-flight", type=int, default=None,
+                        help="Topics in progress at once (default: one per stage worker)")
+    parser.add_argument("--experiment-batch-size", type=int, default=None,
+                        help="Papers per experiment-extraction request (default: single prompt)")
+    parser.add_argument("--section-parallel", action="store_true",
+                        help="Generate paper sections concurrently")
+    parser.add_argument("--summarizer", choices=BACKENDS, default="torch",
+                        help="Summarizer backend: fp32 torch, int8 dynamic quantization or ONNX Runtime")
+    parser.add_argument("--summarizer-model", default="default",
+                        help="BART checkpoint or preset (default, distilled, distilled-small); "
+                             "distilled presets are faster but summarize differently")
+    parser.add_argument("--decoding", choices=list(DECODING_PROFILES), default="default",
+                        help="Summarizer decoding profile")
+    parser.add_argument("--no-summary-routing", action="store_true",
+                        help="Send every abstract to the model (no pass-through/dedupe/TextRank tiers)")
+    parser.add_argument("--page-size", type=int, default=None,
+                        help="Paginated streaming fetch: process papers page by page as they download "
+                             "(for large --limit; skips relevance ranking)")
+    parser.add_argument("--fulltext", action="store_true",
+                        help="Summarize arXiv full text (PDF sections, map-reduce BART) instead of abstracts")
+    parser.add_argument("--pdf-dir", help="Read full-text PDFs from this directory instead of arXiv")
+    parser.add_argument("--force-stage", nargs="+", default=[], choices=[*STAGES, "all"],
+                        help="Rerun these stages (and every later one) even if checkpointed")
+    args = parser.parse_args()
+    if args.fulltext or args.pdf_dir:
+        # Fail before any fetching rather than after the PDFs are downloaded
+        try:
+            pdf_backend()
+        except ImportError as e:
+            parser.error(str(e))
+    return args
+
+
+def summarizer_options(args):
+    return {
+        "model_name": args.summarizer_model,
+        "summarizer_backend": args.summarizer,
+        "decoding": args.decoding,
+        "use_router": not args.no_summary_routing,
+        "page_size": args.page_size,
+        "fulltext": args.fulltext or bool(args.pdf_dir),
+        "pdf_dir": args.pdf_dir,
+    }
+
+
+def run_batch(args):
+    from pipeline import BatchPipeline, read_topics_file
+
+    topics = list(args.topics)
+    if args.topics_file:
+        topics += read_topics_file(args.topics_file)
+
+    results = BatchPipeline(
+        mode=args.mode,
+        limit=args.limit,
+        fetch_workers=args.fetch_workers,
+        summarize_workers=args.summarize_workers,
+        llm_workers=args.llm_workers,
+        max_topics_in_flight=args.max_topics_in_flight,
+        experiment_batch_size=args.experiment_batch_size,
+        section_parallel=args.section_parallel,
+        force_stages=args.force_stage,
+        summarizer=summarizer_options(args)
+    ).run(topics)
+
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
 def main():
+    args = parse_args()
+    if args.topics or args.topics_file:
+        sys.exit(run_batch(args))
+
+    with llm_priority("interactive"):
+        run_interactive(args)
+
+
+def run_interactive(args):
     log("🚀 Research Assistant v2.0")
 
     mode = input("Select mode (nlp/ml): ").strip().lower() or "nlp"
@@ -14,20 +108,41 @@ def main():
     except:
         limit = 5
 
+    checkpoints = StageCheckpoints(topic, mode, force=args.force_stage)
+
     log("📚 Step 1: Literature analysis")
-    lit = LiteratureAgent(topic, mode=mode)
-    literature = lit.run(limit=limit)
+    lit = LiteratureAgent(topic, mode=mode, **summarizer_options(args))
+    if lit.page_size:
+        # Fetch and summarize overlap, so they share one checkpoint
+        literature = checkpoints.run("summarize", {"limit": limit, **lit.fetch_config(), **lit.checkpoint_config()},
+                                     lambda: lit.run_paginated(limit))
+    else:
+        papers = checkpoints.run("fetch", {"limit": limit, **lit.fetch_config()}, lambda: lit.collect(limit))
+        literature = checkpoints.run("summarize", {"papers": papers, **lit.checkpoint_config()},
+                                     lambda: lit.process(papers))
 
     log("🧪 Step 2: Experiment analysis")
     exp = ExperimentAgent(literature, topic, mode=mode)
-    experiments = exp.run()
+    experiments = checkpoints.run("experiments", {"literature": literature, **exp.checkpoint_config()},
+                                  exp.run)
 
     log("📝 Step 3: Paper generation")
     paper = PaperAgent(topic=topic, literature=literature, experiments_bundle=experiments)
-    info = paper.run()
+    info = checkpoints.run(
+        "paper",
+        {"literature": literature, "experiments": experiments, **paper.checkpoint_config()},
+        lambda: paper.run(
+            stream=True,
+            on_section=lambda heading, body: log(f"✍️ {heading or 'Preamble'} ({len(body.split())} words)")
+        ),
+        artifacts=PaperAgent.artifacts
+    )
 
+    log(f"♻️ Stages: {checkpoints.summary()}")
     log("📄 Final paper saved:")
     log(info["pdf_path"])
+    log(f"⏱️ Time to first section: {info['timings']['first_section_s']}s, "
+        f"total: {info['timings']['total_s']}s")
 
 if __name__ == "__main__":
     main()
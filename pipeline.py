@@ -0,0 +1,150 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import instrumentation
+from core.checkpoints import StageCheckpoints
+from core.llm_scheduler import get_scheduler
+from core.logger import log
+from core.corpus import PaperCorpus
+from core.summary_cache import SummaryCache
+from agents.literature_agent import LiteratureAgent
+from agents.experiment_agent import ExperimentAgent
+from agents.paper_agent import PaperAgent
+
+
+class BatchPipeline:
+    """
+    Runs many topics through one process.
+
+    Each stage has its own bounded pool (fetch → summarize → LLM), so while
+    topic N is being summarized topic N+1 is already fetching, and a
+    previous topic's Gemini calls run alongside both. Models, the summary
+    cache and the paper corpus are shared by every topic. Stages are
+    checkpointed per topic, so a rerun only redoes what is stale or failed.
+    A failing topic is recorded and the rest carry on. At most
+    `max_topics_in_flight` topics are in progress at once (default: one per
+    stage worker, enough to keep every pool busy); the rest wait their turn.
+    """
+
+    def __init__(self, mode="nlp", limit=5, fetch_workers=4, summarize_workers=1, llm_workers=2,
+                 max_topics_in_flight=None, experiment_batch_size=None, section_parallel=False, force_stages=(),
+                 summarizer=None):
+        self.mode = mode
+        self.limit = limit
+        self.workers = {
+            "fetch": fetch_workers,
+            "summarize": summarize_workers,
+            "llm": llm_workers,
+        }
+        self.max_topics_in_flight = max_topics_in_flight or sum(self.workers.values())
+        self.experiment_batch_size = experiment_batch_size
+        self.section_parallel = section_parallel
+        self.force_stages = force_stages
+        # LiteratureAgent summarizer options: model_name, summarizer_backend, decoding
+        self.summarizer = summarizer or {}
+
+        self.cache = SummaryCache() if mode == "nlp" else None
+        self.corpus = PaperCorpus()
+
+    # ---------------- Agents ----------------
+    def literature_agent(self, topic):
+        return LiteratureAgent(topic, mode=self.mode, cache=self.cache, corpus=self.corpus, **self.summarizer)
+
+    def experiment_agent(self, topic, literature):
+        return ExperimentAgent(literature, topic, mode=self.mode, batch_size=self.experiment_batch_size)
+
+    def paper_agent(self, topic, literature, experiments):
+        return PaperAgent(
+            topic=topic,
+            literature=literature,
+            experiments_bundle=experiments,
+            section_parallel=self.section_parallel
+        )
+
+    # ---------------- Run ----------------
+    def _run_topic(self, topic, pools):
+        result = {"topic": topic, "status": "ok", "timings": {}}
+        start = time.perf_counter()
+        checkpoints = StageCheckpoints(topic, self.mode, force=self.force_stages)
+
+        def stage(name, pool, inputs, fn, artifacts=None):
+            # Checkpoint lookups happen here; only stale stages take a pool slot. The
+            # worker runs in a copy of this context (stage instrumentation, LLM priority)
+            t0 = time.perf_counter()
+            value = checkpoints.run(name, inputs, lambda: instrumentation.submit(pools[pool], fn).result(),
+                                    artifacts)
+            result["timings"][name] = round(time.perf_counter() - t0, 3)
+            return value
+
+        try:
+            lit = self.literature_agent(topic)
+            if lit.page_size:
+                # Fetch and summarize overlap, so they share one checkpoint and the summarize pool
+                literature = stage("summarize", "summarize",
+                                   {"limit": self.limit, **lit.fetch_config(), **lit.checkpoint_config()},
+                                   lambda: lit.run_paginated(self.limit))
+            else:
+                papers = stage("fetch", "fetch", {"limit": self.limit, **lit.fetch_config()},
+                               lambda: lit.collect(self.limit))
+                literature = stage("summarize", "summarize", {"papers": papers, **lit.checkpoint_config()},
+                                   lambda: lit.process(papers))
+            if not literature:
+                raise RuntimeError("no papers found")
+
+            exp = self.experiment_agent(topic, literature)
+            experiments = stage("experiments", "llm", {"literature": literature, **exp.checkpoint_config()},
+                                exp.run)
+
+            paper = self.paper_agent(topic, literature, experiments)
+            info = stage("paper", "llm",
+                         {"literature": literature, "experiments": experiments, **paper.checkpoint_config()},
+                         paper.run, PaperAgent.artifacts)
+
+            result["papers"] = len(literature)
+            result["pdf_path"] = info["pdf_path"]
+            log(f"✅ {topic} done")
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+            log(f"❌ {topic} failed: {result['error']}")
+
+        result["checkpoints"] = checkpoints.summary()
+        result["timings"]["total"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def run(self, topics):
+        topics = list(dict.fromkeys(t.strip() for t in topics if t.strip()))
+        log(f"🚚 Batch: {len(topics)} topics, mode={self.mode}, limit={self.limit}, "
+            f"workers={self.workers}, topics in flight={self.max_topics_in_flight}")
+
+        pools = {name: ThreadPoolExecutor(max_workers=n, thread_name_prefix=name)
+                 for name, n in self.workers.items()}
+        start = time.perf_counter()
+        try:
+            # Lightweight drivers, one per in-flight topic; the stage pools bound the real work
+            drivers_n = max(min(len(topics), self.max_topics_in_flight), 1)
+            with ThreadPoolExecutor(max_workers=drivers_n, thread_name_prefix="topic") as drivers:
+                futures = [instrumentation.submit(drivers, self._run_topic, t, pools) for t in topics]
+                results = [f.result() for f in futures]
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+
+        ok = sum(r["status"] == "ok" for r in results)
+        log(f"🏁 Batch finished: {ok}/{len(results)} topics in {time.perf_counter() - start:.1f}s")
+        for r in results:
+            detail = r.get("pdf_path") or r.get("error")
+            log(f"   {'✔' if r['status'] == 'ok' else '✘'} {r['topic']}: {detail} {r['timings']}")
+            log(f"     ♻️ {r['checkpoints']}")
+
+        llm = get_scheduler().stats()
+        if llm["completed"] or llm["rate_limited"]:
+            log(f"🚦 LLM scheduler: {llm['completed']} calls, {llm['rate_limited']} rate limited, "
+                f"{llm['throttled_s']:.1f}s throttled, concurrency {llm['concurrency']}")
+        return results
+
+
+def read_topics_file(path):
+    """One topic per line; blank lines and # comments are ignored."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.split("#", 1)[0].strip() for line in f if line.split("#", 1)[0].strip()]
@@ -0,0 +1,145 @@
+import json
+import os
+
+import pytest
+
+from core.checkpoints import STAGES, StageCheckpoints, digest, file_digest
+
+
+class Calls:
+    """Stage functions that record whether they ran."""
+
+    def __init__(self):
+        self.ran = []
+
+    def stage(self, name, output):
+        def fn():
+            self.ran.append(name)
+            return output
+        return fn
+
+
+def pipeline(root, calls, papers=("a", "b"), force=(), model="bart"):
+    """fetch → summarize → experiments, each stage's output feeding the next key."""
+    cp = StageCheckpoints("Chain of Thought", "nlp", root=str(root), force=force)
+    fetched = cp.run("fetch", {"limit": len(papers)}, calls.stage("fetch", list(papers)))
+    summaries = cp.run("summarize", {"papers": fetched, "model": model},
+                       calls.stage("summarize", [f"{p}:{model}" for p in fetched]))
+    cp.run("experiments", {"literature": summaries}, calls.stage("experiments", {"n": len(summaries)}))
+    return cp
+
+
+def test_rerun_reuses_every_stage(tmp_path):
+    calls = Calls()
+    pipeline(tmp_path, calls)
+    cp = pipeline(tmp_path, calls)
+    assert calls.ran == ["fetch", "summarize", "experiments"]
+    assert cp.summary() == "fetch=reused summarize=reused experiments=reused"
+
+
+def test_changed_config_reruns_from_that_stage(tmp_path):
+    calls = Calls()
+    pipeline(tmp_path, calls)
+    calls.ran.clear()
+    cp = pipeline(tmp_path, calls, model="distilbart")
+    assert calls.ran == ["summarize", "experiments"]
+    assert cp.summary() == "fetch=reused summarize=ran experiments=ran"
+
+
+def test_refreshed_stage_with_same_output_reuses_later_stages(tmp_path):
+    calls = Calls()
+    pipeline(tmp_path, calls)
+    calls.ran.clear()
+    cp = pipeline(tmp_path, calls, force=("summarize",))
+    # Forcing summarize also forces everything after it
+    assert cp.force == {"summarize", "experiments", "paper"}
+    assert calls.ran == ["summarize", "experiments"]
+
+    # A refetch that returns the same papers leaves later stages valid
+    calls.ran.clear()
+    cp = StageCheckpoints("Chain of Thought", "nlp", root=str(tmp_path))
+    fetched = cp.run("fetch", {"limit": 2, "refetch": True}, calls.stage("fetch", ["a", "b"]))
+    cp.run("summarize", {"papers": fetched, "model": "bart"}, calls.stage("summarize", []))
+    assert calls.ran == ["fetch"]
+
+
+def test_force_all_and_unknown_stages(tmp_path):
+    assert StageCheckpoints("t", "nlp", root=str(tmp_path), force=["all"]).force == set(STAGES)
+    with pytest.raises(ValueError):
+        StageCheckpoints("t", "nlp", root=str(tmp_path), force=["typo"])
+
+
+def test_missing_artifact_invalidates(tmp_path):
+    calls = Calls()
+    artifact = tmp_path / "paper.pdf"
+    artifact.write_text("pdf")
+
+    def run():
+        cp = StageCheckpoints("t", "nlp", root=str(tmp_path / "cp"))
+        return cp.run("paper", {"x": 1}, calls.stage("paper", {"pdf_path": str(artifact)}),
+                      artifacts=lambda out: [out["pdf_path"]])
+
+    run()
+    run()
+    assert calls.ran == ["paper"]
+    os.remove(artifact)
+    run()
+    assert calls.ran == ["paper", "paper"]
+
+
+def test_corrupt_checkpoint_reruns(tmp_path):
+    calls = Calls()
+    cp = StageCheckpoints("t", "nlp", root=str(tmp_path))
+    cp.run("fetch", {}, calls.stage("fetch", [1]))
+    with open(cp._path("fetch"), "w") as f:
+        f.write("{not json")
+    assert cp.run("fetch", {}, calls.stage("fetch", [1])) == [1]
+    assert calls.ran == ["fetch", "fetch"]
+    with open(cp._path("fetch")) as f:
+        assert json.load(f)["output"] == [1]
+
+
+def test_topics_and_modes_do_not_share_checkpoints(tmp_path):
+    calls = Calls()
+    for topic, mode in (("A", "nlp"), ("A", "ml"), ("B", "nlp")):
+        StageCheckpoints(topic, mode, root=str(tmp_path)).run("fetch", {}, calls.stage("fetch", topic))
+    assert len(calls.ran) == 3
+
+
+def test_digests():
+    assert digest({"a": 1, "b": [1, 2]}) == digest({"b": [1, 2], "a": 1})
+    assert digest({"a": 1}) != digest({"a": 2})
+    assert file_digest("/nonexistent/path") is None
+
+
+def test_fetch_checkpoint_expires_with_the_freshness_window(tmp_path, monkeypatch):
+    from agents import literature_agent
+    from agents.literature_agent import LiteratureAgent
+
+    monkeypatch.chdir(tmp_path)
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(literature_agent.time, "time", lambda: now[0])
+    calls = Calls()
+
+    def fetch(agent):
+        cp = StageCheckpoints("Chain of Thought", "nlp", root=str(tmp_path / "cp"))
+        return cp.run("fetch", {"limit": 2, **agent.fetch_config()}, calls.stage("fetch", ["a", "b"]))
+
+    fresh = LiteratureAgent("t", use_cache=False, use_corpus=False, freshness_days=30)
+    fetch(fresh)
+    now[0] += 3600
+    fetch(fresh)
+    assert calls.ran == ["fetch"]
+
+    # A new day, or a different freshness policy, asks the corpus/network again
+    now[0] += LiteratureAgent.FETCH_WINDOW_S
+    fetch(fresh)
+    fetch(LiteratureAgent("t", use_cache=False, use_corpus=False, freshness_days=7))
+    assert calls.ran == ["fetch"] * 3
+
+    # Without a freshness policy a fetch checkpoint never expires
+    unbounded = LiteratureAgent("t", use_cache=False, use_corpus=False, freshness_days=None)
+    fetch(unbounded)
+    now[0] += 10 * LiteratureAgent.FETCH_WINDOW_S
+    fetch(unbounded)
+    assert calls.ran == ["fetch"] * 4
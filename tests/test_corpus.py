@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+import pytest
+
+from agents.literature_agent import LiteratureAgent
+from core.corpus import PaperCorpus
+
+DAY = 86400
+
+
+def paper(title, abstract="Transformers for abstractive summarization of scientific papers.", **fields):
+    return {"title": title, "abstract": abstract, "authors": [], "year": 2021,
+            "url": f"https://example.org/{title.replace(' ', '-')}", "source": "test", **fields}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    return PaperCorpus(str(tmp_path / "corpus.sqlite"))
+
+
+def fetched_at(corpus, title):
+    return corpus._conn.execute("SELECT fetched_at FROM papers WHERE title = ?", (title,)).fetchone()[0]
+
+
+def test_search_ignores_stale_papers(corpus):
+    corpus.ingest([paper("Old summarization")], fetched_at=time.time() - 400 * DAY)
+    corpus.ingest([paper("New summarization")])
+    titles = [p["title"] for p in corpus.search("summarization", 10, max_age=365 * DAY)]
+    assert titles == ["New summarization"]
+    assert len(corpus.search("summarization", 10)) == 2
+
+
+def test_network_ingest_refreshes_fetch_time(corpus):
+    old = time.time() - 400 * DAY
+    corpus.ingest([paper("Summarization survey")], fetched_at=old)
+    corpus.ingest([paper("Summarization survey")])
+    assert fetched_at(corpus, "Summarization survey") > old
+
+
+def test_rewritten_raw_file_does_not_refresh_papers(corpus, tmp_path):
+    old = time.time() - 400 * DAY
+    corpus.ingest([paper("Summarization survey", abstract="short")], fetched_at=old)
+
+    raw = tmp_path / "topic_raw.json"
+    raw.write_text(json.dumps([paper("Summarization survey"), paper("Unseen summarization paper")]))
+    assert corpus.import_dir(str(tmp_path)) == 1
+
+    # Known papers keep their fetch time but still pick up the longer abstract
+    assert fetched_at(corpus, "Summarization survey") == old
+    assert corpus.search("survey", 1)[0]["abstract"].startswith("Transformers")
+    assert fetched_at(corpus, "Unseen summarization paper") == pytest.approx(os.path.getmtime(raw))
+
+
+def test_import_dir_skips_files_already_imported(corpus, tmp_path):
+    raw = tmp_path / "topic_raw.json"
+    raw.write_text(json.dumps([paper("Summarization survey")]))
+    corpus.mark_imported(str(raw))
+    assert corpus.import_dir(str(tmp_path)) == 0
+    assert len(corpus) == 0
+
+
+def test_stale_corpus_triggers_refetch(corpus, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus.ingest([paper(f"Summarization paper {i}") for i in range(3)], fetched_at=time.time() - 400 * DAY)
+    fetched = [paper(f"Fresh summarization paper {i}") for i in range(3)]
+
+    agent = LiteratureAgent("summarization", mode="ml", corpus=corpus, use_ranker=False, freshness_days=365)
+    monkeypatch.setattr(agent, "fetch_all", lambda limit: fetched[:limit])
+    assert [p["title"] for p in agent.collect(3)] == [p["title"] for p in fetched]
+    assert agent.fetched_from_network
+    assert os.path.exists("data/processed/summarization_raw.json")
+
+    # The second agent is served from the corpus and must neither refetch nor
+    # rewrite the raw file (whose mtime would otherwise restamp the papers)
+    before = os.path.getmtime("data/processed/summarization_raw.json")
+    again = LiteratureAgent("summarization", mode="ml", corpus=corpus, use_ranker=False, freshness_days=365)
+    monkeypatch.setattr(again, "fetch_all", lambda limit: pytest.fail("corpus should have served the topic"))
+    assert len(again.collect(3)) == 3
+    assert not again.fetched_from_network
+    assert os.path.getmtime("data/processed/summarization_raw.json") == before
+    assert fetched_at(corpus, "Summarization paper 0") < time.time() - 399 * DAY
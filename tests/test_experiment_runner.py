@@ -0,0 +1,208 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import experiment_runner
+from core.experiment_runner import (
+    ExperimentRunner, catalog_model, classification_metrics, label_ids, plan_experiments, run_experiment
+)
+from core.taxonomy import TAXONOMY_PATH, load_taxonomy
+
+IMDB_MODEL = experiment_runner.RUNNABLE_DATASETS["IMDB"]["model"]
+
+
+def bundle(*experiments):
+    return {"experiments": list(experiments)}
+
+
+# ---------------- Planning ----------------
+def test_catalog_model_by_hub_id_or_taxonomy_name():
+    assert catalog_model("imdb") == IMDB_MODEL
+    assert catalog_model("IMDB") == IMDB_MODEL
+    assert catalog_model("glue", "sst2") == experiment_runner.RUNNABLE_DATASETS["SST-2"]["model"]
+    assert catalog_model("data/my_reviews.csv") is None
+
+
+def test_explicit_spec_without_model_uses_the_catalog():
+    specs, skipped = plan_experiments(bundle({"paper_title": "A", "dataset": "imdb"}))
+
+    assert skipped == []
+    assert specs[0]["model"] == IMDB_MODEL
+
+
+def test_explicit_spec_keeps_its_own_model_and_the_override_wins():
+    exp = {"paper_title": "A", "dataset": "imdb", "model": "local/model"}
+
+    assert plan_experiments(bundle(exp))[0][0]["model"] == "local/model"
+    assert plan_experiments(bundle(exp), model="override")[0][0]["model"] == "override"
+
+
+def test_explicit_spec_without_any_model_is_skipped():
+    specs, skipped = plan_experiments(bundle({"paper_title": "A", "dataset": "data/my_reviews.csv"}))
+
+    assert specs == []
+    assert skipped[0]["paper_title"] == "A"
+    assert "no model" in skipped[0]["reason"]
+
+
+def test_free_text_datasets_resolve_through_the_taxonomy():
+    specs, skipped = plan_experiments(bundle(
+        {"paper_title": "A", "datasets": ["IMDB movie reviews"], "metrics": ["F1 score"]},
+        {"paper_title": "B", "datasets": ["a private corpus"]},
+    ))
+
+    assert [(s["paper_title"], s["dataset"], s["metrics"]) for s in specs] == [("A", "imdb", ["f1"])]
+    assert [s["paper_title"] for s in skipped] == ["B"]
+
+
+def test_explicit_metric_names_are_resolved_like_free_text():
+    specs, _ = plan_experiments(bundle(
+        {"paper_title": "A", "dataset": "imdb", "metrics": ["F1", "Accuracy", "macro-F1", "BLEU", "mcc"]},
+        {"paper_title": "B", "dataset": "imdb", "metrics": ["f1"]},
+        {"paper_title": "C", "dataset": "imdb", "metrics": ["BLEU"]},
+    ))
+
+    assert specs[0]["metrics"] == ["f1", "accuracy", "mcc"]
+    assert specs[0]["unresolved_metrics"] == ["BLEU"]
+    assert specs[1]["metrics"] == ["f1"] and "unresolved_metrics" not in specs[1]
+    assert specs[2]["metrics"] == experiment_runner.DEFAULT_METRICS
+
+
+def test_resolve_metrics_keeps_order_and_drops_duplicates():
+    matcher = load_taxonomy(TAXONOMY_PATH)
+    assert experiment_runner.resolve_metrics(["F1", "f1-score", "Balanced Accuracy", "typo"], matcher) == (
+        ["f1", "balanced_accuracy"], ["typo"]
+    )
+
+
+# ---------------- Metrics ----------------
+def test_classification_metrics_match_the_confusion_matrix():
+    # true 0 → 0, 1; true 1 → 1, 1; true 2 → 0, 0 (class 2 is never predicted)
+    every = list(experiment_runner.SUPPORTED_METRICS.values())
+    scores = classification_metrics([0, 0, 1, 1, 2, 2], [0, 1, 1, 1, 0, 0], every)
+
+    assert scores == {
+        "accuracy": 0.5,                 # 3 of 6 on the diagonal
+        "balanced_accuracy": 0.5,        # recall (1/2, 1, 0)
+        "precision": 0.333333,           # (1/3, 2/3, 0)
+        "recall": 0.5,
+        "f1": 0.4,                       # (0.4, 0.8, 0)
+        "mcc": 0.288675,                 # (3*6 - (3*2 + 3*2 + 0*2)) / sqrt((36 - 18) * (36 - 12))
+    }
+
+
+def test_classification_metrics_edge_cases():
+    assert classification_metrics([1, 0, 1], [1, 0, 1], ["accuracy", "f1", "mcc"]) == {
+        "accuracy": 1.0, "f1": 1.0, "mcc": 1.0,
+    }
+    # A single predicted class leaves MCC undefined; it is reported as 0
+    assert classification_metrics([0, 1], [0, 0], ["mcc", "precision"]) == {"mcc": 0.0, "precision": 0.25}
+    assert classification_metrics([], [], ["accuracy", "f1"]) == {"accuracy": None, "f1": None}
+
+
+# ---------------- Execution ----------------
+class TinyDataset:
+    """The slice of the `datasets.Dataset` API run_experiment uses."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def select(self, indices):
+        return TinyDataset({k: [v[i] for i in indices] for k, v in self.columns.items()})
+
+    def iter(self, batch_size):
+        for start in range(0, len(self), batch_size):
+            yield {k: v[start:start + batch_size] for k, v in self.columns.items()}
+
+
+class StubPipeline:
+    """Labels a text "POSITIVE" if it says "good"; records batch sizes."""
+
+    def __init__(self, label2id, labels=("NEGATIVE", "POSITIVE")):
+        self.model = SimpleNamespace(config=SimpleNamespace(label2id=label2id))
+        self.labels = labels
+        self.batches = []
+
+    def __call__(self, texts, batch_size, truncation):
+        self.batches.append(len(texts))
+        return [{"label": self.labels["good" in t]} for t in texts]
+
+
+REVIEWS = TinyDataset({
+    "review": ["good film", "bad film", "good plot", "dull", "good", "bad acting"],
+    "stars": [1, 0, 0, 0, 1, 1],
+})
+
+
+def spec(**overrides):
+    return {"paper_title": "A", "dataset": "reviews.csv", "split": "test", "text_column": "review",
+            "label_column": "stars", "model": "stub", "metrics": ["accuracy", "recall"], **overrides}
+
+
+@pytest.fixture
+def stub_pipeline(monkeypatch):
+    monkeypatch.setattr(experiment_runner, "load_split", lambda spec: REVIEWS)
+    pipe = StubPipeline({"NEGATIVE": 0, "POSITIVE": 1})
+    monkeypatch.setattr(experiment_runner, "get_pipeline", lambda model, device=-1: pipe)
+    return pipe
+
+
+def test_run_experiment_scores_the_split_in_batches(stub_pipeline):
+    result = run_experiment(spec(), batch_size=4)
+
+    assert stub_pipeline.batches == [4, 2]
+    # predicted 1, 0, 1, 0, 1, 0 against 1, 0, 0, 0, 1, 1
+    assert result["status"] == "ok" and result["error"] is None
+    assert result["samples"] == 6
+    assert result["metrics"] == {"accuracy": 0.666667, "recall": 0.666667}
+    assert {k: result[k] for k in ("paper_title", "dataset", "split", "model")} == {
+        "paper_title": "A", "dataset": "reviews.csv", "split": "test", "model": "stub",
+    }
+
+
+def test_run_experiment_caps_samples(stub_pipeline):
+    assert run_experiment(spec(), max_samples=2)["samples"] == 2
+
+
+def test_unmapped_labels_fail_the_experiment(stub_pipeline):
+    stub_pipeline.labels = ("neg", "pos")
+    result = run_experiment(spec())
+
+    assert result["status"] == "failed"
+    assert "pass label_map" in result["error"]
+    assert run_experiment(spec(label_map={"neg": 0, "pos": 1}))["status"] == "ok"
+
+
+def test_label_ids_use_config_then_label_map_then_label_n():
+    to_id = label_ids(StubPipeline({"Negative": 0, "Positive": 1}), label_map={"positive": 5})
+
+    assert to_id("NEGATIVE") == 0
+    assert to_id("Positive") == 5
+    assert to_id("LABEL_3") == 3
+    with pytest.raises(ValueError):
+        to_id("neutral")
+
+
+# ---------------- Run ----------------
+def test_run_reports_unresolved_specs_as_skipped(monkeypatch, tmp_path):
+    ran = []
+
+    def run_group(specs, options):
+        ran.extend(specs)
+        return [{**s, "samples": 0, "seconds": 0.0, "metrics": {}, "status": "ok", "error": None} for s in specs]
+
+    monkeypatch.setattr(experiment_runner, "_run_group", run_group)
+    monkeypatch.setattr(ExperimentRunner, "save", lambda self, results: None)
+
+    outcome = ExperimentRunner("t", workers=1, output_dir=str(tmp_path)).run(bundle(
+        {"paper_title": "A", "dataset": "imdb", "metrics": ["F1", "BLEU"]},
+        {"paper_title": "B", "dataset": "data/my_reviews.csv"},
+    ))
+
+    assert [s["paper_title"] for s in ran] == ["A"]
+    assert [s["paper_title"] for s in outcome["skipped"]] == ["B"]
+    assert ran[0]["metrics"] == ["f1"]
+    assert outcome["unresolved_metrics"] == [{"paper_title": "A", "dataset": "imdb", "metrics": ["BLEU"]}]
@@ -0,0 +1,131 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from agents.literature_agent import LiteratureAgent
+from core import fulltext
+from core.fulltext import FullTextStore, chunk_sections, chunk_words, pdf_backend, split_sections
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# Two pages, rendered with reportlab: title, Abstract, 1 Introduction ... 4 Conclusion, References
+SAMPLE_PDF = os.path.join(FIXTURES, "sample.pdf")
+
+
+def has_pdf_backend():
+    try:
+        pdf_backend()
+    except ImportError:
+        return False
+    return True
+
+
+requires_pdf = pytest.mark.skipif(not has_pdf_backend(), reason="needs pypdf or pymupdf")
+
+
+# ---------------- Sections and chunks ----------------
+def test_split_sections_names_headings_and_drops_back_matter():
+    text = "\n".join([
+        "A Title", "ABSTRACT", "We summarize papers.",
+        "1. Introduction", "Papers are long and full-", "text is longer.",
+        "II. Proposed Method", "We chunk sections.",
+        "Acknowledgements", "Thanks.", "References", "[1] Someone. 2020.",
+    ])
+    sections = split_sections(text)
+
+    assert [name for name, _ in sections] == ["Preamble", "Abstract", "Introduction", "Proposed Method"]
+    assert dict(sections)["Introduction"] == "Papers are long and fulltext is longer."
+
+
+def test_sentence_ending_lines_are_not_headings():
+    assert split_sections("1 Introduction\n2 We then ran it.\nMore text.") == [
+        ("Introduction", "2 We then ran it. More text."),
+    ]
+
+
+def test_chunk_words_splits_on_sentences_and_cuts_long_ones():
+    text = "One two three. Four five six. " + " ".join(f"w{i}" for i in range(7)) + "."
+    chunks = chunk_words(text, max_words=4)
+
+    # The 7-word "sentence" is cut into word pieces that fill the remaining room
+    assert chunks == ["One two three.", "Four five six. w0", "w1 w2 w3 w4", "w5 w6."]
+
+
+def test_chunks_never_span_sections():
+    sections = [("Method", "A b. C d."), ("Results", "E f.")]
+    assert chunk_sections(sections, max_words=10) == [("Method", "A b. C d."), ("Results", "E f.")]
+
+
+# ---------------- Map-reduce ----------------
+def test_reduce_terminates_when_summaries_are_long(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = LiteratureAgent("t", use_corpus=False, use_cache=False, use_router=False)
+    # 100-word summaries never fit two to a 150-word group
+    agent.fulltext = SimpleNamespace(max_words=150)
+    levels = []
+
+    def summarize_batch(texts, **kwargs):
+        levels.append(len(texts))
+        assert len(levels) < 20, "reduce loop is not shrinking"
+        return [" ".join(["word"] * 100) for _ in texts]
+
+    monkeypatch.setattr(agent, "summarize_batch", summarize_batch)
+    docs = [{"chunks": [("Method", f"chunk {i}") for i in range(9)]}, None, {"chunks": [("Results", "one")]}]
+
+    summaries = agent.summarize_fulltext(docs)
+
+    assert sorted(summaries) == [0, 2]
+    # 9 + 1 chunks, then 5, 3, 2, 1 groups for the long paper
+    assert levels == [10, 5, 3, 2, 1]
+
+
+def test_pack_keeps_at_least_two_parts_per_group():
+    parts = ["a " * 100] * 5
+    assert [len(g) for g in LiteratureAgent._pack(parts, max_words=150)] == [2, 2, 1]
+    assert [len(g) for g in LiteratureAgent._pack(["a b"] * 5, max_words=4)] == [2, 2, 1]
+    assert [len(g) for g in LiteratureAgent._pack(["a"] * 5, max_words=3)] == [3, 2]
+
+
+# ---------------- Missing PDF library ----------------
+def test_missing_pdf_library_fails_up_front(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fulltext.importlib.util, "find_spec", lambda name: None)
+
+    with pytest.raises(ImportError, match="pip install pypdf"):
+        FullTextStore(cache_dir=str(tmp_path))
+    with pytest.raises(ImportError, match="requirements-optional.txt"):
+        LiteratureAgent("t", fulltext=True, use_corpus=False, use_cache=False)
+
+
+# ---------------- Local PDFs ----------------
+@requires_pdf
+def test_sample_pdf_is_extracted_sectioned_and_cached(tmp_path):
+    store = FullTextStore(cache_dir=str(tmp_path), pdf_dir=FIXTURES, workers=1, max_words=12)
+
+    [doc] = store.documents([{"title": "Sample"}])
+    assert doc["pages"] == 2
+    assert doc["sections"] == ["Preamble", "Abstract", "Introduction", "Method", "Results", "Conclusion"]
+    assert {name for name, _ in doc["chunks"]} == set(doc["sections"])
+    assert all(len(text.split()) <= 12 for _, text in doc["chunks"])
+    assert not any("Another paper about transformers" in text for _, text in doc["chunks"])
+    assert store.stats["pdfs_cached"] == 0
+
+    assert store.chunked([SAMPLE_PDF]) == [doc]
+    assert store.stats["pdfs_cached"] == 1
+
+
+@requires_pdf
+def test_paginated_run_applies_full_text(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = LiteratureAgent("t", page_size=10, fulltext=True, pdf_dir=FIXTURES, chunk_words=40,
+                            use_corpus=False, use_cache=False, use_router=False)
+    papers = [{"title": "Sample", "abstract": "An abstract."}, {"title": "No PDF", "abstract": "Another."}]
+    monkeypatch.setattr(agent, "iter_papers", lambda limit: iter(papers))
+    monkeypatch.setattr(agent, "summarize_batch",
+                        lambda texts, **kwargs: [" ".join(t.split()[:8]) for t in texts])
+
+    results = agent.run(limit=2)
+
+    assert [r["summary_tier"] for r in results] == ["fulltext", "model"]
+    assert results[0]["fulltext"]["pages"] == 2
+    assert results[1]["summary"] == "Another."
@@ -0,0 +1,188 @@
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from core import http_client
+from core.http_client import backoff_delay, get_session, get_with_backoff, retry_after_seconds
+
+
+class StubServer:
+    """
+    Local HTTP/1.1 server. Each path answers from a script of responses
+    (status, headers, delay_s); the last one repeats once the script runs out.
+    """
+
+    def __init__(self, routes):
+        self.routes = {path: list(script) for path, script in routes.items()}
+        self.hits = {path: 0 for path in routes}
+        self.clients = set()
+        self.release = threading.Event()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    def url(self, path):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{path}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                script = stub.routes[path]
+                status, headers, delay = script[min(stub.hits[path], len(script) - 1)]
+                stub.hits[path] += 1
+                stub.clients.add(self.client_address)
+                if delay:
+                    stub.release.wait(delay)
+                body = b'{"ok": true}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.release.set()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+OK = (200, {}, 0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff sleeps, recorded instead of slept."""
+    delays = []
+    monkeypatch.setattr(http_client.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def session():
+    with requests.Session() as s:
+        yield s
+
+
+def test_retry_after_is_honoured(sleeps, session):
+    with StubServer({"/quota": [(429, {"Retry-After": "7"}, 0), (429, {"Retry-After": "3"}, 0), OK]}) as stub:
+        r = get_with_backoff(stub.url("/quota"), session=session)
+    assert r.status_code == 200 and r.json() == {"ok": True}
+    assert stub.hits["/quota"] == 3
+    assert sleeps == [7.0, 3.0]
+
+
+def test_retry_after_is_capped_by_max_delay(sleeps, session):
+    with StubServer({"/quota": [(429, {"Retry-After": "600"}, 0), OK]}) as stub:
+        get_with_backoff(stub.url("/quota"), session=session, max_delay=5.0)
+    assert sleeps == [5.0]
+
+
+def test_server_errors_back_off_exponentially(sleeps, session):
+    with StubServer({"/flaky": [(503, {}, 0), (502, {}, 0), (500, {}, 0), OK]}) as stub:
+        get_with_backoff(stub.url("/flaky"), session=session, retries=3, base_delay=1.0)
+    assert stub.hits["/flaky"] == 4
+    assert len(sleeps) == 3
+    for attempt, delay in enumerate(sleeps):
+        assert 0 <= delay <= 2 ** attempt
+
+
+def test_gives_up_after_retries(sleeps, session):
+    with StubServer({"/down": [(503, {}, 0)]}) as stub:
+        with pytest.raises(requests.HTTPError):
+            get_with_backoff(stub.url("/down"), session=session, retries=2)
+    assert stub.hits["/down"] == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(sleeps, session):
+    with StubServer({"/missing": [(404, {}, 0)]}) as stub:
+        with pytest.raises(requests.HTTPError):
+            get_with_backoff(stub.url("/missing"), session=session)
+    assert stub.hits["/missing"] == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("status, retries", [(404, 3), (503, 0)])
+def test_streamed_error_responses_are_closed(sleeps, session, status, retries):
+    with StubServer({"/err": [(status, {}, 0)]}) as stub:
+        with pytest.raises(requests.HTTPError) as e:
+            get_with_backoff(stub.url("/err"), session=session, stream=True, retries=retries)
+    assert e.value.response.raw.closed
+
+
+def test_slow_response_times_out_and_retries(sleeps, session):
+    with StubServer({"/slow": [(200, {}, 5), OK]}) as stub:
+        r = get_with_backoff(stub.url("/slow"), session=session, timeout=0.2)
+    assert r.status_code == 200
+    assert stub.hits["/slow"] == 2
+    assert len(sleeps) == 1
+
+
+def test_slow_response_raises_timeout_when_out_of_retries(sleeps, session):
+    with StubServer({"/slow": [(200, {}, 5)]}) as stub:
+        with pytest.raises(requests.Timeout):
+            get_with_backoff(stub.url("/slow"), session=session, timeout=0.2, retries=1)
+    assert len(sleeps) == 1
+
+
+def test_backoff_jitter_stays_in_bounds():
+    for attempt in range(8):
+        cap = min(30.0, 1.0 * 2 ** attempt)
+        delays = [backoff_delay(attempt, 1.0, 30.0) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+        # Full jitter: spread over the window, not pinned to its edge
+        assert max(delays) - min(delays) > cap / 4
+
+
+def test_backoff_prefers_retry_after():
+    assert backoff_delay(5, retry_after=2.5) == 2.5
+    assert backoff_delay(0, max_delay=10.0, retry_after=60) == 10.0
+
+
+def test_retry_after_parsing():
+    class Response:
+        def __init__(self, value):
+            self.headers = {"Retry-After": value} if value is not None else {}
+
+    assert retry_after_seconds(Response("12")) == 12.0
+    assert retry_after_seconds(Response("-3")) == 0.0
+    assert retry_after_seconds(Response(None)) is None
+    assert retry_after_seconds(Response("soon")) is None
+    in_a_minute = retry_after_seconds(Response(formatdate(http_client.time.time() + 60, usegmt=True)))
+    assert 55 <= in_a_minute <= 60
+
+
+def test_pooled_session_reuses_connections():
+    with StubServer({"/ok": [OK]}) as stub:
+        for _ in range(5):
+            get_with_backoff(stub.url("/ok"))
+    assert stub.hits["/ok"] == 5
+    # Keep-alive: every request came over the same client connection
+    assert len(stub.clients) == 1
+
+
+def test_sessions_are_per_thread():
+    assert get_session() is get_session()
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_session()))
+    thread.start()
+    thread.join()
+    assert other[0] is not get_session()
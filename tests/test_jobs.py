@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import JobQueue, job_key
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """JobQueue whose jobs just record overlap per topic instead of running the pipeline."""
+    monkeypatch.chdir(tmp_path)
+    q = JobQueue(max_workers=4)
+    q.release = threading.Event()
+    q.active, q.peak_per_topic, q.ran = {}, {}, []
+    lock = threading.Lock()
+
+    def execute(job):
+        job.update(status="running", started=time.time())
+        slug = jobs.topic_slug(job.topic)
+        with lock:
+            q.active[slug] = q.active.get(slug, 0) + 1
+            q.peak_per_topic[slug] = max(q.peak_per_topic.get(slug, 0), q.active[slug])
+        q.release.wait(5)
+        time.sleep(0.02)
+        with lock:
+            q.active[slug] -= 1
+            q.ran.append(job.id)
+        job.update(status="done", finished=time.time())
+        with q._lock:
+            if q._inflight.get(job.key) is job:
+                del q._inflight[job.key]
+
+    monkeypatch.setattr(q, "_execute", execute)
+    yield q
+    q.release.set()
+    wait_all(q)
+
+
+def wait_all(q, timeout=5):
+    deadline = time.time() + timeout
+    while any(j.status in jobs.ACTIVE for j in q.jobs()) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_identical_requests_share_a_job(queue):
+    a = queue.submit("Chain of Thought", limit=5, summarizer={"decoding": "default"})
+    b = queue.submit("  chain of   thought ", limit=5, summarizer={"decoding": "default"})
+    queue.release.set()
+    wait_all(queue)
+    assert a is b
+    assert a.subscribers == 2
+    assert queue.ran == [a.id]
+
+
+def test_different_options_get_their_own_job(queue):
+    a = queue.submit("Chain of Thought", summarizer={"decoding": "default"})
+    b = queue.submit("Chain of Thought", summarizer={"decoding": "greedy"})
+    c = queue.submit("Chain of Thought", summarizer={"decoding": "default"}, section_parallel=True)
+    queue.release.set()
+    wait_all(queue)
+    assert len({a.id, b.id, c.id}) == 3
+    assert sorted(queue.ran) == sorted([a.id, b.id, c.id])
+
+
+def test_unset_options_match_omitted_ones():
+    assert job_key("T", "nlp", 5, {"experiment_batch_size": None, "summarizer": {"decoding": "greedy"}}) == \
+        job_key("T", "nlp", 5, {"summarizer": {"decoding": "greedy", "page_size": None}})
+    assert job_key("T", "nlp", 5, {"fulltext": True}) != job_key("T", "nlp", 5, {})
+
+
+def test_same_topic_jobs_run_one_at_a_time(queue):
+    for decoding in ("default", "greedy", "reduced_beams"):
+        queue.submit("Chain of Thought", summarizer={"decoding": decoding})
+    queue.submit("chain-of-thought", mode="ml")
+    other = queue.submit("Langchain")
+    time.sleep(0.1)
+    # Waiting jobs hold no worker, so the other topic starts right away
+    assert other.status == "running"
+    assert [j.status for j in queue.jobs()].count("running") == 2
+    queue.release.set()
+    wait_all(queue)
+    assert len(queue.ran) == 5
+    assert queue.peak_per_topic["chain_of_thought"] == 1
+
+
+def test_warm_up_does_not_take_a_job_worker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    q = JobQueue(max_workers=1)
+    loading, release = threading.Event(), threading.Event()
+
+    class SlowAgent:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def _load_model(self):
+            loading.set()
+            release.wait(5)
+
+        def release_model(self):
+            pass
+
+    monkeypatch.setattr(jobs, "LiteratureAgent", SlowAgent)
+    monkeypatch.setattr(q, "_execute", lambda job: job.update(status="done"))
+
+    warm = q.warm_up()
+    assert loading.wait(5)
+    job = q.submit("Chain of Thought")
+    wait_all(q)
+    # The only job worker was free while the model was still loading
+    assert job.status == "done" and not warm.done()
+    release.set()
+    warm.result(5)
@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_llm import FakeLLMEndpoint, HTTPBackend
+from core.llm import ScheduledBackend
+from core.llm_scheduler import LLMScheduler, RateLimitError, llm_priority
+
+
+def fire(backend, calls, workers):
+    """Run `calls` concurrent generate() calls; returns the errors raised."""
+    def call(i):
+        try:
+            backend.generate(f"prompt {i}")
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [e for e in pool.map(call, range(calls)) if e is not None]
+
+
+def wait_for_queue(scheduler, depth):
+    deadline = time.monotonic() + 5
+    while scheduler.stats()["queue_depth"] < depth:
+        assert time.monotonic() < deadline, "callers never queued"
+        time.sleep(0.01)
+
+
+# ---------------- Quota ----------------
+def test_unscheduled_load_trips_the_quota():
+    with FakeLLMEndpoint(rps=50, max_concurrent=4, latency_s=0.01) as endpoint:
+        errors = fire(HTTPBackend(endpoint.url), calls=40, workers=8)
+
+    assert errors and all(isinstance(e, RateLimitError) for e in errors)
+
+
+def test_scheduled_load_has_no_rate_limit_failures():
+    with FakeLLMEndpoint(rps=50, max_concurrent=4, latency_s=0.01) as endpoint:
+        scheduler = LLMScheduler(rpm=50 * 60, tpm=None, burst_s=1, max_concurrency=4,
+                                 base_delay=0.05, max_delay=1.0)
+        errors = fire(ScheduledBackend(HTTPBackend(endpoint.url), scheduler), calls=80, workers=8)
+
+    assert errors == []
+    assert endpoint.accepted == 80
+    assert scheduler.stats()["completed"] == 80
+    # Any 429 the endpoint did send was absorbed by a retry
+    assert scheduler.stats()["retries"] == endpoint.rejected
+
+
+# ---------------- Priority ----------------
+def test_interactive_calls_are_admitted_before_queued_batch_calls():
+    scheduler = LLMScheduler(rpm=None, tpm=None, concurrency=1, max_concurrency=1)
+    holding = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def hold():
+        holding.set()
+        release.wait(5)
+        return "held"
+
+    def record(name):
+        order.append(name)
+        return name
+
+    def interactive(name):
+        with llm_priority("interactive"):
+            scheduler.call(lambda: record(name), 10)
+
+    threads = [threading.Thread(target=scheduler.call, args=(hold, 10))]
+    threads[0].start()
+    holding.wait(5)
+
+    for i in range(3):
+        threads.append(threading.Thread(target=scheduler.call, args=(lambda i=i: record(f"batch-{i}"), 10)))
+        threads[-1].start()
+        wait_for_queue(scheduler, i + 1)
+    threads.append(threading.Thread(target=interactive, args=("interactive-0",)))
+    threads.append(threading.Thread(target=scheduler.call, args=(lambda: record("interactive-1"), 10),
+                                    kwargs={"priority": "interactive"}))
+    for t in threads[-2:]:
+        t.start()
+    wait_for_queue(scheduler, 5)
+    assert scheduler.stats()["queued_interactive"] == 2
+
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert sorted(order[:2]) == ["interactive-0", "interactive-1"]
+    assert order[2:] == ["batch-0", "batch-1", "batch-2"]
+
+
+# ---------------- AIMD ----------------
+def test_rate_limit_halves_concurrency_and_retries():
+    scheduler = LLMScheduler(rpm=None, tpm=None, concurrency=8, base_delay=0.01, max_delay=0.05)
+    replies = iter([RateLimitError(retry_after=0.01), "ok"])
+
+    def flaky():
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    assert scheduler.call(flaky, 10) == "ok"
+    stats = scheduler.stats()
+    assert stats["concurrency"] == 4
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+
+
+def test_concurrency_never_drops_below_the_floor():
+    scheduler = LLMScheduler(rpm=None, tpm=None, concurrency=2, min_concurrency=1, retries=2,
+                             base_delay=0.01, max_delay=0.05)
+
+    def limited():
+        raise RateLimitError(retry_after=0.01)
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(limited, 10)
+
+    assert scheduler.stats()["concurrency"] == 1
+    assert scheduler.stats()["rate_limited"] == 3
+
+
+def test_endpoint_429s_shrink_concurrency():
+    with FakeLLMEndpoint(rps=1000, max_concurrent=2, latency_s=0.05) as endpoint:
+        scheduler = LLMScheduler(rpm=None, tpm=None, concurrency=8, max_concurrency=8,
+                                 base_delay=0.02, max_delay=0.2)
+        errors = fire(ScheduledBackend(HTTPBackend(endpoint.url), scheduler), calls=16, workers=8)
+
+    assert errors == []
+    assert endpoint.rejected > 0
+    assert scheduler.stats()["concurrency"] < 8
@@ -0,0 +1,169 @@
+import core.model_registry as model_registry
+from core.model_registry import ModelRegistry, model_size_mb
+
+
+class Model:
+    pass
+
+
+def fake_rss(monkeypatch, readings):
+    """current_rss_mb returns `readings` in order, then repeats the last one."""
+    readings = list(readings)
+    monkeypatch.setattr(model_registry, "current_rss_mb",
+                        lambda: readings.pop(0) if len(readings) > 1 else readings[0])
+
+
+def test_get_loads_once_and_reuses():
+    registry = ModelRegistry()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return Model()
+
+    assert registry.get("a", load) is registry.get("a", load)
+    assert len(calls) == 1
+    assert registry.stats()[0]["uses"] == 2
+
+
+def test_holders_are_counted_per_acquire_and_release():
+    registry = ModelRegistry()
+    model = registry.acquire("a", Model)
+    assert registry.acquire("a", Model) is model
+    registry.get("a", Model)
+
+    def holders():
+        return {s["key"]: s["holders"] for s in registry.stats()}
+
+    assert holders() == {"a": 2}
+    registry.release("a")
+    registry.release("a")
+    registry.release("a")
+    assert holders() == {"a": 0}
+
+    with registry.hold("b", Model):
+        assert holders() == {"a": 0, "b": 1}
+    assert holders() == {"a": 0, "b": 0}
+
+
+def test_budget_never_evicts_held_models(monkeypatch):
+    registry = ModelRegistry()
+    registry.acquire("held", Model)
+    registry.get("idle-1", Model)
+    registry.get("idle-2", Model)
+    registry.get("newest", Model)
+
+    registry.max_rss_mb = 100
+    fake_rss(monkeypatch, [500, 400, 300])
+    registry._enforce_budget(keep="newest")
+
+    assert "held" in registry and "newest" in registry
+    assert "idle-1" not in registry and "idle-2" not in registry
+
+
+def test_release_makes_a_model_evictable(monkeypatch):
+    registry = ModelRegistry(max_rss_mb=100)
+    fake_rss(monkeypatch, [50])
+    registry.acquire("a", Model)
+
+    # Over budget after loading "b", but "a" is held and "b" was just loaded
+    fake_rss(monkeypatch, [40, 500, 500])
+    registry.get("b", Model)
+    assert "a" in registry and "b" in registry
+
+    fake_rss(monkeypatch, [500, 50])
+    registry.release("a")
+    assert "a" not in registry and "b" in registry
+
+
+def test_budget_stops_when_eviction_frees_nothing(monkeypatch):
+    registry = ModelRegistry()
+    for key in ("a", "b", "c"):
+        registry.get(key, Model)
+
+    registry.max_rss_mb = 100
+    fake_rss(monkeypatch, [500, 500])
+    registry._enforce_budget()
+
+    assert "a" not in registry
+    assert "b" in registry and "c" in registry
+
+
+def test_within_budget_keeps_everything(monkeypatch):
+    registry = ModelRegistry(max_rss_mb=1000)
+    fake_rss(monkeypatch, [200])
+    for key in ("a", "b"):
+        registry.get(key, Model)
+    assert "a" in registry and "b" in registry
+
+
+# ---------------- Footprint ----------------
+class Tensor:
+    def __init__(self, numel, element_size):
+        self._numel, self._size = numel, element_size
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._size
+
+
+class Module:
+    """Just enough of torch.nn.Module for model_size_mb."""
+
+    def __init__(self, params, buffers=()):
+        self._params, self._buffers = params, buffers
+
+    def parameters(self):
+        return iter(self._params)
+
+    def buffers(self):
+        return iter(self._buffers)
+
+
+def test_model_size_counts_parameters_and_buffers():
+    mb = 1024 * 1024
+    module = Module([Tensor(mb, 4), Tensor(mb // 2, 4)], [Tensor(mb, 2)])
+
+    assert model_size_mb(module) == 8.0
+    # (tokenizer, model): the tokenizer has no weights to count
+    assert model_size_mb((object(), module)) == 8.0
+    assert model_size_mb(object()) is None
+
+
+def test_stats_report_own_size_and_process_rss(monkeypatch):
+    registry = ModelRegistry()
+    fake_rss(monkeypatch, [300, 420])
+    registry.get("weights", lambda: Module([Tensor(1024 * 1024, 4)]))
+    fake_rss(monkeypatch, [420, 470])
+    registry.get("opaque", Model)
+
+    stats = {s["key"]: s for s in registry.stats()}
+    assert (stats["weights"]["model_mb"], stats["weights"]["process_rss_mb"]) == (4.0, 420)
+    # No weights to count: the RSS growth across the load
+    assert (stats["opaque"]["model_mb"], stats["opaque"]["process_rss_mb"]) == (50, 470)
+
+
+def test_literature_agent_releases_bart_after_processing(tmp_path, monkeypatch):
+    from agents.literature_agent import LiteratureAgent
+
+    monkeypatch.chdir(tmp_path)
+    agent = LiteratureAgent("t", device="cpu", use_cache=False, use_corpus=False)
+    monkeypatch.setattr(agent, "_build_model", lambda: (object(), Model()))
+
+    def summarize_tiered(abstracts):
+        agent._load_model()
+        held.append(model_registry.registry.stats())
+        return ["summary"] * len(abstracts), ["model"] * len(abstracts)
+
+    held = []
+    monkeypatch.setattr(agent, "summarize_tiered", summarize_tiered)
+    try:
+        agent.process([{"abstract": "An abstract."}])
+        [during] = [s for s in held[0] if s["key"] == agent.model_key]
+        [after] = [s for s in model_registry.registry.stats() if s["key"] == agent.model_key]
+        assert (during["holders"], after["holders"]) == (1, 0)
+        assert agent.model is None
+    finally:
+        model_registry.registry.unload(agent.model_key)
@@ -0,0 +1,56 @@
+import pytest
+
+from agents.paper_agent import PaperAgent
+from core.document import parse_paper
+from core.llm import LLMBackend
+
+
+class ReplyBackend(LLMBackend):
+    name = "reply"
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def generate(self, prompt):
+        return self.reply
+
+
+def section_text(tmp_path, heading, reply):
+    agent = PaperAgent([], "Summarization", output_dir=str(tmp_path), llm=ReplyBackend(reply))
+    return agent._generate_section(heading, "prompt")[1]
+
+
+@pytest.mark.parametrize("reply", [
+    "I. Introduction\nBody text.",
+    "## I. Introduction\nBody text.",
+    "**Introduction:**\nBody text.",
+    "Abstract\nBody text.",
+])
+def test_repeated_heading_is_dropped(tmp_path, reply):
+    heading = "Abstract" if reply.startswith("Abstract") else "I. Introduction"
+    assert section_text(tmp_path, heading, reply) == "Body text."
+
+
+@pytest.mark.parametrize("heading, reply", [
+    ("Abstract", "Abstractive summarization condenses papers.\nMore text."),
+    ("I. Introduction", "I. e. the models are small.\nMore text."),
+    ("II. Related Work", "Introduction of transformers changed the field.\nMore text."),
+    ("V. Discussion", "I. Introduction\nMore text."),
+])
+def test_body_lines_that_look_like_headings_are_kept(tmp_path, heading, reply):
+    assert section_text(tmp_path, heading, reply) == reply
+
+
+def test_parser_only_splits_on_whole_heading_lines():
+    text = "\n".join([
+        "Abstract",
+        "Abstractive summarization condenses papers.",
+        "I. Introduction",
+        "I. e. small models suffice.",
+        "VI. Conclusion and Future Work",
+        "Done.",
+    ])
+    doc = parse_paper(text, "T")
+    assert [s.heading for s in doc.sections] == ["Abstract", "I. Introduction", "VI. Conclusion and Future Work"]
+    assert doc.sections[0].paragraphs == ["Abstractive summarization condenses papers."]
+    assert doc.sections[1].paragraphs == ["I. e. small models suffice."]
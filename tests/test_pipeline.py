@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import BatchPipeline, read_topics_file
+
+
+class CountingPipeline(BatchPipeline):
+    """Topics just sleep; records how many were in progress at once."""
+
+    def __init__(self, **kwargs):
+        super().__init__(mode="ml", **kwargs)
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def _run_topic(self, topic, pools):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        return {"topic": topic, "status": "ok", "timings": {}, "checkpoints": "", "pdf_path": "-"}
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_topics_in_flight_are_capped():
+    pipeline = CountingPipeline(max_topics_in_flight=3)
+    results = pipeline.run([f"topic {i}" for i in range(40)])
+    assert [r["topic"] for r in results] == [f"topic {i}" for i in range(40)]
+    assert pipeline.peak <= 3
+    assert len(pipeline.threads) <= 3
+
+
+def test_default_cap_is_one_driver_per_stage_worker():
+    pipeline = CountingPipeline(fetch_workers=2, summarize_workers=1, llm_workers=1)
+    assert pipeline.max_topics_in_flight == 4
+    pipeline.run([f"topic {i}" for i in range(30)])
+    assert pipeline.peak <= 4
+
+
+def test_read_topics_file(tmp_path):
+    path = tmp_path / "topics.txt"
+    path.write_text("Chain of Thought\n\n# comment\nLangchain  # inline\n")
+    assert read_topics_file(str(path)) == ["Chain of Thought", "Langchain"]
+
+
+# ---------------- Context propagation ----------------
+class FakeAgent:
+    """Stands in for all three agents; every stage records the context it ran in."""
+
+    page_size = None
+    seen = []
+
+    def checkpoint_config(self):
+        return {}
+
+    fetch_config = checkpoint_config
+
+    def _record(self, value):
+        from core import instrumentation
+        from core import llm_scheduler
+
+        instrumentation.add(calls=1)
+        FakeAgent.seen.append((threading.current_thread().name.split("_")[0], llm_scheduler._priority.get()))
+        return value
+
+    def collect(self, limit):
+        return self._record(["paper"])
+
+    def process(self, papers):
+        return self._record(["summary"])
+
+    def run(self):
+        return self._record({"pdf_path": "paper.pdf", "text_path": "paper.txt", "outputs": {}})
+
+
+class FakeAgentPipeline(BatchPipeline):
+    def literature_agent(self, topic):
+        return FakeAgent()
+
+    def experiment_agent(self, topic, literature):
+        return FakeAgent()
+
+    def paper_agent(self, topic, literature, experiments):
+        return FakeAgent()
+
+
+def test_stage_workers_inherit_the_callers_context():
+    from core import instrumentation
+    from core.llm_scheduler import llm_priority
+
+    FakeAgent.seen = []
+    with instrumentation.stage("batch") as stage, llm_priority("interactive"):
+        results = FakeAgentPipeline(mode="ml").run(["topic a", "topic b"])
+
+    assert [r["status"] for r in results] == ["ok", "ok"]
+    # fetch, summarize, experiments and paper for both topics, each on its stage pool
+    assert sorted(FakeAgent.seen) == sorted([("fetch", "interactive"), ("summarize", "interactive"),
+                                             ("llm", "interactive"), ("llm", "interactive")] * 2)
+    # Counters added in the workers reach the caller's stage
+    assert stage.metrics["calls"] == 8
@@ -0,0 +1,99 @@
+import glob
+import json
+
+from core.ranking import RelevanceRanker, char_ngrams, words
+
+COT = "We prompt large language models to write intermediate reasoning steps, which improves arithmetic accuracy."
+PAPERS = [
+    {"title": "Graph Neural Networks for Molecules",
+     "abstract": "Message passing networks predict molecular properties from atom graphs."},
+    {"title": "Chain-of-Thought Prompting Elicits Reasoning in Large Language Models", "abstract": COT},
+    {"title": "Speech Synthesis with Diffusion", "abstract": "A diffusion decoder generates waveforms from text."},
+    {"title": "Self-Consistency Improves Chain of Thought Reasoning",
+     "abstract": "Sampling several reasoning paths and voting improves chain of thought reasoning in language models."},
+]
+
+
+def titles(ranked):
+    return [p["title"] for p in ranked]
+
+
+def test_words_and_trigrams():
+    assert words("The Agents use LLMs for class") == ["agent", "use", "llm", "class"]
+    assert char_ngrams("Ab") == [" ab", "ab "]
+
+
+def test_top_k_most_relevant_first():
+    ranked, stats = RelevanceRanker().rank(PAPERS, "chain of thought reasoning", limit=2)
+    assert titles(ranked) == [
+        "Self-Consistency Improves Chain of Thought Reasoning",
+        "Chain-of-Thought Prompting Elicits Reasoning in Large Language Models",
+    ]
+    assert ranked[0]["relevance"] >= ranked[1]["relevance"] > 0
+    assert stats == {"candidates": 4, "near_duplicates": 0, "dropped": 2}
+
+
+def test_no_limit_keeps_everything_in_relevance_order():
+    ranked, _ = RelevanceRanker().rank(PAPERS, "diffusion speech synthesis")
+    assert titles(ranked)[0] == "Speech Synthesis with Diffusion"
+    assert len(ranked) == len(PAPERS)
+    scores = [p["relevance"] for p in ranked]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_ties_keep_fetch_order():
+    papers = [{"title": f"Unrelated paper {name}", "abstract": f"About {name}."} for name in ("alpha", "beta", "gamma")]
+    ranked, _ = RelevanceRanker().rank(papers, "chain of thought")
+    assert titles(ranked) == titles(papers)
+
+
+def test_title_variants_collapse_and_keep_the_longer_abstract():
+    arxiv_copy = {"title": "Chain of Thought Prompting Elicits Reasoning in Large Language Models.",
+                  "abstract": COT + " We also study robustness to exemplar order and annotator style in detail."}
+    ranked, stats = RelevanceRanker().rank(PAPERS + [arxiv_copy], "chain of thought reasoning", limit=3)
+    assert stats["near_duplicates"] == 1
+    cot = [p for p in ranked if "Prompting Elicits" in p["title"]]
+    assert len(cot) == 1
+    assert cot[0]["abstract"] == arxiv_copy["abstract"]
+
+
+def test_content_duplicates_collapse_when_titles_differ():
+    # Subtitle dropped: title trigrams fall below 0.9, title + abstract cosine stays above 0.8
+    short_title = {"title": "Chain of Thought Prompting Elicits Reasoning", "abstract": COT}
+    ranked, stats = RelevanceRanker().rank(PAPERS + [short_title], "chain of thought reasoning")
+    assert stats["near_duplicates"] == 1
+    assert len(ranked) == len(PAPERS)
+
+
+def test_related_but_distinct_papers_are_kept():
+    ranked, stats = RelevanceRanker().rank(PAPERS, "chain of thought reasoning")
+    assert stats["near_duplicates"] == 0
+    assert len(ranked) == len(PAPERS)
+
+
+def test_thresholds_control_collapse():
+    # Same abstract under an unrelated title: distinct at the defaults, a duplicate at a looser threshold
+    reworded = {"title": "Reasoning Steps Help LLM Arithmetic", "abstract": COT}
+    _, stats = RelevanceRanker().rank(PAPERS + [reworded], "chain of thought")
+    assert stats["near_duplicates"] == 0
+    _, stats = RelevanceRanker(duplicate_threshold=0.5).rank(PAPERS + [reworded], "chain of thought")
+    assert stats["near_duplicates"] == 1
+
+    twin = {"title": PAPERS[1]["title"] + ".", "abstract": COT}
+    _, stats = RelevanceRanker(duplicate_threshold=1.01, title_threshold=1.01).rank(PAPERS + [twin], "chain of thought")
+    assert stats["near_duplicates"] == 0
+
+
+def test_fixture_pool_ranks_without_losing_distinct_papers():
+    pool = []
+    for path in sorted(glob.glob("data/processed/*_raw.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            pool += [p for p in json.load(f) if isinstance(p, dict) and p.get("title")]
+    ranked, stats = RelevanceRanker().rank(pool, "chain of thought reasoning", limit=5)
+    assert len(ranked) == 5
+    assert stats["candidates"] == len(pool)
+    assert all("thought" in (p["title"] + p.get("abstract", "")).lower() for p in ranked[:3])
+
+
+def test_empty_input():
+    assert RelevanceRanker().rank([], "anything") == ([], {"candidates": 0, "near_duplicates": 0, "dropped": 0})
@@ -0,0 +1,85 @@
+import json
+
+from core.document import HEADING_PATTERN, parse_paper
+from core.renderers import render
+
+TEXT = """Abstract
+A short abstract.
+
+I. Introduction
+First paragraph.
+Second paragraph."""
+
+
+def test_markdown_matches_checked_in_outputs(tmp_path):
+    doc = parse_paper(TEXT, "Text to Speech", ["[1] A. Author. (2024). One.", "[2] B. Author. (2023). Two."])
+    path = render(doc, {"md": str(tmp_path / "paper.md")})["md"]
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == (
+            "# Text to Speech\n"
+            "\n"
+            "## Abstract\n"
+            "A short abstract.\n"
+            "\n"
+            "## I. Introduction\n"
+            "First paragraph.\n"
+            "\n"
+            "Second paragraph.\n"
+            "\n"
+            "References\n"
+            "\n"
+            "[1] A. Author. (2024). One.\n"
+            "[2] B. Author. (2023). Two.\n"
+        )
+
+
+def test_checked_in_markdown_has_the_same_shape():
+    with open("outputs/Text_to_Speech_paper.md", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    assert lines[0] == "# Text to Speech"
+    assert lines[2] == "## Abstract" and lines[3]
+    assert "References" in lines and "### References" not in lines
+
+
+def test_formats_render_concurrently(tmp_path):
+    doc = parse_paper(TEXT, "Paper", [])
+    paths = {fmt: str(tmp_path / f"paper.{fmt}") for fmt in ("md", "json")}
+    render(doc, paths, concurrent=True)
+    with open(paths["json"], encoding="utf-8") as f:
+        assert [s["heading"] for s in json.load(f)["sections"]] == ["Abstract", "I. Introduction"]
+
+
+def pdf_story(doc, tmp_path, monkeypatch):
+    """The flowables render_pdf lays out, as ("space", height) / (style, text)."""
+    from reportlab.platypus import BaseDocTemplate, Spacer
+
+    story = []
+    monkeypatch.setattr(BaseDocTemplate, "build", lambda self, flowables: story.extend(flowables))
+    render(doc, {"pdf": str(tmp_path / "paper.pdf")})
+    return [("space", f.height) if isinstance(f, Spacer) else (f.style.name, f.text) for f in story]
+
+
+def original_layout(text):
+    """The body of the original _save_pdf loop: one 6pt spacer per blank line, nothing else."""
+    body = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            body.append(("space", 6))
+        elif HEADING_PATTERN.match(line):
+            body.append(("Heading", f"<b>{line}</b>"))
+        else:
+            body.append(("Base", line))
+    return body
+
+
+def test_pdf_spacing_follows_blank_lines_only(tmp_path, monkeypatch):
+    text = "\n" + TEXT + "\n\n\nII. Method\n\nOne.\nTwo.\n"
+    story = pdf_story(parse_paper(text, "T", ["[1] Ref."]), tmp_path, monkeypatch)
+
+    # Title, two author blocks (with their 6pt and 14pt spacers), then the body
+    assert story[:9] == [("Title", "T"), ("Author", "Author Name 1"), ("Author", "Department / University"),
+                         ("Author", "email@domain.com"), ("space", 6), ("Author", "Author Name 2"),
+                         ("Author", "Department / University"), ("Author", "email@domain.com"), ("space", 14)]
+    assert story[9:-3] == original_layout(text)
+    assert story[-3:] == [("space", 10), ("Heading", "<b>References</b>"), ("Base", "[1] Ref.")]
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from benchmarks.startup import DEFAULT_BUDGET_MS, import_profile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Slower CI machines can raise the budget without editing the test
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+
+@pytest.fixture(scope="module")
+def profile():
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        return import_profile("main")
+    finally:
+        os.chdir(cwd)
+
+
+def test_import_main_within_budget(profile):
+    total_ms, _, _ = profile
+    assert total_ms <= BUDGET_MS, f"import main took {total_ms:.0f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+@pytest.mark.parametrize("module", ["torch", "transformers", "reportlab"])
+def test_heavy_modules_not_imported_at_startup(profile, module):
+    _, _, loaded = profile
+    assert module not in loaded
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from core.summarizers import decoding_kwargs, onnx_export, resolve_model, summarizer_id
+
+
+class FakeORTModel:
+    """Records exports; save_pretrained writes a stand-in graph file."""
+
+    exports = []
+
+    @classmethod
+    def from_pretrained(cls, name, export=False):
+        cls.exports.append((name, export))
+        return cls()
+
+    def save_pretrained(self, path):
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "encoder_model.onnx"), "w") as f:
+            f.write("graph")
+
+
+def test_onnx_export_runs_once_per_model(tmp_path):
+    FakeORTModel.exports = []
+    first = onnx_export("sshleifer/distilbart-cnn-6-6", FakeORTModel, cache_dir=str(tmp_path))
+    again = onnx_export("sshleifer/distilbart-cnn-6-6", FakeORTModel, cache_dir=str(tmp_path))
+    other = onnx_export("facebook/bart-large-cnn", FakeORTModel, cache_dir=str(tmp_path))
+
+    assert first == again != other
+    assert os.path.exists(os.path.join(first, "encoder_model.onnx"))
+    assert FakeORTModel.exports == [("sshleifer/distilbart-cnn-6-6", True), ("facebook/bart-large-cnn", True)]
+    # No half-written export is left behind
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in (first, other))
+
+
+def test_failed_export_leaves_no_cache_entry(tmp_path):
+    class Broken(FakeORTModel):
+        def save_pretrained(self, path):
+            os.makedirs(path)
+            raise RuntimeError("export failed")
+
+    with pytest.raises(RuntimeError):
+        onnx_export("m", Broken, cache_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_presets_ids_and_profiles():
+    assert resolve_model("distilled") == "sshleifer/distilbart-cnn-12-6"
+    assert resolve_model("some/checkpoint") == "some/checkpoint"
+    assert summarizer_id("m") == "m" and summarizer_id("m", "onnx") == "m+onnx"
+    with pytest.raises(ValueError):
+        decoding_kwargs("fastest")
@@ -0,0 +1,126 @@
+import glob
+import json
+
+import pytest
+
+from agents.literature_agent import LiteratureAgent
+from core.summary_cache import SummaryCache
+from core.summary_router import SummaryRouter, normalize_abstract, split_sentences, textrank_summary
+
+
+def words(n, word="token"):
+    return " ".join(f"{word}{i}" for i in range(n))
+
+
+def sentences(n, words_each=12):
+    return " ".join(f"Sentence {i} talks about models and data {words(words_each - 7, 'w')}." for i in range(n))
+
+
+# ---------------- Router ----------------
+def test_tiers_follow_word_thresholds():
+    router = SummaryRouter(passthrough_words=10, extractive_words=20)
+    assert router.tier(None) == "empty"
+    assert router.tier("   ") == "empty"
+    assert router.tier(words(10)) == "passthrough"
+    assert router.tier(words(11)) == "extractive"
+    assert router.tier(words(20)) == "extractive"
+    assert router.tier(words(21)) == "model"
+
+
+def test_plan_marks_duplicates_of_the_first_occurrence():
+    router = SummaryRouter(passthrough_words=5, extractive_words=10)
+    long_text = words(30)
+    tiers, sources = router.plan([long_text, "", "Short one.", long_text.upper(), "", "short ONE"])
+    assert tiers == ["model", "empty", "passthrough", "duplicate", "empty", "duplicate"]
+    assert sources == [0, 1, 2, 0, 4, 2]
+    assert normalize_abstract("Short, one!") == "short one"
+
+
+def test_cheap_tiers():
+    router = SummaryRouter(summary_words=30)
+    assert router.summarize_cheap("", "empty") == ""
+    assert router.summarize_cheap("  Keep me.  ", "passthrough") == "Keep me."
+    summary = router.summarize_cheap(sentences(12), "extractive")
+    assert 0 < len(summary.split()) <= 30
+    with pytest.raises(ValueError):
+        router.summarize_cheap(words(500), "model")
+
+
+def test_textrank_keeps_sentence_order_and_budget():
+    text = sentences(10)
+    summary = textrank_summary(text, max_words=40)
+    chosen = split_sentences(summary)
+    original = split_sentences(text)
+    assert len(summary.split()) <= 40
+    assert [original.index(s) for s in chosen] == sorted(original.index(s) for s in chosen)
+    assert textrank_summary("One sentence. Two sentences.") == "One sentence. Two sentences."
+
+
+# ---------------- LiteratureAgent routing ----------------
+class ModelCalls:
+    """Stands in for BART: records what reaches the model."""
+
+    def __init__(self):
+        self.abstracts = []
+
+    def __call__(self, abstracts, batch_size=None, summaries=None):
+        self.abstracts += abstracts
+        return [f"MODEL: {a[:20]}" for a in abstracts]
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite"))
+    agent = LiteratureAgent("routing", cache=cache, use_corpus=False)
+    model = ModelCalls()
+    monkeypatch.setattr(agent, "summarize_batch", model)
+    agent.model_calls = model
+    return agent
+
+
+def checked_in_summaries():
+    pairs = []
+    for path in sorted(glob.glob("data/summaries/*_summaries.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            pairs += [(p["abstract"], p["summary"]) for p in json.load(f) if p.get("abstract") and p.get("summary")]
+    return pairs
+
+
+def test_cached_model_summaries_win_over_cheap_tiers(agent):
+    pairs = checked_in_summaries()
+    assert pairs
+    summaries, tiers = agent.summarize_tiered([a for a, _ in pairs])
+
+    # Every checked-in abstract is answered with its cached BART summary,
+    # including the short ones the router would pass through or TextRank
+    assert summaries == [s for _, s in pairs]
+    assert set(tiers) == {"model"}
+    assert agent.model_calls.abstracts == []
+    assert any(agent.router.tier(a) != "model" for a, _ in pairs)
+
+
+def test_only_cache_misses_are_routed(agent):
+    cached_abstract, cached_summary = checked_in_summaries()[0]
+    long_text = sentences(30)
+    medium = sentences(12)
+    abstracts = [cached_abstract, "Short abstract.", long_text, None, medium, long_text]
+
+    summaries, tiers = agent.summarize_tiered(abstracts)
+
+    assert tiers == ["model", "passthrough", "model", "empty", "extractive", "duplicate"]
+    assert summaries[0] == cached_summary
+    assert summaries[1] == "Short abstract."
+    assert summaries[2] == summaries[5] == f"MODEL: {long_text[:20]}"
+    assert summaries[3] == ""
+    assert 0 < len(summaries[4].split()) <= agent.router.summary_words
+    # Only the one uncached long abstract reached the model, once
+    assert agent.model_calls.abstracts == [long_text]
+
+
+def test_routing_disabled_sends_everything_to_the_model(tmp_path, monkeypatch):
+    agent = LiteratureAgent("routing", use_router=False, use_cache=False, use_corpus=False)
+    model = ModelCalls()
+    monkeypatch.setattr(agent, "summarize_batch", model)
+    summaries, tiers = agent.summarize_tiered(["Short.", None])
+    assert tiers == ["model", "model"]
+    assert model.abstracts == ["Short.", ""]
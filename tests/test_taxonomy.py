@@ -0,0 +1,100 @@
+import glob
+import json
+import re
+
+import pytest
+
+from core.taxonomy import TAXONOMY_PATH, TaxonomyMatcher, tokenize
+
+SMALL = {
+    "datasets": {"CIFAR-10": ["cifar10"], "ImageNet": []},
+    "models": {
+        "RNN": ["recurrent neural network"],
+        "Random Forest": ["random forests"],
+        "Random Forest Regression": [],
+        "BERT": [],
+    },
+    "metrics": {"F1": ["f1 score", "f1-score"], "Regression Loss": ["regression"]},
+}
+
+
+def regex_baseline(taxonomy, text):
+    """
+    The regex approach the matcher replaced: one longest-first alternation
+    over every normalized alias, scanned left to right on the token string.
+    """
+    alias_to_entry = {}
+    for category, names in taxonomy.items():
+        for canonical, aliases in names.items():
+            for alias in (canonical, *aliases):
+                key = " ".join(tokenize(alias))
+                if key:
+                    alias_to_entry.setdefault(key, (category, canonical))
+    pattern = re.compile(r"(?<![a-z0-9])(?:" + "|".join(
+        re.escape(a) for a in sorted(alias_to_entry, key=len, reverse=True)) + r")(?![a-z0-9])")
+
+    found = {c: [] for c in taxonomy}
+    for m in pattern.finditer(" ".join(tokenize(text))):
+        category, canonical = alias_to_entry[m.group(0)]
+        if canonical not in found[category]:
+            found[category].append(canonical)
+    return found
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    with open(TAXONOMY_PATH, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    return taxonomy, TaxonomyMatcher(taxonomy)
+
+
+def fixture_abstracts():
+    abstracts = []
+    for path in sorted(glob.glob("data/processed/*_raw.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            abstracts += [p.get("abstract") or "" for p in json.load(f) if isinstance(p, dict)]
+    return abstracts
+
+
+def test_matches_regex_baseline_on_fixture_abstracts(shipped):
+    taxonomy, matcher = shipped
+    abstracts = fixture_abstracts()
+    assert abstracts
+    hits = 0
+    for text in abstracts:
+        expected = regex_baseline(taxonomy, text)
+        assert matcher.match(text) == expected, text[:80]
+        hits += sum(len(v) for v in expected.values())
+    assert hits > 0
+
+
+@pytest.mark.parametrize("text", [
+    "We train a random forest regression model on CIFAR-10 and ImageNet.",
+    "Random forests beat a recurrent neural network (RNN); F1-score and regression loss are reported.",
+    "srnnet and cifar100 are not entities, but Cifar_10 and cifar 10 are.",
+    "BERT BERT bert, then ImageNet.",
+    "",
+])
+def test_matches_regex_baseline_on_edge_cases(text):
+    assert TaxonomyMatcher(SMALL).match(text) == regex_baseline(SMALL, text)
+
+
+def test_aliases_are_normalized_and_word_bounded():
+    found = TaxonomyMatcher(SMALL).match("Results on cifar 10, Cifar_10 and CIFAR10 with an srnnet.")
+    assert found["datasets"] == ["CIFAR-10"]
+    assert found["models"] == []
+
+
+def test_leftmost_longest():
+    found = TaxonomyMatcher(SMALL).match("A random forest regression baseline.")
+    assert found == {"datasets": [], "models": ["Random Forest Regression"], "metrics": []}
+
+
+def test_order_of_appearance_and_dedupe():
+    found = TaxonomyMatcher(SMALL).match("BERT and an RNN, then BERT again, and a recurrent neural network.")
+    assert found["models"] == ["BERT", "RNN"]
+
+
+def test_match_many():
+    matcher = TaxonomyMatcher(SMALL)
+    assert matcher.match_many(["ImageNet", None]) == [matcher.match("ImageNet"), matcher.match("")]